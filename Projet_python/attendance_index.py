@@ -0,0 +1,297 @@
+"""
+Index des Présences
+Module maintenant des compteurs par session et des sommes cumulées
+pour répondre aux requêtes par période sans reparcourir les enregistrements
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from attendance_manager import AttendanceStatus
+
+# Position de chaque statut dans les compteurs [présent, absent, retard]
+STATUS_SLOTS = {
+    AttendanceStatus.PRESENT: 0,
+    AttendanceStatus.ABSENT: 1,
+    AttendanceStatus.LATE: 2
+}
+
+PERIODS = ('day', 'week', 'month', 'semester')
+
+def period_start(day: date, period: str) -> date:
+    """Calculer le premier jour de la période contenant une date"""
+    if period == 'day':
+        return day
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    if period == 'semester':
+        # Semestre 1 : septembre à janvier, semestre 2 : février à août
+        if day.month >= 9:
+            return date(day.year, 9, 1)
+        if day.month >= 2:
+            return date(day.year, 2, 1)
+        return date(day.year - 1, 9, 1)
+    raise ValueError(f"Période inconnue: '{period}'")
+
+def next_period_start(start: date, period: str) -> date:
+    """Calculer le premier jour de la période suivante"""
+    if period == 'day':
+        return start + timedelta(days=1)
+    if period == 'week':
+        return start + timedelta(days=7)
+    if period == 'month':
+        if start.month == 12:
+            return date(start.year + 1, 1, 1)
+        return date(start.year, start.month + 1, 1)
+    if period == 'semester':
+        if start.month == 9:
+            return date(start.year + 1, 2, 1)
+        return date(start.year, 9, 1)
+    raise ValueError(f"Période inconnue: '{period}'")
+
+def period_label(start: date, period: str) -> str:
+    """Construire le libellé d'une période à partir de son premier jour"""
+    if period == 'day':
+        return start.isoformat()
+    if period == 'week':
+        iso_year, iso_week, _ = start.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    if period == 'month':
+        return start.strftime("%Y-%m")
+    if period == 'semester':
+        if start.month == 9:
+            return f"{start.year}-{start.year + 1} S1"
+        return f"{start.year - 1}-{start.year} S2"
+    raise ValueError(f"Période inconnue: '{period}'")
+
+def iter_periods(start_date: str, end_date: str, period: str) -> List[Tuple[str, str, str]]:
+    """Lister les périodes (libellé, premier jour, dernier jour) couvrant une plage de dates"""
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)
+    periods = []
+    current = period_start(start, period)
+    while current <= end:
+        following = next_period_start(current, period)
+        last_day = following - timedelta(days=1)
+        periods.append((period_label(current, period), current.isoformat(), last_day.isoformat()))
+        current = following
+    return periods
+
+def counts_to_dict(counts: List[int], sessions: int = 0) -> Dict:
+    """Convertir des compteurs [présent, absent, retard] en dictionnaire"""
+    present, absent, late = counts
+    total = present + absent + late
+    return {
+        'sessions': sessions,
+        'present': present,
+        'absent': absent,
+        'late': late,
+        'total': total,
+        'attendance_rate': ((present + late) / total) * 100 if total else None
+    }
+
+class PrefixSeries:
+    """Série de compteurs triée par date, avec ses sommes cumulées"""
+
+    __slots__ = ('dates', 'prefix')
+
+    def __init__(self, items):
+        # items : couples (date, [présent, absent, retard]) triés par date
+        self.dates: List[str] = []
+        self.prefix: List[List[int]] = [[0], [0], [0]]
+        for date_str, counts in items:
+            self.dates.append(date_str)
+            for slot in range(3):
+                self.prefix[slot].append(self.prefix[slot][-1] + counts[slot])
+
+    def bounds(self, start_date: Optional[str], end_date: Optional[str]) -> Tuple[int, int]:
+        """Trouver par dichotomie les indices d'une plage de dates"""
+        low = bisect_left(self.dates, start_date) if start_date else 0
+        high = bisect_right(self.dates, end_date) if end_date else len(self.dates)
+        return low, max(low, high)
+
+    def range_counts(self, start_date: str = None, end_date: str = None) -> Dict:
+        """Compter les statuts d'une plage de dates en O(log n)"""
+        low, high = self.bounds(start_date, end_date)
+        counts = [self.prefix[slot][high] - self.prefix[slot][low] for slot in range(3)]
+        return counts_to_dict(counts, high - low)
+
+class AttendanceIndex:
+    """Index des compteurs par session et par étudiant, triés par date
+
+    Les compteurs sont mis à jour en O(1) à chaque marquage. Les sommes
+    cumulées (globales, par TD, par étudiant) sont recalculées à la demande
+    uniquement pour ce qui a changé, puis chaque plage de dates se résout
+    par dichotomie.
+    """
+
+    def __init__(self, attendance_manager):
+        self.attendance_manager = attendance_manager
+        self._session_counts: Dict[str, List[int]] = {}
+        self._session_td: Dict[str, str] = {}
+        self._student_slots: Dict[str, Dict[str, int]] = {}
+
+        # Sommes cumulées construites à la demande
+        self._series: Dict[Optional[str], PrefixSeries] = {}
+        self._student_series: Dict[str, Dict[Optional[str], PrefixSeries]] = {}
+
+        self.rebuild()
+        self.attendance_manager.add_observer(self)
+
+    def rebuild(self):
+        """Recalculer tous les compteurs en un seul passage"""
+        self._session_counts = {}
+        self._session_td = {}
+        self._student_slots = {}
+        for session in self.attendance_manager.get_all_sessions():
+            counts = [0, 0, 0]
+            for student_id, record in session.records.items():
+                slot = STATUS_SLOTS[record.status]
+                counts[slot] += 1
+                self._student_slots.setdefault(student_id, {})[session.date] = slot
+            self._session_counts[session.date] = counts
+            self._session_td[session.date] = session.td_name.strip()
+
+        self._series.clear()
+        self._student_series.clear()
+
+    def _sync_session_td(self, date_str: str):
+        """Suivre le nom du TD d'une session, qui peut être défini au premier marquage"""
+        session = self.attendance_manager.get_session(date_str)
+        if session is None:
+            return
+        td_name = session.td_name.strip()
+        if self._session_td.get(date_str) != td_name:
+            self._session_td[date_str] = td_name
+            self._series.clear()
+            self._student_series.clear()
+
+    def on_record_change(self, student_id, date_str, old_record, new_record):
+        """Mettre à jour les compteurs d'une session et d'un étudiant après un marquage"""
+        counts = self._session_counts.setdefault(date_str, [0, 0, 0])
+        student_slots = self._student_slots.setdefault(student_id, {})
+        if old_record:
+            counts[STATUS_SLOTS[old_record.status]] -= 1
+            student_slots.pop(date_str, None)
+        if new_record:
+            slot = STATUS_SLOTS[new_record.status]
+            counts[slot] += 1
+            student_slots[date_str] = slot
+
+        self._series.clear()
+        self._student_series.pop(student_id, None)
+        self._sync_session_td(date_str)
+
+    def on_attendance_change(self, event_type, date_str=None):
+        """Suivre la création, la suppression et le chargement des sessions"""
+        if event_type == 'load':
+            self.rebuild()
+        elif event_type == 'session_created':
+            self._session_counts.setdefault(date_str, [0, 0, 0])
+            self._series.clear()
+            self._sync_session_td(date_str)
+        elif event_type == 'session_deleted':
+            self._session_counts.pop(date_str, None)
+            self._session_td.pop(date_str, None)
+            self._series.clear()
+
+    def _matches_td(self, date_str: str, td_name: Optional[str]) -> bool:
+        """Vérifier si une session appartient au TD demandé (None = tous)"""
+        return td_name is None or self._session_td.get(date_str, '') == td_name.strip()
+
+    def _get_series(self, td_name: Optional[str] = None) -> PrefixSeries:
+        """Récupérer les sommes cumulées des sessions, éventuellement d'un seul TD"""
+        series = self._series.get(td_name)
+        if series is None:
+            series = PrefixSeries((date_str, self._session_counts[date_str])
+                                  for date_str in sorted(self._session_counts)
+                                  if self._matches_td(date_str, td_name))
+            self._series[td_name] = series
+        return series
+
+    def _get_student_series(self, student_id: str, td_name: Optional[str] = None) -> PrefixSeries:
+        """Récupérer les sommes cumulées d'un étudiant, éventuellement d'un seul TD"""
+        cache = self._student_series.setdefault(student_id, {})
+        series = cache.get(td_name)
+        if series is None:
+            slots = self._student_slots.get(student_id, {})
+            items = []
+            for date_str in sorted(slots):
+                if self._matches_td(date_str, td_name):
+                    counts = [0, 0, 0]
+                    counts[slots[date_str]] = 1
+                    items.append((date_str, counts))
+            series = PrefixSeries(items)
+            cache[td_name] = series
+        return series
+
+    def get_dates(self, td_name: str = None) -> List[str]:
+        """Récupérer les dates des sessions, triées"""
+        return list(self._get_series(td_name).dates)
+
+    def get_session_counts(self, date_str: str) -> Optional[Dict]:
+        """Récupérer les compteurs d'une session"""
+        counts = self._session_counts.get(date_str)
+        return counts_to_dict(counts, 1) if counts is not None else None
+
+    def range_counts(self, start_date: str = None, end_date: str = None,
+                     td_name: str = None) -> Dict:
+        """Compter les statuts d'une plage de dates en O(log sessions)"""
+        return self._get_series(td_name).range_counts(start_date, end_date)
+
+    def student_range_counts(self, student_id: str, start_date: str = None,
+                             end_date: str = None, td_name: str = None) -> Dict:
+        """Compter les statuts d'un étudiant sur une plage de dates en O(log sessions)"""
+        return self._get_student_series(student_id, td_name).range_counts(start_date, end_date)
+
+    def student_points(self, student_id: str, start_date: str = None,
+                       end_date: str = None, td_name: str = None) -> List[Tuple[str, AttendanceStatus]]:
+        """Récupérer les statuts datés d'un étudiant sur une plage de dates"""
+        series = self._get_student_series(student_id, td_name)
+        low, high = series.bounds(start_date, end_date)
+        slots = self._student_slots.get(student_id, {})
+        statuses = list(STATUS_SLOTS)
+        return [(date_str, statuses[slots[date_str]]) for date_str in series.dates[low:high]]
+
+    def session_points(self, start_date: str = None, end_date: str = None,
+                       td_name: str = None) -> List[Tuple[str, Dict]]:
+        """Récupérer les compteurs de chaque session d'une plage de dates"""
+        series = self._get_series(td_name)
+        low, high = series.bounds(start_date, end_date)
+        return [(date_str, counts_to_dict(self._session_counts[date_str], 1))
+                for date_str in series.dates[low:high]]
+
+    def count_arrays(self, student_id: str = None, start_date: str = None, end_date: str = None,
+                     td_name: str = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Récupérer en bloc les dates (datetime64) et les compteurs (n × 3) d'une plage
+
+        Les compteurs par date sont les différences des sommes cumulées,
+        globales ou d'un seul étudiant, sans reparcourir les enregistrements.
+        """
+        if student_id:
+            series = self._get_student_series(student_id, td_name)
+        else:
+            series = self._get_series(td_name)
+        low, high = series.bounds(start_date, end_date)
+        prefix = np.array([cumulative[low:high + 1] for cumulative in series.prefix], dtype=np.int64)
+        return np.array(series.dates[low:high], dtype='datetime64[D]'), np.diff(prefix, axis=1).T
+
+    def bucket_counts(self, start_date: str = None, end_date: str = None,
+                      period: str = 'week', td_name: str = None) -> List[Dict]:
+        """Agréger les statuts par période calendaire en O(périodes)"""
+        series = self._get_series(td_name)
+        if not series.dates:
+            return []
+
+        start_date = start_date or series.dates[0]
+        end_date = end_date or series.dates[-1]
+
+        buckets = []
+        for label, first_day, last_day in iter_periods(start_date, end_date, period):
+            bucket = series.range_counts(max(first_day, start_date), min(last_day, end_date))
+            bucket.update({'period': label, 'start_date': first_day, 'end_date': last_day})
+            buckets.append(bucket)
+        return buckets
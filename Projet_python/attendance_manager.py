@@ -3,6 +3,7 @@ Gestionnaire des Présences
 Module pour marquer et gérer les présences des étudiants
 """
 
+import copy
 import json
 from datetime import datetime, date
 from typing import Dict, List, Optional, Tuple
@@ -14,17 +15,48 @@ class AttendanceStatus(Enum):
     ABSENT = "Absent"
     LATE = "En retard"
 
+def parse_time_seconds(time_str: str) -> Optional[int]:
+    """Convertir une heure 'HH:MM' ou 'HH:MM:SS' en secondes depuis minuit"""
+    if not time_str:
+        return None
+    try:
+        parts = [int(part) for part in time_str.strip().split(':')]
+    except ValueError:
+        return None
+    if len(parts) == 2:
+        parts.append(0)
+    if len(parts) != 3:
+        return None
+    hours, minutes, seconds = parts
+    return hours * 3600 + minutes * 60 + seconds
+
+def seconds_after_start(start_time: str, time_marked: str) -> Optional[int]:
+    """Calculer le délai en secondes entre le début de la session et une heure (None si inconnu)"""
+    start = parse_time_seconds(start_time)
+    marked = parse_time_seconds(time_marked)
+    if start is None or marked is None:
+        return None
+    return max(0, marked - start)
+
+def compute_lateness(start_time: str, time_marked: str, status: AttendanceStatus) -> Optional[int]:
+    """Calculer le retard en secondes d'un enregistrement en retard (None sinon ou si inconnu)"""
+    if status != AttendanceStatus.LATE:
+        return None
+    return seconds_after_start(start_time, time_marked)
+
 class AttendanceRecord:
     """Classe représentant un enregistrement de présence"""
     
     def __init__(self, student_id: str, date_str: str, status: AttendanceStatus,
-                 td_name: str = "", notes: str = "", time_marked: str = None):
+                 td_name: str = "", notes: str = "", time_marked: str = None,
+                 lateness_seconds: Optional[int] = None):
         self.student_id = student_id
         self.date = date_str
         self.status = status
         self.td_name = td_name
         self.notes = notes
         self.time_marked = time_marked or datetime.now().strftime("%H:%M:%S")
+        self.lateness_seconds = lateness_seconds  # Retard par rapport au début de la session
         self.created_timestamp = datetime.now().isoformat()
     
     def to_dict(self) -> Dict:
@@ -36,6 +68,7 @@ class AttendanceRecord:
             'td_name': self.td_name,
             'notes': self.notes,
             'time_marked': self.time_marked,
+            'lateness_seconds': self.lateness_seconds,
             'created_timestamp': self.created_timestamp
         }
     
@@ -54,7 +87,8 @@ class AttendanceRecord:
             status,
             data.get('td_name', ''),
             data.get('notes', ''),
-            data.get('time_marked')
+            data.get('time_marked'),
+            data.get('lateness_seconds')
         )
         record.created_timestamp = data.get('created_timestamp', datetime.now().isoformat())
         return record
@@ -62,10 +96,12 @@ class AttendanceRecord:
 class AttendanceSession:
     """Classe représentant une session de présence (une date + TD)"""
     
-    def __init__(self, date_str: str, td_name: str = "", description: str = ""):
+    def __init__(self, date_str: str, td_name: str = "", description: str = "",
+                 start_time: str = ""):
         self.date = date_str
         self.td_name = td_name
         self.description = description
+        self.start_time = start_time  # Heure de début 'HH:MM', vide si inconnue
         self.created_timestamp = datetime.now().isoformat()
         self.records: Dict[str, AttendanceRecord] = {}
     
@@ -81,12 +117,26 @@ class AttendanceSession:
         """Récupérer tous les enregistrements de la session"""
         return list(self.records.values())
     
+    def update_lateness(self, only_missing: bool = False):
+        """Recalculer le retard des enregistrements à partir de l'heure de début
+        
+        only_missing garde les retards déjà connus des enregistrements en
+        retard ; celui des autres enregistrements est toujours effacé.
+        """
+        for record in self.records.values():
+            if (only_missing and record.lateness_seconds is not None
+                    and record.status == AttendanceStatus.LATE):
+                continue
+            record.lateness_seconds = compute_lateness(self.start_time, record.time_marked,
+                                                       record.status)
+    
     def to_dict(self) -> Dict:
         """Convertir la session en dictionnaire"""
         return {
             'date': self.date,
             'td_name': self.td_name,
             'description': self.description,
+            'start_time': self.start_time,
             'created_timestamp': self.created_timestamp,
             'records': {student_id: record.to_dict() 
                        for student_id, record in self.records.items()}
@@ -98,7 +148,8 @@ class AttendanceSession:
         session = cls(
             data['date'],
             data.get('td_name', ''),
-            data.get('description', '')
+            data.get('description', ''),
+            data.get('start_time', '')
         )
         session.created_timestamp = data.get('created_timestamp', datetime.now().isoformat())
         
@@ -106,6 +157,9 @@ class AttendanceSession:
             record = AttendanceRecord.from_dict(record_data)
             session.records[student_id] = record
         
+        # Compléter le retard des anciens enregistrements (et l'effacer hors retard)
+        session.update_lateness(only_missing=True)
+        
         return session
 
 class AttendanceManager:
@@ -114,6 +168,7 @@ class AttendanceManager:
     def __init__(self):
         self.sessions: Dict[str, AttendanceSession] = {}  # key: date_str
         self._observers = []
+        self.version = 0  # Incrémenté à chaque modification des données
     
     def add_observer(self, observer):
         """Ajouter un observateur pour les changements"""
@@ -121,20 +176,59 @@ class AttendanceManager:
     
     def notify_observers(self, event_type: str, date_str: str = None):
         """Notifier les observateurs des changements"""
+        self.version += 1
         for observer in self._observers:
             if hasattr(observer, 'on_attendance_change'):
                 observer.on_attendance_change(event_type, date_str)
     
-    def create_session(self, date_str: str, td_name: str = "", description: str = "") -> AttendanceSession:
+    def notify_record_change(self, student_id: str, date_str: str,
+                             old_record: Optional[AttendanceRecord],
+                             new_record: Optional[AttendanceRecord]):
+        """Notifier les observateurs du changement d'un enregistrement précis"""
+        for observer in self._observers:
+            if hasattr(observer, 'on_record_change'):
+                observer.on_record_change(student_id, date_str, old_record, new_record)
+    
+    def create_session(self, date_str: str, td_name: str = "", description: str = "",
+                       start_time: str = "") -> AttendanceSession:
         """Créer une nouvelle session de présence"""
         if date_str in self.sessions:
             return self.sessions[date_str]
         
-        session = AttendanceSession(date_str, td_name, description)
+        if start_time and parse_time_seconds(start_time) is None:
+            raise ValueError(f"Heure de début invalide: '{start_time}'")
+        
+        session = AttendanceSession(date_str, td_name, description, start_time)
         self.sessions[date_str] = session
         self.notify_observers('session_created', date_str)
         return session
     
+    def set_session_start_time(self, date_str: str, start_time: str) -> bool:
+        """Définir (ou effacer avec "") l'heure de début d'une session et recalculer les retards
+        
+        Chaque enregistrement dont le retard change est notifié par
+        on_record_change (ancien enregistrement copié avant la mise à jour).
+        """
+        if start_time and parse_time_seconds(start_time) is None:
+            raise ValueError(f"Heure de début invalide: '{start_time}'")
+        
+        # Effacer l'heure d'une session inexistante : rien à créer
+        if not start_time and date_str not in self.sessions:
+            return False
+        
+        session = self.create_session(date_str)
+        if session.start_time == start_time:
+            return False
+        
+        previous = {student_id: copy.copy(record) for student_id, record in session.records.items()}
+        session.start_time = start_time
+        session.update_lateness()
+        for student_id, record in session.records.items():
+            if record.lateness_seconds != previous[student_id].lateness_seconds:
+                self.notify_record_change(student_id, date_str, previous[student_id], record)
+        self.notify_observers('session_updated', date_str)
+        return True
+    
     def get_session(self, date_str: str) -> Optional[AttendanceSession]:
         """Récupérer une session par date"""
         return self.sessions.get(date_str)
@@ -151,15 +245,18 @@ class AttendanceManager:
             self.create_session(date_str, td_name)
         
         session = self.sessions[date_str]
+        old_record = session.get_record(student_id)
         
         # Créer l'enregistrement
         record = AttendanceRecord(student_id, date_str, status, td_name, notes, time_marked)
+        record.lateness_seconds = compute_lateness(session.start_time, record.time_marked, status)
         session.add_record(record)
         
         # Mettre à jour le nom du TD de la session si fourni
         if td_name and not session.td_name:
             session.td_name = td_name
         
+        self.notify_record_change(student_id, date_str, old_record, record)
         self.notify_observers('attendance_marked', date_str)
         return True
     
@@ -220,7 +317,9 @@ class AttendanceManager:
     def delete_session(self, date_str: str) -> bool:
         """Supprimer une session complète"""
         if date_str in self.sessions:
-            del self.sessions[date_str]
+            session = self.sessions.pop(date_str)
+            for student_id, record in session.records.items():
+                self.notify_record_change(student_id, date_str, record, None)
             self.notify_observers('session_deleted', date_str)
             return True
         return False
@@ -229,7 +328,8 @@ class AttendanceManager:
         """Supprimer la présence d'un étudiant pour une date donnée"""
         session = self.get_session(date_str)
         if session and student_id in session.records:
-            del session.records[student_id]
+            record = session.records.pop(student_id)
+            self.notify_record_change(student_id, date_str, record, None)
             self.notify_observers('attendance_deleted', date_str)
             return True
         return False
@@ -0,0 +1,118 @@
+"""
+Calendrier de Présence
+Module rangeant les compteurs par date dans une grille jours de la semaine ×
+semaines, prête à être affichée d'un seul imshow
+"""
+
+from typing import Dict
+import numpy as np
+
+WEEKDAY_LABELS = ('Lun', 'Mar', 'Mer', 'Jeu', 'Ven', 'Sam', 'Dim')
+
+# Valeur affichée dans chaque case, à partir des compteurs [présent, absent, retard]
+METRICS = ('attendance_rate', 'score', 'present', 'absent', 'late', 'total')
+
+METRIC_LABELS = {
+    'attendance_rate': 'Taux de Présence (%)',
+    'score': 'Score (%, retard = moitié)',
+    'present': 'Présents',
+    'absent': 'Absents',
+    'late': 'En retard',
+    'total': 'Marquages'
+}
+
+def metric_values(counts: np.ndarray, metric: str) -> np.ndarray:
+    """Calculer la valeur d'une métrique pour chaque ligne de compteurs (n × 3)
+
+    attendance_rate : (présents + retards) / total en % ;
+    score : comme le taux, un retard comptant pour moitié.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Métrique inconnue: '{metric}'")
+
+    counts = counts.astype(np.float64)
+    present, absent, late = counts[:, 0], counts[:, 1], counts[:, 2]
+    total = present + absent + late
+    if metric in ('attendance_rate', 'score'):
+        attended = present + late if metric == 'attendance_rate' else present + late / 2
+        values = np.full(len(total), np.nan)
+        np.divide(attended * 100, total, out=values, where=total > 0)
+        return values
+    return {'present': present, 'absent': absent, 'late': late, 'total': total}[metric]
+
+def grid_positions(dates: np.ndarray, first_date: str = None, last_date: str = None):
+    """Calculer la ligne (jour de la semaine) et la colonne (semaine) de chaque date
+
+    La grille va de la semaine de first_date à celle de last_date (par défaut
+    la première et la dernière date). Renvoie (lignes, colonnes, premiers
+    jours des semaines), ou None si la plage est vide.
+    """
+    first = np.datetime64(first_date, 'D') if first_date else (dates[0] if len(dates) else None)
+    last = np.datetime64(last_date, 'D') if last_date else (dates[-1] if len(dates) else None)
+    if first is None or last is None or last < first:
+        return None
+
+    # Le 1970-01-01 était un jeudi : jour de la semaine avec lundi = 0
+    first_monday = first.astype(np.int64) - (first.astype(np.int64) + 3) % 7
+    week_count = int((last.astype(np.int64) - first_monday) // 7) + 1
+
+    day_numbers = dates.astype(np.int64)
+    week_starts = (np.datetime64(int(first_monday), 'D') + 7 * np.arange(week_count)).astype(str)
+    return (day_numbers + 3) % 7, (day_numbers - first_monday) // 7, week_starts.tolist()
+
+def calendar_grid(dates: np.ndarray, counts: np.ndarray, metric: str = 'attendance_rate',
+                  first_date: str = None, last_date: str = None) -> Dict:
+    """Construire en un seul passage vectorisé la grille du calendrier
+
+    dates : tableau datetime64[D] trié, counts : compteurs n × 3 alignés.
+    La grille a 7 lignes (lundi à dimanche) et une colonne par semaine ;
+    les jours sans session valent NaN. Avec les mêmes bornes, deux grilles
+    ont la même forme, quel que soit l'étudiant.
+    """
+    positions = grid_positions(dates, first_date, last_date)
+    if positions is None:
+        return {'grid': np.full((7, 0), np.nan), 'week_starts': [], 'metric': metric}
+
+    weekdays, weeks, week_starts = positions
+    grid = np.full((7, len(week_starts)), np.nan)
+    grid[weekdays, weeks] = metric_values(counts, metric)
+    return {'grid': grid, 'week_starts': week_starts, 'metric': metric}
+
+def calendar_counts(dates: np.ndarray, counts: np.ndarray, first_date: str,
+                    last_date: str) -> np.ndarray:
+    """Ranger les compteurs bruts dans une grille 7 × semaines × 3 (zéro sans session)
+
+    Les grilles de compteurs s'additionnent (par exemple sur un groupe)
+    avant d'être converties par grid_values.
+    """
+    positions = grid_positions(dates, first_date, last_date)
+    if positions is None:
+        return np.zeros((7, 0, 3), dtype=np.int32)
+
+    weekdays, weeks, week_starts = positions
+    grid = np.zeros((7, len(week_starts), 3), dtype=np.int32)
+    grid[weekdays, weeks] = counts
+    return grid
+
+def grid_values(count_grid: np.ndarray, metric: str = 'attendance_rate') -> np.ndarray:
+    """Convertir une grille de compteurs en grille de valeurs (NaN sans marquage)"""
+    flat = count_grid.reshape(-1, 3)
+    values = metric_values(flat, metric)
+    values[flat.sum(axis=1) == 0] = np.nan
+    return values.reshape(count_grid.shape[:2])
+
+def month_ticks(week_starts, max_ticks: int = 24):
+    """Positions et libellés (MM/AAAA) des semaines où commence un nouveau mois"""
+    months = [week_start[:7] for week_start in week_starts]
+    positions = [i for i, month in enumerate(months) if i == 0 or month != months[i - 1]]
+    step = max(1, -(-len(positions) // max_ticks))
+    positions = positions[::step]
+    return positions, [f"{months[i][5:]}/{months[i][:4]}" for i in positions]
+
+def heatmap_style(metric: str, grid: np.ndarray):
+    """Palette, bornes et libellé de l'échelle de couleurs d'une métrique"""
+    if metric in ('attendance_rate', 'score'):
+        return 'RdYlGn', 0, 100, METRIC_LABELS[metric]
+    top = np.nanmax(grid) if np.isfinite(grid).any() else 1
+    cmap = 'Reds' if metric in ('absent', 'late') else 'Blues'
+    return cmap, 0, max(float(top), 1.0), METRIC_LABELS[metric]
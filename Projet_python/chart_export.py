@@ -0,0 +1,202 @@
+"""
+Export des Graphiques
+Module générant sans interface (backend Agg) un graphique par étudiant et
+par groupe, rendus en parallèle par un pool de processus
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from calendar_heatmap import calendar_counts, grid_positions, grid_values, month_ticks, heatmap_style, WEEKDAY_LABELS
+
+# Données partagées par toutes les tâches d'un processus (voir _init_worker)
+_shared: Optional[Dict] = None
+
+def safe_filename(name: str) -> str:
+    """Remplacer les caractères non sûrs d'un nom de fichier"""
+    return re.sub(r'[^\w.-]+', '_', name.strip()) or 'sans_nom'
+
+def _init_worker(shared: Dict):
+    """Recevoir une seule fois par processus les statistiques précalculées"""
+    global _shared
+    _shared = shared
+
+def _draw_heatmap(fig, ax, count_grid: np.ndarray, week_starts: List[str]):
+    """Dessiner le calendrier d'une grille de compteurs (un seul imshow)"""
+    grid = grid_values(count_grid)
+    cmap, vmin, vmax, label = heatmap_style('attendance_rate', grid)
+    image = ax.imshow(np.ma.masked_invalid(grid), aspect='auto', cmap=cmap,
+                      vmin=vmin, vmax=vmax, interpolation='nearest')
+    image.cmap.set_bad('#EEEEEE')
+    fig.colorbar(image, ax=ax, label=label)
+
+    ax.set_yticks(range(len(WEEKDAY_LABELS)))
+    ax.set_yticklabels(WEEKDAY_LABELS)
+    positions, labels = month_ticks(week_starts)
+    ax.set_xticks(positions)
+    ax.set_xticklabels(labels, rotation=45, ha='right')
+
+def _save(fig, path: str, dpi: int):
+    """Enregistrer une figure avec le canvas Agg (aucune fenêtre)"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    FigureCanvasAgg(fig)
+    fig.savefig(path, dpi=dpi)
+
+def _render_student(index: int, path: str, dpi: int):
+    """Rendre le graphique d'un étudiant : répartition des statuts et calendrier"""
+    from matplotlib.figure import Figure
+    shared = _shared
+    colors = shared['colors']
+    totals = shared['student_grids'][index].sum(axis=(0, 1))
+
+    fig = Figure(figsize=(14, 4))
+    pie_ax, heatmap_ax = fig.subplots(1, 2, gridspec_kw={'width_ratios': [1, 3]})
+
+    if totals.any():
+        labels = ['Présent', 'Absent', 'En retard']
+        status_colors = [colors['present'], colors['absent'], colors['late']]
+        filtered = [(label, size, color) for label, size, color in zip(labels, totals, status_colors) if size > 0]
+        labels, sizes, status_colors = zip(*filtered)
+        pie_ax.pie(sizes, labels=labels, colors=status_colors, autopct='%1.1f%%', startangle=90)
+    pie_ax.set_title('Répartition', fontweight='bold')
+
+    _draw_heatmap(fig, heatmap_ax, shared['student_grids'][index], shared['week_starts'])
+    heatmap_ax.set_title(f"Calendrier des Présences - {shared['student_names'][index]}",
+                         fontsize=12, fontweight='bold')
+
+    fig.tight_layout()
+    _save(fig, path, dpi)
+
+def _render_group(group_index: int, path: str, dpi: int):
+    """Rendre le graphique d'un groupe : taux de chaque membre et calendrier du groupe"""
+    from matplotlib.figure import Figure
+    shared = _shared
+    members = shared['group_members'][group_index]
+    grids = shared['student_grids'][members]
+
+    # Taux de présence de chaque membre, du meilleur au moins bon
+    totals = grids.sum(axis=(1, 2))
+    marked = totals.sum(axis=1)
+    rates = np.where(marked > 0, (totals[:, 0] + totals[:, 2]) * 100 / np.maximum(marked, 1), 0.0)
+    order = np.argsort(-rates, kind='stable')
+    names = [shared['student_names'][members[i]] for i in order]
+
+    fig = Figure(figsize=(12, 8))
+    bar_ax, heatmap_ax = fig.subplots(2, 1)
+
+    bar_ax.bar(range(len(names)), rates[order], color=shared['colors']['primary'], alpha=0.7)
+    bar_ax.set_xticks(range(len(names)))
+    bar_ax.set_xticklabels(names, rotation=45, ha='right')
+    bar_ax.set_ylabel('Taux de Présence (%)', fontweight='bold')
+    bar_ax.set_ylim(0, 105)
+    bar_ax.set_title(f"Groupe {shared['groups'][group_index]} - Taux de Présence par Étudiant",
+                     fontsize=12, fontweight='bold')
+
+    _draw_heatmap(fig, heatmap_ax, grids.sum(axis=0), shared['week_starts'])
+    heatmap_ax.set_title('Calendrier du Groupe', fontsize=12, fontweight='bold')
+
+    fig.tight_layout()
+    _save(fig, path, dpi)
+
+RENDERERS = {'student': _render_student, 'group': _render_group}
+
+def _render(task) -> Optional[str]:
+    """Exécuter une tâche (type, indice, chemin, dpi) ; None en cas d'erreur"""
+    kind, index, path, dpi = task
+    try:
+        RENDERERS[kind](index, path, dpi)
+        return path
+    except Exception as e:
+        print(f"Erreur lors de l'export de {path}: {e}")
+        return None
+
+class ChartExporter:
+    """Export en lot des graphiques par étudiant et par groupe
+
+    Les statistiques sont précalculées une fois dans le processus principal
+    sous forme de tableaux NumPy compacts (compteurs par jour, par étudiant).
+    Chaque processus du pool les reçoit une seule fois à son démarrage ;
+    une tâche ne transporte ensuite qu'un indice et un chemin de fichier.
+    """
+
+    def __init__(self, statistics_manager, max_workers: int = None):
+        self.statistics_manager = statistics_manager
+        self.student_manager = statistics_manager.student_manager
+        self.max_workers = max_workers
+
+    def prepare(self, start_date: str = None, end_date: str = None, td_name: str = None) -> Dict:
+        """Précalculer les grilles de compteurs (étudiants × 7 × semaines × 3)"""
+        index = self.statistics_manager.index
+        session_dates = index.get_dates(td_name)
+        first_date = start_date or (session_dates[0] if session_dates else None)
+        last_date = end_date or (session_dates[-1] if session_dates else None)
+
+        students = sorted(self.student_manager.get_all_students(), key=lambda x: x.get_full_name())
+        grids = [calendar_counts(*index.count_arrays(student.student_id, start_date, end_date, td_name),
+                                 first_date, last_date)
+                 for student in students]
+
+        positions = grid_positions(np.empty(0, dtype='datetime64[D]'), first_date, last_date)
+        week_starts = positions[2] if positions else []
+
+        groups: Dict[str, List[int]] = {}
+        for i, student in enumerate(students):
+            groups.setdefault(student.group.strip() or 'Sans groupe', []).append(i)
+
+        return {
+            'student_ids': [student.student_id for student in students],
+            'student_names': [student.get_full_name() for student in students],
+            'student_grids': (np.stack(grids).astype(np.int16) if grids
+                              else np.zeros((0, 7, len(week_starts), 3), dtype=np.int16)),
+            'week_starts': week_starts,
+            'groups': list(groups),
+            'group_members': [np.array(members) for members in groups.values()],
+            'colors': dict(self.statistics_manager.colors)
+        }
+
+    def export(self, output_dir: str, students: bool = True, groups: bool = True,
+               start_date: str = None, end_date: str = None, td_name: str = None,
+               dpi: int = 100,
+               progress: Optional[Callable[[int, int], None]] = None) -> List[str]:
+        """Écrire un PNG par étudiant et/ou par groupe, renvoyer les fichiers créés
+
+        progress(graphiques rendus, total) est appelé après chaque graphique ;
+        une exception levée par progress interrompt l'export.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        shared = self.prepare(start_date, end_date, td_name)
+        if not shared['week_starts']:
+            return []
+
+        tasks = []
+        if students:
+            for i, student_id in enumerate(shared['student_ids']):
+                tasks.append(('student', i, os.path.join(output_dir, f"etudiant_{safe_filename(student_id)}.png"), dpi))
+        if groups:
+            for i, group in enumerate(shared['groups']):
+                tasks.append(('group', i, os.path.join(output_dir, f"groupe_{safe_filename(group)}.png"), dpi))
+
+        workers = min(self.max_workers or os.cpu_count() or 1, len(tasks))
+        results = []
+        if workers <= 1:
+            # Rendu dans le processus courant
+            _init_worker(shared)
+            for task in tasks:
+                results.append(_render(task))
+                if progress:
+                    progress(len(results), len(tasks))
+        else:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                           initargs=(shared,))
+            try:
+                for path in executor.map(_render, tasks, chunksize=chunksize):
+                    results.append(path)
+                    if progress:
+                        progress(len(results), len(tasks))
+            finally:
+                # Interruption : les tâches pas encore démarrées sont abandonnées
+                executor.shutdown(cancel_futures=True)
+        return [path for path in results if path]
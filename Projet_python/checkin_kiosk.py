@@ -0,0 +1,285 @@
+"""
+Borne d'Accueil
+Module du mode borne : enregistrement en plein écran des arrivées par badge
+(lecteur en émulation clavier) ou saisie de l'ID, avec statut présent ou en
+retard déduit de l'heure de début de la session
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, Optional, Tuple
+from attendance_manager import AttendanceStatus, seconds_after_start
+
+# Couleurs du message de retour selon le résultat
+FEEDBACK_COLORS = {
+    'present': '#2e7d32',
+    'late': '#ef6c00',
+    'already': '#1565c0',
+    'unknown': '#c62828'
+}
+
+class CheckInResult:
+    """Résultat de la lecture d'un badge"""
+
+    def __init__(self, badge: str, student=None, status: AttendanceStatus = None,
+                 time_marked: str = "", lateness_seconds: Optional[int] = None,
+                 already_checked_in: bool = False):
+        self.badge = badge
+        self.student = student
+        self.status = status
+        self.time_marked = time_marked
+        self.lateness_seconds = lateness_seconds
+        self.already_checked_in = already_checked_in
+
+    @property
+    def kind(self) -> str:
+        """Type de retour : 'present', 'late', 'already' ou 'unknown'"""
+        if self.student is None:
+            return 'unknown'
+        if self.already_checked_in:
+            return 'already'
+        return 'late' if self.status == AttendanceStatus.LATE else 'present'
+
+    def get_message(self) -> str:
+        """Message affiché sur la borne"""
+        kind = self.kind
+        if kind == 'unknown':
+            return f"Badge inconnu : {self.badge}"
+        name = self.student.get_full_name()
+        if kind == 'already':
+            return f"{name} — déjà enregistré(e) ({self.status.value.lower()})"
+        if kind == 'late':
+            minutes = (self.lateness_seconds or 0) // 60
+            return f"{name} — En retard (+{minutes} min)"
+        return f"Bienvenue {name} — Présent"
+
+class CheckInDesk:
+    """Enregistrement des arrivées d'une session (sans interface)
+
+    Un badge est résolu en O(1) : d'abord tel quel dans le dictionnaire des
+    étudiants, puis sans tenir compte de la casse dans un index reconstruit
+    seulement si les étudiants ont changé (version du gestionnaire). Une
+    arrivée après l'heure de début plus le délai de grâce est marquée en
+    retard ; sans heure de début, toute arrivée est marquée présente.
+    """
+
+    def __init__(self, student_manager, attendance_manager, date_str: str,
+                 td_name: str = "", grace_seconds: int = 0):
+        self.student_manager = student_manager
+        self.attendance_manager = attendance_manager
+        self.date = date_str
+        self.td_name = td_name
+        self.grace_seconds = grace_seconds
+        self._badges: Dict[str, str] = {}
+        self._badges_version = None
+
+    def resolve(self, badge: str):
+        """Retrouver l'étudiant d'un badge ou d'un ID saisi (None si inconnu)"""
+        code = badge.strip()
+        if not code:
+            return None
+        student = self.student_manager.get_student(code)
+        if student is not None:
+            return student
+
+        if self._badges_version != self.student_manager.version:
+            self._badges = {student_id.lower(): student_id
+                            for student_id in self.student_manager.students}
+            self._badges_version = self.student_manager.version
+        student_id = self._badges.get(code.lower())
+        return self.student_manager.get_student(student_id) if student_id else None
+
+    def get_start_time(self) -> str:
+        """Heure de début de la session ('' si non définie)"""
+        session = self.attendance_manager.get_session(self.date)
+        return session.start_time if session else ""
+
+    def status_for(self, time_marked: str) -> AttendanceStatus:
+        """Statut d'une arrivée à l'heure donnée"""
+        lateness = seconds_after_start(self.get_start_time(), time_marked)
+        if lateness is not None and lateness > self.grace_seconds:
+            return AttendanceStatus.LATE
+        return AttendanceStatus.PRESENT
+
+    def check_in(self, badge: str, time_marked: str = None) -> CheckInResult:
+        """Enregistrer une arrivée (à appeler sous le verrou d'écriture)
+
+        Un étudiant déjà marqué présent ou en retard garde sa première
+        arrivée ; un étudiant marqué absent est corrigé.
+        """
+        time_marked = time_marked or datetime.now().strftime("%H:%M:%S")
+        student = self.resolve(badge)
+        if student is None:
+            return CheckInResult(badge.strip(), time_marked=time_marked)
+
+        session = self.attendance_manager.get_session(self.date)
+        record = session.get_record(student.student_id) if session else None
+        if record is not None and record.status != AttendanceStatus.ABSENT:
+            return CheckInResult(badge.strip(), student, record.status, record.time_marked,
+                                 record.lateness_seconds, already_checked_in=True)
+
+        status = self.status_for(time_marked)
+        self.attendance_manager.mark_attendance(student.student_id, self.date, status,
+                                                self.td_name, time_marked=time_marked)
+        record = self.attendance_manager.get_session(self.date).get_record(student.student_id)
+        return CheckInResult(badge.strip(), student, status, time_marked, record.lateness_seconds)
+
+class CheckInKiosk:
+    """Fenêtre plein écran de la borne d'accueil
+
+    Chaque validation (touche Entrée, envoyée par le lecteur de badge après
+    le code) vide le champ immédiatement et met l'arrivée en file avec son
+    heure de lecture. La file est traitée par paquets au passage à vide de
+    la boucle Tk, sous le verrou d'écriture (write), si bien qu'une rafale
+    de lectures ne bloque ni la saisie ni l'affichage. Échap ferme la borne.
+    """
+
+    BATCH_SIZE = 50
+    RECENT_COUNT = 15
+
+    def __init__(self, parent, desk: CheckInDesk,
+                 write: Optional[Callable] = None,
+                 on_close: Optional[Callable[[int], None]] = None):
+        self.desk = desk
+        self.write = write or (lambda fn, *args: fn(*args))
+        self.on_close = on_close
+        self.check_in_count = 0
+        self.late_count = 0
+        self._arrivals: Deque[Tuple[str, str]] = deque()
+        self._process_id = None
+        self._closing = False
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Borne d'Accueil")
+        self.window.attributes('-fullscreen', True)
+        self.window.configure(bg='white')
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.window.bind('<Escape>', lambda e: self.close())
+
+        self.create_widgets()
+        self.entry.focus_force()
+
+    def create_widgets(self):
+        """Créer le contenu de la borne"""
+        main_frame = tk.Frame(self.window, bg='white', padx=40, pady=30)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        start_time = self.desk.get_start_time() or "non définie"
+        tk.Label(main_frame, text="Enregistrement des Arrivées", bg='white',
+                 font=('Arial', 32, 'bold')).pack(pady=(0, 5))
+        tk.Label(main_frame, bg='white', font=('Arial', 16),
+                 text=f"{self.desk.td_name or 'Session'} du {self.desk.date} — début : {start_time}"
+                 ).pack()
+
+        tk.Label(main_frame, text="Passez votre badge ou saisissez votre ID puis Entrée",
+                 bg='white', font=('Arial', 16)).pack(pady=(30, 5))
+        self.entry_var = tk.StringVar()
+        self.entry = ttk.Entry(main_frame, textvariable=self.entry_var, font=('Arial', 24),
+                               width=30, justify=tk.CENTER)
+        self.entry.pack(pady=5)
+        self.entry.bind('<Return>', self.on_scan)
+        self.entry.bind('<KP_Enter>', self.on_scan)
+
+        self.feedback_label = tk.Label(main_frame, text="", bg='white', font=('Arial', 28, 'bold'))
+        self.feedback_label.pack(pady=25)
+
+        self.counter_label = tk.Label(main_frame, text="", bg='white', font=('Arial', 14))
+        self.counter_label.pack()
+
+        tk.Label(main_frame, text="Dernières arrivées", bg='white',
+                 font=('Arial', 14, 'bold')).pack(pady=(25, 5))
+        self.recent_list = tk.Listbox(main_frame, height=self.RECENT_COUNT, font=('Arial', 14),
+                                      activestyle='none', highlightthickness=0)
+        self.recent_list.pack(fill=tk.BOTH, expand=True)
+
+        tk.Label(main_frame, text="Échap : quitter le mode borne", bg='white',
+                 font=('Arial', 10)).pack(pady=(10, 0))
+        self.update_counter()
+
+    def on_scan(self, event=None):
+        """Mettre une lecture en file et vider le champ (retour immédiat à la saisie)"""
+        code = self.entry_var.get()
+        self.entry_var.set("")
+        if code.strip() and not self._closing:
+            self._arrivals.append((code, datetime.now().strftime("%H:%M:%S")))
+            self.schedule_processing()
+        return "break"
+
+    def schedule_processing(self):
+        """Programmer le traitement de la file au prochain passage à vide"""
+        if self._process_id is None:
+            self._process_id = self.window.after_idle(self.process_arrivals)
+
+    def process_arrivals(self):
+        """Traiter un paquet d'arrivées sous le verrou d'écriture"""
+        self._process_id = None
+        self.write(self._process_batch)
+
+    def _process_batch(self):
+        """Enregistrer au plus BATCH_SIZE arrivées puis rendre la main à Tk"""
+        if self._closing:
+            return
+        result = None
+        for _ in range(min(self.BATCH_SIZE, len(self._arrivals))):
+            badge, time_marked = self._arrivals.popleft()
+            result = self.desk.check_in(badge, time_marked)
+            self.add_recent(result)
+
+        if result is not None:
+            self.show_feedback(result)
+        self.update_counter()
+        if self._arrivals:
+            # Rendre la main à la boucle Tk entre deux paquets
+            self._process_id = self.window.after(1, self.process_arrivals)
+
+    def show_feedback(self, result: CheckInResult):
+        """Afficher le résultat de la dernière lecture"""
+        kind = result.kind
+        self.feedback_label.config(text=result.get_message(), fg=FEEDBACK_COLORS[kind])
+        if kind == 'unknown':
+            self.window.bell()
+
+    def add_recent(self, result: CheckInResult):
+        """Ajouter une lecture en tête de la liste des dernières arrivées"""
+        kind = result.kind
+        if kind in ('present', 'late'):
+            self.check_in_count += 1
+            if kind == 'late':
+                self.late_count += 1
+
+        self.recent_list.insert(0, f"{result.time_marked}  {result.get_message()}")
+        self.recent_list.itemconfig(0, fg=FEEDBACK_COLORS[kind])
+        if self.recent_list.size() > self.RECENT_COUNT:
+            self.recent_list.delete(self.RECENT_COUNT, tk.END)
+
+    def update_counter(self):
+        """Afficher le nombre d'arrivées enregistrées et la file d'attente"""
+        text = f"Arrivées enregistrées : {self.check_in_count} (dont {self.late_count} en retard)"
+        if self._arrivals:
+            text += f" — en attente : {len(self._arrivals)}"
+        self.counter_label.config(text=text)
+
+    def close(self):
+        """Traiter les lectures restantes puis fermer la borne"""
+        if self._closing:
+            return
+        self._closing = True
+        if self._process_id is not None:
+            self.window.after_cancel(self._process_id)
+            self._process_id = None
+        if self._arrivals:
+            self.write(self._finish)
+        else:
+            self._finish()
+
+    def _finish(self):
+        """Vider la file et détruire la fenêtre"""
+        while self._arrivals:
+            badge, time_marked = self._arrivals.popleft()
+            if self.desk.check_in(badge, time_marked).kind in ('present', 'late'):
+                self.check_in_count += 1
+        self.window.destroy()
+        if self.on_close:
+            self.on_close(self.check_in_count)
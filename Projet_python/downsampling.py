@@ -0,0 +1,88 @@
+"""
+Réduction des Séries
+Module réduisant les longues séries de sessions avant affichage :
+LTTB pour les courbes, agrégation par paquets pour les barres
+"""
+
+from typing import Dict, Sequence
+import numpy as np
+
+# Densité d'affichage : un point de courbe tous les 2 pixels, une barre tous les 8 pixels
+LINE_PIXELS_PER_POINT = 2
+BAR_PIXELS_PER_BUCKET = 8
+
+def point_budget(width_pixels: int, pixels_per_point: int = LINE_PIXELS_PER_POINT) -> int:
+    """Nombre maximal de points utiles pour une largeur d'affichage donnée"""
+    return max(3, int(width_pixels) // pixels_per_point)
+
+def lttb_indices(x: Sequence[float], y: Sequence[float], threshold: int) -> np.ndarray:
+    """Choisir threshold points par Largest-Triangle-Three-Buckets
+
+    Le premier et le dernier point sont conservés ; dans chaque paquet
+    intermédiaire, on garde le point formant le plus grand triangle avec le
+    point retenu précédemment et la moyenne du paquet suivant, ce qui
+    préserve les pics et les creux. Renvoie les indices retenus, croissants.
+    """
+    count = len(x)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # threshold - 2 paquets entre le premier et le dernier point
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+    next_starts = edges[1:]
+    next_sizes = np.diff(np.append(next_starts, count))
+    average_x = (np.add.reduceat(x, next_starts) / next_sizes).tolist()
+    average_y = (np.add.reduceat(y, next_starts) / next_sizes).tolist()
+
+    # Boucle séquentielle (chaque choix dépend du précédent) sur des listes Python
+    xs, ys = x.tolist(), y.tolist()
+    edges = edges.tolist()
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = count - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        px, py = xs[previous], ys[previous]
+        ax, ay = average_x[bucket], average_y[bucket]
+
+        # Aire (au facteur 2 près) des triangles (précédent, candidat, moyenne suivante)
+        best_area = -1.0
+        for i in range(edges[bucket], edges[bucket + 1]):
+            area = abs((px - ax) * (ys[i] - py) - (px - xs[i]) * (ay - py))
+            if area > best_area:
+                best_area = area
+                previous = i
+        selected[bucket + 1] = previous
+
+    return selected
+
+def aggregate_buckets(values: Sequence[float], max_buckets: int) -> Dict[str, np.ndarray]:
+    """Regrouper des valeurs consécutives en au plus max_buckets paquets
+
+    Renvoie pour chaque paquet ses indices de début et de fin (exclue), la
+    moyenne, le minimum et le maximum des valeurs.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    count = len(values)
+    if count == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return {'starts': empty, 'ends': empty, 'mean': np.empty(0),
+                'min': np.empty(0), 'max': np.empty(0)}
+
+    if count <= max_buckets:
+        starts = np.arange(count)
+    else:
+        starts = np.unique(np.linspace(0, count, max(1, max_buckets), endpoint=False).astype(np.int64))
+    ends = np.append(starts[1:], count)
+
+    return {
+        'starts': starts,
+        'ends': ends,
+        'mean': np.add.reduceat(values, starts) / (ends - starts),
+        'min': np.minimum.reduceat(values, starts),
+        'max': np.maximum.reduceat(values, starts)
+    }
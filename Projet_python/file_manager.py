@@ -10,6 +10,7 @@ from datetime import datetime
 from typing import Dict, Optional, List
 import tkinter as tk
 from tkinter import filedialog, messagebox
+from streak_tracker import DEFAULT_RISK_RULES, check_window_size
 
 class FileManager:
     """Gestionnaire pour les opérations de fichiers"""
@@ -34,6 +35,10 @@ class FileManager:
             'backup_enabled': True,
             'backup_count': 5,
             'last_backup': None,
+            'risk_window_size': 5,  # Nombre de sessions pour le taux récent
+            'risk_rules': [rule.to_dict() for rule in DEFAULT_RISK_RULES],
+            'checkin_grace_minutes': 5,  # Délai avant qu'une arrivée à la borne soit en retard
+            'attendance_page_size': 200,  # Étudiants par page de la liste des présences
             'created_date': datetime.now().isoformat()
         }
         
@@ -56,6 +61,7 @@ class FileManager:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     loaded_config = json.load(f)
                     self.config.update(loaded_config)
+                    self._check_risk_config()
                     print("Configuration chargée avec succès")
             else:
                 print("Fichier de configuration non trouvé, utilisation des valeurs par défaut")
@@ -66,6 +72,14 @@ class FileManager:
         
         return self.config
     
+    def _check_risk_config(self):
+        """Remplacer une taille de fenêtre de détection invalide par la valeur par défaut"""
+        try:
+            check_window_size(self.config.get('risk_window_size'))
+        except ValueError as e:
+            print(f"{e}, valeur par défaut utilisée")
+            self.config['risk_window_size'] = self.default_config['risk_window_size']
+    
     def save_config(self) -> bool:
         """Sauvegarder la configuration"""
         try:
@@ -261,14 +275,18 @@ class FileManager:
         
         return backups
     
-    def restore_backup(self, backup_name: str) -> bool:
-        """Restaurer une sauvegarde"""
+    def read_backup(self, backup_name: str) -> Optional[Dict]:
+        """Remettre en place les fichiers d'une sauvegarde et les lire, sans les charger
+
+        Ne notifie aucun observateur : peut s'exécuter dans une tâche de fond.
+        Les données lues sont ensuite chargées par apply_data (thread Tk).
+        """
         try:
             backup_path = os.path.join(self.backup_dir, backup_name)
             
             if not os.path.exists(backup_path):
                 print(f"Sauvegarde non trouvée: {backup_name}")
-                return False
+                return None
             
             # Créer une sauvegarde de sécurité avant la restauration
             self.create_backup("before_restore")
@@ -285,9 +303,28 @@ class FileManager:
                 if os.path.exists(backup_file_path):
                     shutil.copy2(backup_file_path, target_file)
             
-            # Recharger les données
-            self.load_all_data()
+            # Relire les fichiers restaurés
+            data = {}
+            for key, data_file in (('config', self.config_file), ('students', self.students_file),
+                                   ('attendance', self.attendance_file)):
+                if os.path.exists(data_file):
+                    with open(data_file, 'r', encoding='utf-8') as f:
+                        data[key] = json.load(f)
+            return data
             
+        except Exception as e:
+            print(f"Erreur lors de la restauration: {e}")
+            return None
+    
+    def restore_backup(self, backup_name: str) -> bool:
+        """Restaurer une sauvegarde"""
+        data = self.read_backup(backup_name)
+        if data is None:
+            return False
+        
+        try:
+            # Recharger les données
+            self.apply_data(data)
             print(f"Sauvegarde restaurée: {backup_name}")
             return True
             
@@ -322,27 +359,49 @@ class FileManager:
             print(f"Erreur lors de l'export: {e}")
             return False
     
-    def import_data(self, import_path: str) -> bool:
-        """Importer des données depuis un fichier"""
+    def read_import(self, import_path: str) -> Optional[Dict]:
+        """Lire un fichier d'import (après une sauvegarde de sécurité), sans le charger
+
+        Ne notifie aucun observateur : peut s'exécuter dans une tâche de fond.
+        """
         try:
             # Créer une sauvegarde avant l'import
             self.create_backup("before_import")
             
             with open(import_path, 'r', encoding='utf-8') as f:
-                import_data = json.load(f)
+                return json.load(f)
             
-            # Importer les données
-            if 'students' in import_data:
-                self.student_manager.load_from_dict(import_data['students'])
-            
-            if 'attendance' in import_data:
-                self.attendance_manager.load_from_dict(import_data['attendance'])
-            
-            if 'config' in import_data:
-                # Fusionner la configuration importée avec la configuration actuelle
-                for key, value in import_data['config'].items():
-                    if key not in ['created_date', 'last_backup']:  # Préserver certaines valeurs locales
-                        self.config[key] = value
+        except Exception as e:
+            print(f"Erreur lors de l'import: {e}")
+            return None
+    
+    def apply_data(self, data: Dict, keep_local_config: bool = False):
+        """Charger des données lues dans les gestionnaires (notifie les observateurs)
+        
+        keep_local_config : fusionner la configuration en préservant les
+        valeurs propres à cette installation (import).
+        """
+        if 'students' in data:
+            self.student_manager.load_from_dict(data['students'])
+        
+        if 'attendance' in data:
+            self.attendance_manager.load_from_dict(data['attendance'])
+        
+        if 'config' in data:
+            for key, value in data['config'].items():
+                if not keep_local_config or key not in ['created_date', 'last_backup']:
+                    self.config[key] = value
+            self._check_risk_config()
+    
+    def import_data(self, import_path: str) -> bool:
+        """Importer des données depuis un fichier"""
+        import_data = self.read_import(import_path)
+        if import_data is None:
+            return False
+        
+        try:
+            # Importer les données (configuration fusionnée avec la configuration actuelle)
+            self.apply_data(import_data, keep_local_config=True)
             
             # Sauvegarder les données importées
             self.save_all_data()
@@ -383,17 +442,26 @@ class FileManager:
         
         return info
     
-    def setup_auto_save(self, root_window):
-        """Configurer la sauvegarde automatique"""
+    def setup_auto_save(self, root_window, task_runner=None):
+        """Configurer la sauvegarde automatique
+        
+        Avec un task_runner, chaque sauvegarde s'exécute en tâche de fond.
+        """
         if self.config.get('auto_save', True):
             interval = self.config.get('auto_save_interval', 300) * 1000  # Convertir en millisecondes
             
-            def auto_save():
+            def save(task=None):
                 try:
                     self.save_all_data()
                     print("Sauvegarde automatique effectuée")
                 except Exception as e:
                     print(f"Erreur lors de la sauvegarde automatique: {e}")
+            
+            def auto_save():
+                if task_runner is not None:
+                    task_runner.submit(save, description="Sauvegarde automatique", key='auto_save')
+                else:
+                    save()
                 
                 # Programmer la prochaine sauvegarde
                 self._auto_save_job = root_window.after(interval, auto_save)
@@ -0,0 +1,179 @@
+"""
+Analyse des Retards
+Module calculant en bloc, avec NumPy, la distribution des retards par
+étudiant, par groupe et par TD (percentiles, histogrammes, tendances)
+"""
+
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from attendance_manager import AttendanceStatus
+
+# Tranches par défaut de l'histogramme (en secondes)
+DEFAULT_BINS = (0, 60, 300, 600, 900, 1800, 3600)
+
+DIMENSIONS = ('student', 'group', 'td')
+
+class LatenessAnalytics:
+    """Analyse vectorisée des retards sur tout l'historique
+
+    Les retards (entiers, en secondes) sont rangés une seule fois dans des
+    colonnes NumPy, reconstruites uniquement après un changement de données.
+    Toutes les agrégations sont ensuite faites en bloc, sans boucle Python
+    sur les enregistrements.
+    """
+
+    def __init__(self, student_manager, attendance_manager):
+        self.student_manager = student_manager
+        self.attendance_manager = attendance_manager
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+        self._labels: Dict[str, List[str]] = {}
+
+        self.student_manager.add_observer(self)
+        self.attendance_manager.add_observer(self)
+
+    def on_attendance_change(self, event_type, date_str=None):
+        """Invalider les colonnes après un changement de présence"""
+        self._columns = None
+
+    def on_student_change(self, event_type, student_id=None):
+        """Invalider les colonnes après un changement d'étudiant (groupes)"""
+        self._columns = None
+
+    def _build_columns(self):
+        """Ranger les retards connus dans des colonnes NumPy en un seul passage"""
+        groups = {student.student_id: student.group.strip()
+                  for student in self.student_manager.get_all_students()}
+        codes = {dimension: {} for dimension in DIMENSIONS}
+
+        def code(dimension, value):
+            table = codes[dimension]
+            if value not in table:
+                table[value] = len(table)
+            return table[value]
+
+        student_codes, group_codes, td_codes = [], [], []
+        dates, lateness, late_flags = [], [], []
+
+        for session in self.attendance_manager.get_all_sessions():
+            td_code = code('td', session.td_name.strip())
+            for student_id, record in session.records.items():
+                if record.lateness_seconds is None or student_id not in groups:
+                    continue
+                student_codes.append(code('student', student_id))
+                group_codes.append(code('group', groups[student_id]))
+                td_codes.append(td_code)
+                dates.append(session.date)
+                lateness.append(record.lateness_seconds)
+                late_flags.append(record.status == AttendanceStatus.LATE)
+
+        self._columns = {
+            'student': np.array(student_codes, dtype=np.int32),
+            'group': np.array(group_codes, dtype=np.int32),
+            'td': np.array(td_codes, dtype=np.int32),
+            'date': np.array(dates, dtype='datetime64[D]'),
+            'lateness': np.array(lateness, dtype=np.int64),
+            'late': np.array(late_flags, dtype=bool)
+        }
+        self._labels = {dimension: list(table) for dimension, table in codes.items()}
+
+    def _select(self, by: Optional[str], late_only: bool):
+        """Récupérer les codes de regroupement, les retards et les libellés"""
+        if self._columns is None:
+            self._build_columns()
+        if by is not None and by not in DIMENSIONS:
+            raise ValueError(f"Regroupement inconnu: '{by}'")
+
+        columns = self._columns
+        mask = columns['late'] if late_only else slice(None)
+        values = columns['lateness'][mask]
+        if by is None:
+            keys = np.zeros(len(values), dtype=np.int32)
+            labels = ['all']
+        else:
+            keys = columns[by][mask]
+            labels = self._labels[by]
+        return keys, values, labels, columns['date'][mask]
+
+    def percentiles(self, by: str = None, q: Sequence[float] = (50, 90, 95),
+                    late_only: bool = True) -> Dict[str, Dict]:
+        """Calculer nombre, moyenne et percentiles du retard pour chaque groupe
+
+        by vaut 'student', 'group', 'td' ou None (tout l'historique).
+        """
+        keys, values, labels, _ = self._select(by, late_only)
+        if not len(values):
+            return {}
+
+        # Trier par groupe puis par retard, puis interpoler dans chaque segment
+        order = np.lexsort((values, keys))
+        sorted_values = values[order].astype(np.float64)
+        counts = np.bincount(keys, minlength=len(labels))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        present = counts > 0
+
+        results = {'count': counts[present],
+                   'mean': np.bincount(keys, weights=values, minlength=len(labels))[present] / counts[present]}
+        for quantile in q:
+            position = starts[present] + (counts[present] - 1) * (quantile / 100)
+            low = np.floor(position).astype(np.int64)
+            high = np.ceil(position).astype(np.int64)
+            fraction = position - low
+            results[f'p{quantile:g}'] = sorted_values[low] + (sorted_values[high] - sorted_values[low]) * fraction
+
+        names = [label for label, used in zip(labels, present) if used]
+        return {name: {metric: round(float(column[i]), 2) if metric != 'count' else int(column[i])
+                       for metric, column in results.items()}
+                for i, name in enumerate(names)}
+
+    def histogram(self, by: str = None, bins: Sequence[int] = DEFAULT_BINS,
+                  late_only: bool = True) -> Dict:
+        """Répartir les retards par tranches (la dernière tranche est ouverte)"""
+        keys, values, labels, _ = self._select(by, late_only)
+        edges = np.asarray(bins, dtype=np.int64)
+        bin_count = len(edges)
+
+        # Tranche i : edges[i] <= retard < edges[i + 1]
+        bin_index = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, bin_count - 1)
+        flat = np.bincount(keys * bin_count + bin_index, minlength=len(labels) * bin_count)
+        table = flat.reshape(len(labels), bin_count)
+
+        return {
+            'edges': [int(edge) for edge in edges],
+            'counts': {label: table[i].tolist() for i, label in enumerate(labels) if table[i].any()}
+        }
+
+    def trend(self, period: str = 'week', by: str = None, late_only: bool = True) -> Dict[str, Dict]:
+        """Calculer l'évolution du retard moyen par semaine ou par mois"""
+        keys, values, labels, dates = self._select(by, late_only)
+        if not len(values):
+            return {}
+
+        if period == 'week':
+            # Le 1970-01-01 était un jeudi : ramener chaque date au lundi
+            day_numbers = dates.astype(np.int64)
+            period_starts = (dates - ((day_numbers + 3) % 7)).astype('datetime64[D]')
+        elif period == 'month':
+            period_starts = dates.astype('datetime64[M]').astype('datetime64[D]')
+        elif period == 'day':
+            period_starts = dates
+        else:
+            raise ValueError(f"Période inconnue: '{period}'")
+
+        unique_periods, period_codes = np.unique(period_starts, return_inverse=True)
+        cell = keys.astype(np.int64) * len(unique_periods) + period_codes
+        size = len(labels) * len(unique_periods)
+        counts = np.bincount(cell, minlength=size).reshape(len(labels), -1)
+        sums = np.bincount(cell, weights=values, minlength=size).reshape(len(labels), -1)
+
+        period_labels = [str(start) for start in unique_periods]
+        results = {}
+        for i, label in enumerate(labels):
+            used = counts[i] > 0
+            if not used.any():
+                continue
+            results[label] = {
+                'periods': [period_labels[j] for j in np.flatnonzero(used)],
+                'counts': counts[i][used].tolist(),
+                'mean_seconds': np.round(sums[i][used] / counts[i][used], 2).tolist()
+            }
+        return results
@@ -0,0 +1,105 @@
+"""
+Onglets Différés
+Module construisant les onglets des notebooks à leur première sélection et
+reportant les rafraîchissements des onglets cachés jusqu'à leur affichage
+"""
+
+from tkinter import ttk
+from typing import Callable, Dict, Optional
+
+class LazyTab:
+    """Onglet d'un notebook : cadre vide, constructeur et rafraîchissements en attente"""
+
+    def __init__(self, name: str, notebook, frame, builder: Callable, parent: Optional[str]):
+        self.name = name
+        self.notebook = notebook
+        self.frame = frame
+        self.builder = builder
+        self.parent = parent
+        self.built = False
+        # Rafraîchissements en attente, sans doublon, dans l'ordre des demandes
+        self.pending: Dict[Callable, None] = {}
+
+class LazyTabs:
+    """Onglets (éventuellement imbriqués) construits à leur première sélection
+
+    Chaque onglet est ajouté vide à son notebook ; son constructeur reçoit
+    le cadre de l'onglet la première fois que celui-ci devient visible
+    (sélectionné dans son notebook et, pour un sous-onglet, onglet parent
+    visible). Un rafraîchissement demandé pour un onglet caché est mis en
+    attente et exécuté une seule fois à son affichage ; pour un onglet pas
+    encore construit, il est abandonné (la construction remplit l'onglet).
+    """
+
+    def __init__(self):
+        self._tabs: Dict[str, LazyTab] = {}
+        self._notebooks = []
+
+    def add(self, notebook, name: str, text: str, builder: Callable,
+            parent: Optional[str] = None):
+        """Ajouter un onglet vide, construit par builder(frame) à sa première sélection"""
+        if name in self._tabs:
+            raise ValueError(f"Onglet déjà déclaré: '{name}'")
+
+        frame = ttk.Frame(notebook)
+        notebook.add(frame, text=text)
+        self._tabs[name] = LazyTab(name, notebook, frame, builder, parent)
+        if notebook not in self._notebooks:
+            self._notebooks.append(notebook)
+            notebook.bind('<<NotebookTabChanged>>', lambda e: self.update_visible(), add='+')
+        return frame
+
+    def is_built(self, name: str) -> bool:
+        """Vrai si l'onglet a été construit"""
+        tab = self._tabs.get(name)
+        return tab is not None and tab.built
+
+    def is_visible(self, name: str) -> bool:
+        """Vrai si l'onglet est sélectionné ainsi que tous ses parents"""
+        tab = self._tabs.get(name)
+        if tab is None or str(tab.notebook.select()) != str(tab.frame):
+            return False
+        return tab.parent is None or self.is_visible(tab.parent)
+
+    def show(self, name: str):
+        """Sélectionner un onglet (et ses parents), le construire et le rafraîchir"""
+        tab = self._tabs[name]
+        if tab.parent is not None:
+            self.show(tab.parent)
+        tab.notebook.select(tab.frame)
+        self.update_visible()
+
+    def defer(self, name: str, callback: Callable) -> bool:
+        """Reporter callback si l'onglet est caché ; renvoyer True s'il ne faut pas l'exécuter maintenant
+
+        Usage, en tête d'une méthode de rafraîchissement :
+            if self.tabs.defer('students', self.refresh_students_list):
+                return
+        """
+        tab = self._tabs[name]
+        if not tab.built:
+            return True
+        if self.is_visible(name):
+            return False
+        tab.pending[callback] = None
+        return True
+
+    def update_visible(self):
+        """Construire les onglets visibles et exécuter leurs rafraîchissements en attente"""
+        names = list(self._tabs)
+        i = 0
+        while i < len(names):
+            tab = self._tabs[names[i]]
+            i += 1
+            if not self.is_visible(tab.name):
+                continue
+            if not tab.built:
+                tab.built = True
+                tab.pending.clear()
+                tab.builder(tab.frame)
+                # Les sous-onglets déclarés par le constructeur sont examinés à leur tour
+                names = list(self._tabs)
+            while tab.pending:
+                callback = next(iter(tab.pending))
+                del tab.pending[callback]
+                callback()
@@ -0,0 +1,432 @@
+"""
+Graphiques Dynamiques
+Module de graphiques persistants dont les secteurs, barres et courbes sont
+modifiés sur place quand les statistiques changent, avec blitting tant que
+la mise en page ne change pas
+"""
+
+import math
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from statistics_manager import new_figure
+from downsampling import point_budget, BAR_PIXELS_PER_BUCKET
+from calendar_heatmap import heatmap_style, month_ticks, WEEKDAY_LABELS
+
+# Période et TD des statistiques : (date de début, date de fin, TD), None = pas de filtre
+Scope = Tuple[Optional[str], Optional[str], Optional[str]]
+
+def no_scope() -> Scope:
+    """Portée par défaut : toutes les sessions"""
+    return None, None, None
+
+class LiveChart(ABC):
+    """Graphique persistant : figure, canvas et artistes créés une seule fois
+
+    refresh() ne relit les statistiques que si la version des données ou la
+    portée (fournie par scope, appelé à chaque refresh) a changé. Les artistes porteurs de données sont « animés » : quand seules
+    les valeurs changent, ils sont redessinés sur le fond mémorisé au dernier
+    dessin complet (blitting). Un changement de structure (étiquettes,
+    nombre de barres, échelle) provoque un redessin complet différé.
+    """
+
+    def __init__(self, parent, statistics_manager, figsize=(8, 6),
+                 scope: Callable[[], Scope] = no_scope):
+        self.statistics_manager = statistics_manager
+        self.get_scope = scope
+        self.colors = statistics_manager.colors
+        self.figure = new_figure(figsize)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=parent)
+        self.widget = self.canvas.get_tk_widget()
+        self.empty_text = self.figure.text(0.5, 0.5, "Aucune donnée disponible",
+                                           ha='center', va='center', fontsize=12, visible=False)
+        self._background = None
+        self._data_version = None
+
+        self.setup()
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    @abstractmethod
+    def setup(self):
+        """Créer les axes et les artistes"""
+
+    @abstractmethod
+    def fetch(self):
+        """Lire les données du graphique, None ou vide s'il n'y en a pas"""
+
+    @abstractmethod
+    def update(self, data) -> bool:
+        """Appliquer les données aux artistes, True si la mise en page a changé"""
+
+    @abstractmethod
+    def animated_artists(self) -> List:
+        """Artistes redessinés à chaque mise à jour"""
+
+    def pack(self, **kwargs):
+        self.widget.pack(**kwargs)
+
+    def pack_forget(self):
+        self.widget.pack_forget()
+
+    def refresh(self, force: bool = False):
+        """Mettre le graphique à jour si les données ou la portée ont changé"""
+        version = (self.statistics_manager.get_data_version(), self.get_scope())
+        if version == self._data_version and not force:
+            return
+        self._data_version = version
+
+        data = self.fetch()
+        empty = not data
+        layout_changed = empty != self.empty_text.get_visible()
+        self.empty_text.set_visible(empty)
+        for ax in self.figure.axes:
+            ax.set_visible(not empty)
+        if not empty:
+            layout_changed = self.update(data) or layout_changed
+
+        if layout_changed or self._background is None:
+            self.canvas.draw_idle()
+        else:
+            self._blit()
+
+    def _on_draw(self, event):
+        """Mémoriser le fond après un dessin complet puis y ajouter les artistes animés"""
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        if self.empty_text.get_visible():
+            return
+        for artist in self.animated_artists():
+            if artist.get_visible():
+                self.figure.draw_artist(artist)
+
+    def _blit(self):
+        """Redessiner uniquement les artistes animés sur le fond mémorisé"""
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.figure.bbox)
+
+class LiveAttendancePieChart(LiveChart):
+    """Répartition globale des présences : les secteurs sont réorientés sur place"""
+
+    LABELS = ('Présent', 'Absent', 'En retard')
+    START_ANGLE = 90.0
+
+    def __init__(self, parent, statistics_manager, scope: Callable[[], Scope] = no_scope):
+        super().__init__(parent, statistics_manager, figsize=(8, 6), scope=scope)
+
+    def setup(self):
+        self.ax = self.figure.add_subplot()
+        colors = [self.colors['present'], self.colors['absent'], self.colors['late']]
+        self.wedges, self.texts, self.autotexts = self.ax.pie(
+            [1, 1, 1], labels=self.LABELS, colors=colors, autopct='%1.1f%%',
+            startangle=self.START_ANGLE, wedgeprops={'animated': True}, textprops={'animated': True})
+
+        # Améliorer l'apparence
+        for autotext in self.autotexts:
+            autotext.set_color('white')
+            autotext.set_fontweight('bold')
+
+        self.ax.set_title('Répartition Globale des Présences', fontsize=14, fontweight='bold')
+
+    def fetch(self):
+        totals = self.statistics_manager.get_status_totals(*self.get_scope())
+        return totals if totals and sum(totals) else None
+
+    def update(self, sizes) -> bool:
+        total = sum(sizes)
+        theta = self.START_ANGLE
+        for wedge, text, autotext, size in zip(self.wedges, self.texts, self.autotexts, sizes):
+            # Masquer les valeurs nulles
+            for artist in (wedge, text, autotext):
+                artist.set_visible(size > 0)
+            if size == 0:
+                continue
+
+            span = 360.0 * size / total
+            wedge.set_theta1(theta)
+            wedge.set_theta2(theta + span)
+
+            # Mêmes positions que ax.pie : étiquette à 1.1, pourcentage à 0.6 du rayon
+            middle = math.radians(theta + span / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            text.set_position((1.1 * x, 1.1 * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            autotext.set_position((0.6 * x, 0.6 * y))
+            autotext.set_text(f'{100.0 * size / total:.1f}%')
+            theta += span
+        return False
+
+    def animated_artists(self) -> List:
+        return list(self.wedges) + list(self.texts) + list(self.autotexts)
+
+class LiveComparisonChart(LiveChart):
+    """Comparaison des meilleurs étudiants : les hauteurs de barres sont modifiées sur place"""
+
+    def __init__(self, parent, statistics_manager, top_n: int = 10,
+                 scope: Callable[[], Scope] = no_scope):
+        self.top_n = top_n
+        super().__init__(parent, statistics_manager, figsize=(12, 8), scope=scope)
+
+    def setup(self):
+        self.ax = self.figure.add_subplot()
+        self.ax.set_ylabel('Taux de Présence (%)', fontweight='bold')
+        self.ax.set_ylim(0, 105)
+        self.bars = None
+        self.value_texts = []
+        self._names: Optional[List[str]] = None
+
+    def fetch(self):
+        return self.statistics_manager.get_top_students(self.top_n, 'attendance', *self.get_scope())
+
+    def _create_bars(self, count: int):
+        """Recréer les barres quand leur nombre change"""
+        if self.bars is not None:
+            self.bars.remove()
+        for text in self.value_texts:
+            text.remove()
+
+        positions = range(count)
+        self.bars = self.ax.bar(positions, [0] * count, color=self.colors['primary'],
+                                alpha=0.7, animated=True)
+        self.value_texts = [self.ax.text(position, 0, '', ha='center', va='bottom',
+                                         fontweight='bold', animated=True)
+                            for position in positions]
+        self.ax.set_xlim(-0.6, count - 0.4)
+
+    def update(self, ranked_students) -> bool:
+        names = [stats.student_name for stats in ranked_students]
+        rates = [stats.attendance_rate for stats in ranked_students]
+
+        layout_changed = False
+        if self.bars is None or len(self.bars) != len(names):
+            self._create_bars(len(names))
+            layout_changed = True
+        if names != self._names:
+            # Rotation des noms pour une meilleure lisibilité
+            self.ax.set_xticks(range(len(names)))
+            self.ax.set_xticklabels(names, rotation=45, ha='right')
+            self.ax.set_title(f'Top {len(names)} - Taux de Présence par Étudiant',
+                              fontsize=14, fontweight='bold')
+            self._names = names
+            layout_changed = True
+
+        # Mettre à jour les barres et les valeurs affichées au-dessus
+        for position, (bar, text, rate) in enumerate(zip(self.bars, self.value_texts, rates)):
+            bar.set_height(rate)
+            text.set_position((position, rate + 1))
+            text.set_text(f'{rate:.1f}%')
+
+        if layout_changed:
+            self.figure.tight_layout()
+        return layout_changed
+
+    def animated_artists(self) -> List:
+        return (list(self.bars) if self.bars is not None else []) + self.value_texts
+
+class LiveTrendsChart(LiveChart):
+    """Tendances de présence, réduites à la largeur affichée
+
+    La courbe et les barres (une seule collection de polygones, dessinée en
+    un appel) sont modifiées sur place. La série couvre la portée des
+    statistiques (période et TD) ; la molette zoome autour du curseur et
+    relit une série plus fine pour la plage visible, un double-clic revient
+    à toute la portée.
+    """
+
+    ZOOM_FACTOR = 0.8
+
+    def __init__(self, parent, statistics_manager, scope: Callable[[], Scope] = no_scope):
+        super().__init__(parent, statistics_manager, figsize=(12, 10), scope=scope)
+        self.canvas.mpl_connect('scroll_event', self._on_scroll)
+        self.canvas.mpl_connect('button_press_event', self._on_click)
+        self.canvas.mpl_connect('resize_event', lambda event: self.refresh(force=True))
+
+    def setup(self):
+        self.ax1, self.ax2 = self.figure.subplots(2, 1, sharex=True)
+
+        # Graphique 1: Taux de présence
+        self.line, = self.ax1.plot([], [], marker='o', color=self.colors['primary'],
+                                   linewidth=2, markersize=6, animated=True)
+        self.ax1.set_ylabel('Taux de Présence (%)', fontweight='bold')
+        self.ax1.set_title('Évolution du Taux de Présence', fontsize=12, fontweight='bold')
+        self.ax1.grid(True, alpha=0.3)
+        self.ax1.set_ylim(0, 105)
+
+        # Graphique 2: Nombre d'étudiants (moyenne par paquet, min-max en trait)
+        self.bars = PolyCollection([], facecolors=self.colors['secondary'], alpha=0.7, animated=True)
+        self.ax2.add_collection(self.bars, autolim=False)
+        self.ranges = LineCollection([], colors=self.colors['secondary'], linewidths=1, animated=True)
+        self.ax2.add_collection(self.ranges, autolim=False)
+        self.ax2.set_ylabel('Nombre d\'Étudiants', fontweight='bold')
+        self.ax2.set_xlabel('Date', fontweight='bold')
+        self.ax2.set_title('Nombre d\'Étudiants par Session', fontsize=12, fontweight='bold')
+        self.ax2.grid(True, alpha=0.3)
+
+        locator = mdates.AutoDateLocator()
+        self.ax2.xaxis.set_major_locator(locator)
+        self.ax2.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+        self._view: Optional[Tuple[str, str]] = None  # Plage zoomée, None = toute la portée
+        self._view_scope: Optional[Scope] = None
+
+    def _scope_dates(self) -> List[str]:
+        """Dates des sessions de la portée"""
+        start_date, end_date, td_name = self.get_scope()
+        return [date_str for date_str in self.statistics_manager.index.get_dates(td_name)
+                if not (start_date and date_str < start_date) and not (end_date and date_str > end_date)]
+
+    def fetch(self):
+        width = self.figure.bbox.width
+        scope = self.get_scope()
+        if scope != self._view_scope:
+            # Nouvelle portée : le zoom précédent ne s'applique plus
+            self._view = None
+            self._view_scope = scope
+        start_date, end_date, td_name = scope
+        if self._view:
+            start_date, end_date = self._view
+        trends = self.statistics_manager.get_trend_series(
+            start_date, end_date, td_name,
+            point_budget(width), point_budget(width, BAR_PIXELS_PER_BUCKET))
+        return trends if trends['dates'] else None
+
+    def update(self, trends) -> bool:
+        line_x = mdates.date2num(np.array(trends['dates'], dtype='datetime64[D]'))
+        bar_x = (mdates.date2num(np.array(trends['bar_start_dates'], dtype='datetime64[D]'))
+                 + np.array(trends['bar_offsets']))
+        widths = np.array(trends['bar_widths'])
+        counts = np.array(trends['student_counts'])
+
+        # Un rectangle (4 sommets) par paquet
+        vertices = np.empty((len(bar_x), 4, 2))
+        vertices[:, :2, 0] = bar_x[:, None]
+        vertices[:, 2:, 0] = (bar_x + widths)[:, None]
+        vertices[:, [0, 3], 1] = 0
+        vertices[:, [1, 2], 1] = counts[:, None]
+        self.bars.set_verts(vertices)
+
+        # Marqueurs seulement si toutes les sessions sont tracées
+        self.line.set_data(line_x, trends['attendance_rates'])
+        self.line.set_marker('' if trends['downsampled'] else 'o')
+        if trends['downsampled']:
+            centers = bar_x + widths / 2
+            self.ranges.set_segments([[(x, low), (x, high)] for x, low, high in
+                                      zip(centers, trends['min_student_counts'], trends['max_student_counts'])])
+        else:
+            self.ranges.set_segments([])
+
+        # Plage visible : zoom courant ou toute la portée
+        if self._view:
+            low, high = mdates.date2num(np.array(self._view, dtype='datetime64[D]'))
+            limits = (low - 0.5, high + 1)
+        else:
+            limits = (bar_x[0] - widths[-1], bar_x[-1] + 2 * widths[-1])
+        layout_changed = tuple(self.ax2.get_xlim()) != limits
+        if layout_changed:
+            self.ax2.set_xlim(limits)
+
+        # Changer l'échelle seulement si les barres dépassent ou deviennent trop petites
+        top = max(max(trends['max_student_counts']), 1)
+        current_top = self.ax2.get_ylim()[1]
+        if top > current_top or top * 2 < current_top or layout_changed:
+            self.ax2.set_ylim(0, top * 1.15)
+            layout_changed = True
+
+        if layout_changed:
+            self.figure.tight_layout()
+        return layout_changed
+
+    def animated_artists(self) -> List:
+        return [self.line, self.bars, self.ranges]
+
+    def _on_scroll(self, event):
+        """Zoomer autour du curseur et relire les sessions de la plage visible"""
+        if event.inaxes not in (self.ax1, self.ax2) or event.xdata is None:
+            return
+        dates = self._scope_dates()
+        if not dates:
+            return
+
+        first, last = mdates.date2num(np.array([dates[0], dates[-1]], dtype='datetime64[D]'))
+        factor = self.ZOOM_FACTOR if event.button == 'up' else 1 / self.ZOOM_FACTOR
+        low, high = self.ax2.get_xlim()
+        low = event.xdata - (event.xdata - low) * factor
+        high = event.xdata + (high - event.xdata) * factor
+        if high - low < 2:
+            return
+
+        if low <= first and high >= last:
+            self._view = None
+        else:
+            self._view = (mdates.num2date(max(low, first)).date().isoformat(),
+                          mdates.num2date(min(high, last)).date().isoformat())
+        self.refresh(force=True)
+
+    def _on_click(self, event):
+        """Revenir à toute la portée par double-clic"""
+        if event.dblclick and self._view is not None:
+            self._view = None
+            self.refresh(force=True)
+
+class LiveCalendarHeatmap(LiveChart):
+    """Calendrier de présence (jours × semaines) dessiné par un seul imshow
+
+    Toutes les grilles couvrent les mêmes semaines : passer d'un étudiant à
+    l'autre ne change que les données de l'image et le titre, redessinés
+    par blitting.
+    """
+
+    def __init__(self, parent, statistics_manager, student_id: str = None,
+                 scope: Callable[[], Scope] = no_scope):
+        self.student_id = student_id
+        super().__init__(parent, statistics_manager, figsize=(12, 4), scope=scope)
+
+    def setup(self):
+        self.ax = self.figure.add_subplot()
+        cmap, vmin, vmax, label = heatmap_style('attendance_rate', np.empty(0))
+        self.image = self.ax.imshow(np.full((7, 1), np.nan), aspect='auto', cmap=cmap,
+                                    vmin=vmin, vmax=vmax, interpolation='nearest', animated=True)
+        self.image.cmap.set_bad('#EEEEEE')
+        self.figure.colorbar(self.image, ax=self.ax, label=label)
+
+        self.ax.set_yticks(range(len(WEEKDAY_LABELS)))
+        self.ax.set_yticklabels(WEEKDAY_LABELS)
+        self.title = self.ax.set_title('', fontsize=14, fontweight='bold', animated=True)
+        self._week_starts: Optional[List[str]] = None
+
+    def set_student(self, student_id: Optional[str]):
+        """Choisir l'étudiant du calendrier (None = tous), affiché au prochain refresh()"""
+        if student_id != self.student_id:
+            self.student_id = student_id
+            self._data_version = None
+
+    def fetch(self):
+        heatmap = self.statistics_manager.get_calendar_heatmap(self.student_id, *self.get_scope())
+        return heatmap if heatmap['week_starts'] else None
+
+    def update(self, heatmap) -> bool:
+        grid = heatmap['grid']
+        student = self.statistics_manager.student_manager.get_student(self.student_id) if self.student_id else None
+        self.title.set_text(f'Calendrier des Présences - {student.get_full_name()}' if student
+                            else 'Calendrier des Présences')
+
+        layout_changed = heatmap['week_starts'] != self._week_starts
+        if layout_changed:
+            # Nouvelles semaines : nouvelle étendue et nouvelles graduations
+            self.image.set_extent((-0.5, grid.shape[1] - 0.5, 6.5, -0.5))
+            positions, labels = month_ticks(heatmap['week_starts'])
+            self.ax.set_xticks(positions)
+            self.ax.set_xticklabels(labels, rotation=45, ha='right')
+            self._week_starts = heatmap['week_starts']
+            self.figure.tight_layout()
+
+        self.image.set_data(np.ma.masked_invalid(grid))
+        return layout_changed
+
+    def animated_artists(self) -> List:
+        return [self.image, self.title]
@@ -0,0 +1,190 @@
+"""
+Statistiques par Mois
+Module calculant les compteurs de présence par partition mensuelle dans un
+pool de processus (map), puis les fusionnant (reduce), avec un cache par
+mois : seuls les mois modifiés sont recalculés
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from attendance_index import STATUS_SLOTS
+
+# Session réduite à des types simples pour l'envoi aux processus :
+# (date, TD, ((ID étudiant, case du statut dans [présent, absent, retard]), ...))
+SessionRow = Tuple[str, str, Tuple[Tuple[str, int], ...]]
+
+# En dessous de ce nombre d'enregistrements à recompter, le calcul reste dans
+# le processus : l'envoi aux processus du pool coûterait plus que le comptage
+PARALLEL_MIN_RECORDS = 200_000
+
+def month_of(date_str: str) -> str:
+    """Clé de partition (AAAA-MM) d'une date AAAA-MM-JJ"""
+    return date_str[:7]
+
+def session_row(session) -> SessionRow:
+    """Réduire une session à des tuples (rapides à sérialiser)"""
+    return (session.date, session.td_name.strip(),
+            tuple((student_id, STATUS_SLOTS[record.status])
+                  for student_id, record in session.records.items()))
+
+def count_rows(rows: Iterable[SessionRow]) -> Dict:
+    """Tâche map : compter les présences de sessions réduites
+
+    Renvoie, pour chaque nom de TD, les compteurs [présent, absent, retard]
+    de chaque étudiant et le nombre de sessions.
+    """
+    students: Dict[str, Dict[str, List[int]]] = {}
+    sessions_by_td: Dict[str, int] = {}
+    for _, td_name, records in rows:
+        sessions_by_td[td_name] = sessions_by_td.get(td_name, 0) + 1
+        td_students = students.setdefault(td_name, {})
+        for student_id, slot in records:
+            counts = td_students.get(student_id)
+            if counts is None:
+                counts = td_students[student_id] = [0, 0, 0]
+            counts[slot] += 1
+    return {'students': students, 'sessions': sessions_by_td}
+
+def count_sessions(sessions, start_date: str = None, end_date: str = None) -> Dict:
+    """Compter les présences d'une liste de sessions (bornes incluses)"""
+    return count_rows(session_row(session) for session in sessions
+                      if not (start_date and session.date < start_date)
+                      and not (end_date and session.date > end_date))
+
+class PartitionedStatistics:
+    """Compteurs de présence partitionnés par mois, calculés en map-reduce
+
+    Les mois modifiés depuis le dernier calcul sont recomptés, en parallèle
+    (une tâche par mois, sessions envoyées sous forme de tuples) s'ils
+    totalisent au moins parallel_min_records enregistrements, sinon dans le
+    processus ; les autres sont lus dans le cache. Le pool de processus est
+    créé au premier calcul parallèle puis réutilisé jusqu'à shutdown(). Une
+    requête fusionne les mois entièrement couverts par la plage et recompte
+    directement les mois partiellement couverts à ses bornes.
+    """
+
+    def __init__(self, attendance_manager, max_workers: int = None,
+                 parallel_min_records: int = PARALLEL_MIN_RECORDS):
+        self.attendance_manager = attendance_manager
+        self.max_workers = max_workers
+        self.parallel_min_records = parallel_min_records
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_workers = 0
+        self._results: Dict[str, Dict] = {}
+        self._dirty: Set[str] = set()
+        self._all_dirty = True
+
+        self.attendance_manager.add_observer(self)
+
+    def on_record_change(self, student_id, date_str, old_record, new_record):
+        """Invalider le mois d'un marquage"""
+        self._dirty.add(month_of(date_str))
+
+    def on_attendance_change(self, event_type, date_str=None):
+        """Invalider le mois d'une session, ou tout après un chargement"""
+        if date_str:
+            self._dirty.add(month_of(date_str))
+        else:
+            self._all_dirty = True
+
+    def _partition_sessions(self) -> Dict[str, List]:
+        """Regrouper les sessions par mois"""
+        partitions: Dict[str, List] = {}
+        for session in self.attendance_manager.get_all_sessions():
+            partitions.setdefault(month_of(session.date), []).append(session)
+        return partitions
+
+    def refresh(self) -> int:
+        """Recalculer les mois modifiés, renvoyer le nombre de mois recalculés"""
+        if not self._all_dirty and not self._dirty:
+            return 0
+
+        partitions = self._partition_sessions()
+        if self._all_dirty:
+            months = sorted(partitions)
+            self._results = {}
+        else:
+            months = sorted(month for month in self._dirty if month in partitions)
+            for month in self._dirty - set(partitions):
+                self._results.pop(month, None)
+        self._dirty = set()
+        self._all_dirty = False
+
+        max_workers = self.max_workers or os.cpu_count() or 1
+        workers = min(max_workers, len(months))
+        records = sum(len(session.records) for month in months for session in partitions[month])
+        if workers <= 1 or records < self.parallel_min_records:
+            results = [count_sessions(partitions[month]) for month in months]
+        else:
+            stale = [[session_row(session) for session in partitions[month]] for month in months]
+            chunksize = max(1, len(months) // (workers * 4))
+            # Pool dimensionné sur le nombre de mois, pour servir aussi les prochains recalculs
+            executor = self._get_executor(min(max_workers, len(partitions)))
+            results = list(executor.map(count_rows, stale, chunksize=chunksize))
+
+        self._results.update(zip(months, results))
+        return len(months)
+
+    def _get_executor(self, workers: int) -> ProcessPoolExecutor:
+        """Pool d'au moins workers processus, créé à la première demande
+        
+        Il n'est recréé que si le nombre de mois dépasse sa taille.
+        """
+        if self._executor is None or self._executor_workers < workers:
+            self.shutdown()
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+            self._executor_workers = workers
+        return self._executor
+
+    def shutdown(self):
+        """Arrêter le pool de processus (fermeture de l'application)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._executor_workers = 0
+
+    def _scoped_results(self, start_date: str = None, end_date: str = None) -> List[Dict]:
+        """Résultats par mois couvrant la plage (mois des bornes recomptés)"""
+        self.refresh()
+        start_month = month_of(start_date) if start_date else None
+        end_month = month_of(end_date) if end_date else None
+
+        results = []
+        partitions = None
+        for month in sorted(self._results):
+            if (start_month and month < start_month) or (end_month and month > end_month):
+                continue
+            if month in (start_month, end_month):
+                # Mois partiellement couvert : compter seulement les jours de la plage
+                if partitions is None:
+                    partitions = self._partition_sessions()
+                results.append(count_sessions(partitions[month], start_date, end_date))
+            else:
+                results.append(self._results[month])
+        return results
+
+    def student_counts(self, start_date: str = None, end_date: str = None,
+                       td_name: str = None) -> Dict[str, List[int]]:
+        """Fusionner les compteurs [présent, absent, retard] de chaque étudiant"""
+        merged: Dict[str, List[int]] = {}
+        for result in self._scoped_results(start_date, end_date):
+            for name, td_students in result['students'].items():
+                if td_name is not None and name != td_name.strip():
+                    continue
+                for student_id, counts in td_students.items():
+                    total = merged.get(student_id)
+                    if total is None:
+                        merged[student_id] = list(counts)
+                    else:
+                        total[0] += counts[0]
+                        total[1] += counts[1]
+                        total[2] += counts[2]
+        return merged
+
+    def session_count(self, start_date: str = None, end_date: str = None,
+                      td_name: str = None) -> int:
+        """Fusionner le nombre de sessions"""
+        return sum(count for result in self._scoped_results(start_date, end_date)
+                   for name, count in result['sessions'].items()
+                   if td_name is None or name == td_name.strip())
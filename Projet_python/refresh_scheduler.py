@@ -0,0 +1,95 @@
+"""
+Planification des Rafraîchissements
+Module regroupant les rafraîchissements de l'interface : les vues modifiées
+sont marquées, puis rafraîchies une seule fois au prochain passage à vide
+de la boucle Tk (after_idle) ; les minuteurs sont uniques par clé
+"""
+
+from typing import Callable, Dict, Hashable, Iterable, Optional, Set
+
+class View:
+    """Vue rafraîchissable : rafraîchissement complet et, optionnellement, partiel"""
+
+    def __init__(self, name: str, refresh: Callable[[], None],
+                 refresh_keys: Optional[Callable[[Iterable[Hashable]], None]] = None):
+        self.name = name
+        self.refresh = refresh
+        self.refresh_keys = refresh_keys
+
+class RefreshScheduler:
+    """Marquage des vues à rafraîchir et rafraîchissement groupé
+
+    mark_dirty(nom) demande un rafraîchissement complet ; mark_dirty(nom,
+    clé) un rafraîchissement partiel (par exemple une ligne), absorbé par
+    un rafraîchissement complet demandé dans le même tour. Toutes les vues
+    marquées sont rafraîchies dans leur ordre de déclaration, une seule
+    fois, par un unique appel after_idle.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._views: Dict[str, View] = {}
+        # Vues marquées : None = rafraîchissement complet, sinon clés à rafraîchir
+        self._dirty: Dict[str, Optional[Set[Hashable]]] = {}
+        self._idle_id = None
+        self._timers: Dict[str, str] = {}
+
+    def register(self, name: str, refresh: Callable[[], None],
+                 refresh_keys: Optional[Callable[[Iterable[Hashable]], None]] = None):
+        """Déclarer une vue (l'ordre de déclaration est l'ordre de rafraîchissement)"""
+        if name in self._views:
+            raise ValueError(f"Vue déjà déclarée: '{name}'")
+        self._views[name] = View(name, refresh, refresh_keys)
+
+    def mark_dirty(self, name: str, key: Hashable = None):
+        """Marquer une vue (ou une seule clé de la vue) à rafraîchir"""
+        view = self._views[name]
+        if key is None or view.refresh_keys is None:
+            self._dirty[name] = None
+        elif name not in self._dirty:
+            self._dirty[name] = {key}
+        elif self._dirty[name] is not None:
+            self._dirty[name].add(key)
+
+        if self._idle_id is None:
+            self._idle_id = self.root.after_idle(self.flush)
+
+    def is_dirty(self, name: str) -> bool:
+        """Vrai si la vue attend un rafraîchissement"""
+        return name in self._dirty
+
+    def flush(self):
+        """Rafraîchir maintenant toutes les vues marquées"""
+        if self._idle_id is not None:
+            self.root.after_cancel(self._idle_id)
+            self._idle_id = None
+
+        try:
+            # Une vue marquée pendant le rafraîchissement est traitée dans le même passage
+            while self._dirty:
+                name = next(name for name in self._views if name in self._dirty)
+                keys = self._dirty.pop(name)
+                view = self._views[name]
+                if keys is None:
+                    view.refresh()
+                else:
+                    view.refresh_keys(keys)
+        finally:
+            if self._dirty and self._idle_id is None:
+                self._idle_id = self.root.after_idle(self.flush)
+
+    def after(self, key: str, delay_ms: int, callback: Callable[[], None]):
+        """Programmer callback après delay_ms, en remplaçant le minuteur de même clé"""
+        self.cancel_timer(key)
+
+        def run():
+            self._timers.pop(key, None)
+            callback()
+
+        self._timers[key] = self.root.after(delay_ms, run)
+
+    def cancel_timer(self, key: str):
+        """Annuler le minuteur d'une clé s'il est programmé"""
+        timer_id = self._timers.pop(key, None)
+        if timer_id is not None:
+            self.root.after_cancel(timer_id)
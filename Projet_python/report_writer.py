@@ -0,0 +1,198 @@
+"""
+Rapport des Statistiques
+Module écrivant le rapport des statistiques au fil de l'eau (JSON, NDJSON
+ou CSV) : les étudiants sont parcourus une seule fois, dans l'ordre du
+classement, et les agrégats sont accumulés pendant l'écriture
+"""
+
+import csv
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional
+
+REPORT_FORMATS = ('json', 'ndjson', 'csv')
+
+# Format déduit de l'extension du fichier (JSON par défaut)
+FORMAT_EXTENSIONS = {
+    '.json': 'json',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.csv': 'csv'
+}
+
+# Taux de présence sous lequel un étudiant a besoin d'attention (%)
+NEEDS_ATTENTION_RATE = 70
+
+CSV_COLUMNS = ('rank', 'student_id', 'student_name', 'total_sessions', 'present_count',
+               'absent_count', 'late_count', 'attendance_rate', 'punctuality_rate',
+               'needs_attention')
+
+def report_format_for(filepath: str) -> str:
+    """Déduire le format du rapport de l'extension du fichier"""
+    extension = os.path.splitext(filepath)[1].lower()
+    return FORMAT_EXTENSIONS.get(extension, 'json')
+
+class ReportAggregates:
+    """Statistiques générales accumulées pendant le parcours des étudiants
+
+    Les étudiants arrivent du meilleur au moins bon : le premier est le
+    meilleur étudiant. Seuls des compteurs et des sommes sont conservés.
+    """
+
+    def __init__(self):
+        self.total_students = 0
+        self.attendance_sum = 0.0
+        self.punctuality_sum = 0.0
+        self.best_student: Optional[Dict] = None
+        self.needs_attention_count = 0
+
+    def add(self, stats) -> bool:
+        """Ajouter un étudiant, renvoyer True s'il a besoin d'attention"""
+        if self.best_student is None:
+            self.best_student = stats.to_dict()
+        self.total_students += 1
+        self.attendance_sum += stats.attendance_rate
+        self.punctuality_sum += stats.punctuality_rate
+
+        needs_attention = stats.attendance_rate < NEEDS_ATTENTION_RATE
+        if needs_attention:
+            self.needs_attention_count += 1
+        return needs_attention
+
+    def to_dict(self) -> Dict:
+        """Convertir les agrégats en dictionnaire"""
+        count = self.total_students
+        return {
+            'total_students': count,
+            'average_attendance_rate': round(self.attendance_sum / count, 2) if count else 0.0,
+            'average_punctuality_rate': round(self.punctuality_sum / count, 2) if count else 0.0,
+            'best_student': self.best_student,
+            'needs_attention_count': self.needs_attention_count
+        }
+
+class StatisticsReportWriter:
+    """Écriture en flux du rapport des statistiques
+
+    Chaque section est écrite dès qu'elle est produite : une ligne par
+    étudiant (classement par taux de présence), une par étudiant à risque,
+    une par semaine de tendance, puis les statistiques générales accumulées
+    en chemin. Seuls les identifiants triés sont conservés en mémoire, pas
+    les lignes du rapport. progress, s'il est fourni, est appelé avec
+    (étudiants écrits, nombre d'étudiants) après chaque ligne d'étudiant.
+    """
+
+    def __init__(self, statistics_manager, start_date: str = None,
+                 end_date: str = None, td_name: str = None,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        self.statistics_manager = statistics_manager
+        self.start_date = start_date
+        self.end_date = end_date
+        self.td_name = td_name
+        self.progress = progress
+        self.aggregates = ReportAggregates()
+
+    def get_header(self) -> Dict:
+        """Date de génération et périmètre du rapport"""
+        return {
+            'generated_date': datetime.now().isoformat(),
+            'scope': {'start_date': self.start_date, 'end_date': self.end_date,
+                      'td_name': self.td_name}
+        }
+
+    def iter_student_rows(self) -> Iterator[Dict]:
+        """Produire une ligne par étudiant, en accumulant les agrégats"""
+        self.aggregates = ReportAggregates()
+        total = self.statistics_manager.student_manager.get_student_count()
+        ranked = self.statistics_manager.iter_ranked_statistics(self.start_date, self.end_date,
+                                                                self.td_name)
+        for rank, stats in enumerate(ranked, 1):
+            row = {'rank': rank}
+            row.update(stats.to_dict())
+            row['needs_attention'] = self.aggregates.add(stats)
+            yield row
+            if self.progress:
+                self.progress(rank, total)
+
+    def iter_trend_rows(self) -> Iterator[Dict]:
+        """Produire une ligne par semaine (taux à None sans session)"""
+        buckets = self.statistics_manager.index.bucket_counts(self.start_date, self.end_date,
+                                                              'week', self.td_name)
+        for bucket in buckets:
+            yield {
+                'period': bucket['period'],
+                'start_date': bucket['start_date'],
+                'attendance_rate': bucket['attendance_rate'],
+                'student_count': bucket['total'],
+                'session_count': bucket['sessions'],
+                'present': bucket['present'],
+                'absent': bucket['absent'],
+                'late': bucket['late']
+            }
+
+    def get_overall(self) -> Dict:
+        """Statistiques générales (à appeler après le parcours des étudiants)"""
+        overall = self.aggregates.to_dict()
+        overall['total_sessions'] = self.statistics_manager.index.range_counts(
+            self.start_date, self.end_date, self.td_name)['sessions']
+        return overall
+
+    def iter_at_risk_rows(self) -> Iterator[Dict]:
+        """Produire les étudiants à risque (règles configurées, état actuel)"""
+        return self.statistics_manager.streaks.iter_at_risk()
+
+    def write(self, filepath: str, report_format: str = None):
+        """Écrire le rapport ('json', 'ndjson' ou 'csv', sinon selon l'extension)"""
+        report_format = report_format or report_format_for(filepath)
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"Format de rapport inconnu: '{report_format}'")
+
+        newline = '' if report_format == 'csv' else None
+        with open(filepath, 'w', encoding='utf-8', newline=newline) as f:
+            getattr(self, f'_write_{report_format}')(f)
+
+    def _write_json(self, f):
+        """Document JSON unique ; les tableaux sont écrits élément par élément"""
+        header = self.get_header()
+        f.write('{\n')
+        for key, value in header.items():
+            f.write(f'  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},\n')
+
+        for name, rows in (('student_statistics', self.iter_student_rows()),
+                           ('at_risk', self.iter_at_risk_rows()),
+                           ('trends', self.iter_trend_rows())):
+            f.write(f'  {json.dumps(name)}: [')
+            empty = True
+            for row in rows:
+                f.write('\n    ' if empty else ',\n    ')
+                f.write(json.dumps(row, ensure_ascii=False))
+                empty = False
+            f.write('],\n' if empty else '\n  ],\n')
+
+        overall = json.dumps(self.get_overall(), ensure_ascii=False, indent=2).replace('\n', '\n  ')
+        f.write(f'  "overall_statistics": {overall}\n')
+        f.write('}\n')
+
+    def _write_ndjson(self, f):
+        """Un objet JSON par ligne, distingués par leur champ 'type'"""
+        def write_line(record_type: str, record: Dict):
+            line = {'type': record_type}
+            line.update(record)
+            f.write(json.dumps(line, ensure_ascii=False))
+            f.write('\n')
+
+        write_line('header', self.get_header())
+        for row in self.iter_student_rows():
+            write_line('student', row)
+        for row in self.iter_at_risk_rows():
+            write_line('at_risk', row)
+        for row in self.iter_trend_rows():
+            write_line('trend', row)
+        write_line('overall', self.get_overall())
+
+    def _write_csv(self, f):
+        """Tableau des étudiants (une ligne par étudiant, dans l'ordre du classement)"""
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for row in self.iter_student_rows():
+            writer.writerow(row)
@@ -0,0 +1,286 @@
+"""
+Modèle de Risque d'Absence
+Module estimant, pour chaque étudiant, la probabilité d'être absent à la
+prochaine session à l'aide d'une régression logistique vectorisée (NumPy)
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from attendance_manager import AttendanceStatus
+
+# Codes de statut dans la matrice étudiants × sessions
+NO_RECORD = -1
+STATUS_CODES = {
+    AttendanceStatus.PRESENT: 0,
+    AttendanceStatus.ABSENT: 1,
+    AttendanceStatus.LATE: 2
+}
+
+BASE_FEATURES = ('recent_rate', 'overall_rate', 'current_streak', 'mean_lateness_min')
+
+class AbsenceRiskModel:
+    """Régression logistique sur l'historique étudiants × sessions
+
+    L'historique est rangé une fois (par version des données) dans une
+    matrice NumPy ; toutes les variables explicatives sont ensuite dérivées
+    de sommes cumulées le long des sessions, pour tous les étudiants à la fois.
+    Variables : taux récent, taux global, absences consécutives, retard moyen,
+    jour de la semaine et TD de la session visée.
+    """
+
+    def __init__(self, student_manager, attendance_manager, window: int = 5,
+                 learning_rate: float = 0.5, epochs: int = 200, l2: float = 1e-3):
+        self.student_manager = student_manager
+        self.attendance_manager = attendance_manager
+        self.window = window
+        self.learning_rate = learning_rate
+        self.epochs = epochs
+        self.l2 = l2
+
+        self.weights: Optional[np.ndarray] = None
+        self.feature_names: List[str] = []
+        self._td_names: List[str] = []
+        self._mean: Optional[np.ndarray] = None
+        self._scale: Optional[np.ndarray] = None
+        self._history = None
+        self._fitted_version = None
+
+        self.student_manager.add_observer(self)
+        self.attendance_manager.add_observer(self)
+
+    def on_attendance_change(self, event_type, date_str=None):
+        """Invalider l'historique après un changement de présence"""
+        self._history = None
+
+    def on_student_change(self, event_type, student_id=None):
+        """Invalider l'historique après un changement d'étudiant"""
+        self._history = None
+
+    def _build_history(self):
+        """Ranger l'historique dans des matrices étudiants × sessions"""
+        student_ids = [student.student_id for student in self.student_manager.get_all_students()]
+        rows = {student_id: i for i, student_id in enumerate(student_ids)}
+        sessions = sorted(self.attendance_manager.get_all_sessions(), key=lambda x: x.date)
+
+        status = np.full((len(student_ids), len(sessions)), NO_RECORD, dtype=np.int8)
+        lateness = np.zeros((len(student_ids), len(sessions)), dtype=np.float32)
+        lateness_known = np.zeros((len(student_ids), len(sessions)), dtype=bool)
+
+        for column, session in enumerate(sessions):
+            for student_id, record in session.records.items():
+                row = rows.get(student_id)
+                if row is None:
+                    continue
+                status[row, column] = STATUS_CODES[record.status]
+                if record.lateness_seconds is not None:
+                    lateness[row, column] = record.lateness_seconds / 60
+                    lateness_known[row, column] = True
+
+        self._history = {
+            'student_ids': student_ids,
+            'status': status,
+            'lateness': lateness,
+            'lateness_known': lateness_known,
+            'weekdays': np.array([date.fromisoformat(session.date).weekday() for session in sessions],
+                                 dtype=np.int64),
+            'td_names': [session.td_name.strip() for session in sessions]
+        }
+
+    def _data_version(self) -> Tuple[int, int]:
+        """Version des données (étudiants, présences)"""
+        return (self.student_manager.version, self.attendance_manager.version)
+
+    def _get_history(self) -> Dict:
+        if self._history is None:
+            self._build_history()
+        return self._history
+
+    def _cumulative(self, history: Dict) -> Dict[str, np.ndarray]:
+        """Calculer les sommes cumulées (colonne 0 = avant la première session)"""
+        status = history['status']
+        recorded = status != NO_RECORD
+        absent = status == STATUS_CODES[AttendanceStatus.ABSENT]
+        attended = recorded & ~absent
+
+        def cumulative(values, dtype):
+            result = np.zeros((values.shape[0], values.shape[1] + 1), dtype=dtype)
+            np.cumsum(values, axis=1, out=result[:, 1:])
+            return result
+
+        # Dernière session suivie avant chaque colonne (-1 si aucune)
+        positions = np.where(attended, np.arange(status.shape[1]), -1)
+        last_attended = np.maximum.accumulate(positions, axis=1) if status.shape[1] else positions
+
+        return {
+            'recorded': cumulative(recorded, np.int32),
+            'attended': cumulative(attended, np.int32),
+            'absent': cumulative(absent, np.int32),
+            'lateness': cumulative(history['lateness'], np.float32),
+            'lateness_known': cumulative(history['lateness_known'], np.int32),
+            'last_attended': last_attended,
+            'recorded_mask': recorded,
+            'absent_mask': absent
+        }
+
+    def _summary_at(self, cumulative: Dict, column: int) -> Dict[str, np.ndarray]:
+        """Résumer l'historique antérieur à une colonne à partir des sommes cumulées"""
+        start = max(0, column - self.window)
+        if column > 0:
+            last = cumulative['last_attended'][:, column - 1]
+            absent_cumulative = cumulative['absent']
+            streak = absent_cumulative[:, column] - np.take_along_axis(
+                absent_cumulative, (last + 1)[:, None], axis=1)[:, 0]
+        else:
+            streak = np.zeros(cumulative['recorded'].shape[0])
+
+        return {
+            'recorded': cumulative['recorded'][:, column],
+            'attended': cumulative['attended'][:, column],
+            'recent_recorded': cumulative['recorded'][:, column] - cumulative['recorded'][:, start],
+            'recent_attended': cumulative['attended'][:, column] - cumulative['attended'][:, start],
+            'lateness': cumulative['lateness'][:, column],
+            'lateness_known': cumulative['lateness_known'][:, column],
+            'streak': streak
+        }
+
+    def _summary_final(self, history: Dict) -> Dict[str, np.ndarray]:
+        """Résumer tout l'historique sans matrices cumulées (pour le score)"""
+        status = history['status']
+        recorded = status != NO_RECORD
+        absent = status == STATUS_CODES[AttendanceStatus.ABSENT]
+        attended = recorded & ~absent
+        recent = slice(max(0, status.shape[1] - self.window), None)
+
+        # Absences depuis la dernière session suivie
+        columns = np.arange(status.shape[1])
+        last = np.where(attended, columns, -1).max(axis=1, initial=-1)
+        streak = (absent & (columns > last[:, None])).sum(axis=1)
+
+        return {
+            'recorded': recorded.sum(axis=1),
+            'attended': attended.sum(axis=1),
+            'recent_recorded': recorded[:, recent].sum(axis=1),
+            'recent_attended': attended[:, recent].sum(axis=1),
+            'lateness': history['lateness'].sum(axis=1, dtype=np.float64),
+            'lateness_known': history['lateness_known'].sum(axis=1),
+            'streak': streak
+        }
+
+    def _base_features(self, summary: Dict[str, np.ndarray]) -> np.ndarray:
+        """Calculer les variables de base à partir d'un résumé d'historique"""
+        recorded = summary['recorded']
+        known = summary['lateness_known']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            overall_rate = np.where(recorded > 0, summary['attended'] / recorded, 1.0)
+            recent_rate = np.where(summary['recent_recorded'] > 0,
+                                   summary['recent_attended'] / summary['recent_recorded'], overall_rate)
+            mean_lateness = np.where(known > 0, summary['lateness'] / known, 0.0)
+        return np.column_stack((recent_rate, overall_rate, np.minimum(summary['streak'], 10), mean_lateness))
+
+    def _context_features(self, count: int, weekday: int, td_name: str) -> np.ndarray:
+        """Variables de contexte de la session visée (jour, TD) en indicatrices"""
+        context = np.zeros((count, 7 + len(self._td_names)))
+        context[:, weekday] = 1.0
+        if td_name in self._td_names:
+            context[:, 7 + self._td_names.index(td_name)] = 1.0
+        return context
+
+    def _design_matrix(self, history: Dict, max_samples: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Construire les exemples d'apprentissage (une ligne par étudiant et par session)"""
+        cumulative = self._cumulative(history)
+        blocks, labels = [], []
+        for column in range(1, history['status'].shape[1]):
+            rows = cumulative['recorded_mask'][:, column]
+            if not rows.any():
+                continue
+            base = self._base_features(self._summary_at(cumulative, column))[rows]
+            context = self._context_features(len(base), history['weekdays'][column],
+                                             history['td_names'][column])
+            blocks.append(np.hstack((base, context)))
+            labels.append(cumulative['absent_mask'][rows, column].astype(np.float64))
+
+        if not blocks:
+            return np.empty((0, len(BASE_FEATURES) + 7 + len(self._td_names))), np.empty(0)
+
+        features = np.vstack(blocks)
+        targets = np.concatenate(labels)
+        if len(targets) > max_samples:
+            chosen = np.random.default_rng(seed).choice(len(targets), max_samples, replace=False)
+            features, targets = features[chosen], targets[chosen]
+        return features, targets
+
+    def fit(self, max_samples: int = 200000, seed: int = 0) -> 'AbsenceRiskModel':
+        """Entraîner le modèle par descente de gradient sur tout l'historique"""
+        if not self._fit(max_samples, seed):
+            raise ValueError("Pas assez d'historique pour entraîner le modèle")
+        return self
+
+    def _fit(self, max_samples: int = 200000, seed: int = 0) -> bool:
+        """Entraîner le modèle ; renvoyer False (modèle effacé) si l'historique ne suffit pas
+
+        Il faut au moins un étudiant marqué à deux sessions : la première
+        session n'a pas d'historique antérieur et ne fournit aucun exemple.
+        """
+        version = self._data_version()
+        self.weights = None
+        self._fitted_version = None
+        history = self._get_history()
+        self._td_names = sorted(set(history['td_names']))
+        self.feature_names = (list(BASE_FEATURES)
+                              + [f'weekday_{day}' for day in range(7)]
+                              + [f'td_{name}' for name in self._td_names])
+
+        features, targets = self._design_matrix(history, max_samples, seed)
+        if not len(targets):
+            return False
+
+        self._mean = features.mean(axis=0)
+        self._scale = features.std(axis=0)
+        self._scale[self._scale == 0] = 1.0
+        normalized = np.hstack((np.ones((len(features), 1)), (features - self._mean) / self._scale))
+
+        weights = np.zeros(normalized.shape[1])
+        for _ in range(self.epochs):
+            predictions = 1.0 / (1.0 + np.exp(-(normalized @ weights)))
+            gradient = normalized.T @ (predictions - targets) / len(targets)
+            gradient[1:] += self.l2 * weights[1:]
+            weights -= self.learning_rate * gradient
+
+        self.weights = weights
+        self._fitted_version = version
+        return True
+
+    def score(self, next_date: str = None, next_td: str = None) -> Tuple[List[str], np.ndarray]:
+        """Calculer en un seul passage la probabilité d'absence de chaque étudiant
+
+        Par défaut, la session visée est aujourd'hui, avec le TD de la dernière session.
+        Le modèle est réentraîné quand les données ont changé (nouvelles
+        sessions, nouveaux TD) ; sans historique suffisant, aucun étudiant
+        n'est évalué.
+        """
+        if self.weights is None or self._fitted_version != self._data_version():
+            if not self._fit():
+                return [], np.empty(0)
+
+        history = self._get_history()
+        student_ids = history['student_ids']
+        if not student_ids:
+            return [], np.empty(0)
+
+        if next_td is None:
+            next_td = history['td_names'][-1] if history['td_names'] else ''
+        weekday = date.fromisoformat(next_date).weekday() if next_date else date.today().weekday()
+
+        base = self._base_features(self._summary_final(history))
+        features = np.hstack((base, self._context_features(len(base), weekday, next_td.strip())))
+        normalized = np.hstack((np.ones((len(features), 1)), (features - self._mean) / self._scale))
+        probabilities = 1.0 / (1.0 + np.exp(-(normalized @ self.weights)))
+        return student_ids, probabilities
+
+    def get_coefficients(self) -> Dict[str, float]:
+        """Récupérer les coefficients (sur variables normalisées) du modèle entraîné"""
+        if self.weights is None:
+            return {}
+        names = ['intercept'] + self.feature_names
+        return {name: round(float(weight), 4) for name, weight in zip(names, self.weights)}
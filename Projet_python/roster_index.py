@@ -0,0 +1,162 @@
+"""
+Index des Listes d'Appel
+Module maintenant les étudiants de chaque groupe et de chaque TD, pour
+limiter la liste des présences aux étudiants concernés par une session
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+# Liste d'appel : ('group', nom du groupe) ou ('td', nom du TD) ; None = tous les étudiants
+Roster = Optional[Tuple[str, str]]
+
+ROSTER_KINDS = ('group', 'td')
+
+class RosterIndex:
+    """Étudiants par groupe et par TD, tenus à jour par les observateurs
+
+    Un groupe réunit les étudiants dont le champ groupe est identique (sans
+    tenir compte de la casse). La liste d'appel d'un TD réunit les
+    étudiants ayant au moins un enregistrement dans une session de ce TD :
+    le nombre de leurs enregistrements est maintenu en O(1) à chaque
+    marquage. Les membres d'une liste sont gardés dans des dictionnaires
+    ordonnés, si bien que l'appartenance se vérifie en O(1).
+    """
+
+    def __init__(self, student_manager, attendance_manager):
+        self.student_manager = student_manager
+        self.attendance_manager = attendance_manager
+        self._groups: Dict[str, Dict[str, None]] = {}
+        self._group_names: Dict[str, str] = {}
+        self._student_group: Dict[str, str] = {}
+        self._td_members: Dict[str, Dict[str, int]] = {}
+        self._session_td: Dict[str, str] = {}
+
+        self.rebuild_groups()
+        self.rebuild_tds()
+        self.student_manager.add_observer(self)
+        self.attendance_manager.add_observer(self)
+
+    def rebuild_groups(self):
+        """Recalculer les membres de tous les groupes"""
+        self._groups = {}
+        self._group_names = {}
+        self._student_group = {}
+        for student in self.student_manager.get_all_students():
+            self._add_to_group(student)
+
+    def rebuild_tds(self):
+        """Recalculer les listes d'appel de tous les TD en un seul passage"""
+        self._td_members = {}
+        self._session_td = {}
+        for session in self.attendance_manager.get_all_sessions():
+            td_name = session.td_name.strip()
+            self._session_td[session.date] = td_name
+            for student_id in session.records:
+                self._count(td_name, student_id, 1)
+
+    def _add_to_group(self, student):
+        """Ranger un étudiant dans son groupe"""
+        name = student.group.strip()
+        key = name.lower()
+        self._student_group[student.student_id] = key
+        if key:
+            self._groups.setdefault(key, {})[student.student_id] = None
+            self._group_names.setdefault(key, name)
+
+    def _remove_from_group(self, student_id: str):
+        """Retirer un étudiant de son groupe (le groupe disparaît s'il est vide)"""
+        key = self._student_group.pop(student_id, None)
+        members = self._groups.get(key)
+        if members is not None:
+            members.pop(student_id, None)
+            if not members:
+                del self._groups[key]
+                del self._group_names[key]
+
+    def _count(self, td_name: str, student_id: str, delta: int):
+        """Ajouter delta au nombre d'enregistrements d'un étudiant dans un TD"""
+        if not td_name:
+            return
+        members = self._td_members.setdefault(td_name, {})
+        count = members.get(student_id, 0) + delta
+        if count > 0:
+            members[student_id] = count
+        else:
+            members.pop(student_id, None)
+            if not members:
+                del self._td_members[td_name]
+
+    def _sync_session_td(self, date_str: str):
+        """Suivre le nom du TD d'une session, qui peut être défini au premier marquage"""
+        session = self.attendance_manager.get_session(date_str)
+        if session is None:
+            return
+        td_name = session.td_name.strip()
+        previous = self._session_td.get(date_str)
+        if previous is not None and previous != td_name:
+            # Les enregistrements déjà comptés changent de TD
+            for student_id in session.records:
+                self._count(previous, student_id, -1)
+                self._count(td_name, student_id, 1)
+        self._session_td[date_str] = td_name
+
+    def on_student_change(self, event_type, student_id=None):
+        """Maintenir le groupe de l'étudiant modifié"""
+        if event_type == 'load' or student_id is None:
+            self.rebuild_groups()
+            return
+        self._remove_from_group(student_id)
+        student = self.student_manager.get_student(student_id)
+        if student is not None:
+            self._add_to_group(student)
+
+    def on_record_change(self, student_id, date_str, old_record, new_record):
+        """Compter le marquage dans le TD de sa session"""
+        if date_str not in self._session_td:
+            self._sync_session_td(date_str)
+        td_name = self._session_td.get(date_str, '')
+        if old_record:
+            self._count(td_name, student_id, -1)
+        if new_record:
+            self._count(td_name, student_id, 1)
+        self._sync_session_td(date_str)
+
+    def on_attendance_change(self, event_type, date_str=None):
+        """Suivre le chargement, la création et la suppression des sessions"""
+        if event_type == 'load':
+            self.rebuild_tds()
+        elif event_type == 'session_created':
+            self._sync_session_td(date_str)
+        elif event_type == 'session_deleted':
+            # Les enregistrements ont déjà été décomptés un par un
+            self._session_td.pop(date_str, None)
+
+    def get_groups(self) -> List[str]:
+        """Noms des groupes non vides, triés"""
+        return sorted(self._group_names.values(), key=str.lower)
+
+    def get_td_names(self) -> List[str]:
+        """Noms des TD ayant au moins un enregistrement, triés"""
+        return sorted(self._td_members, key=str.lower)
+
+    def _members(self, roster: Roster) -> Dict:
+        """Membres d'une liste d'appel (dictionnaire vide si elle n'existe pas)"""
+        kind, name = roster
+        if kind not in ROSTER_KINDS:
+            raise ValueError(f"Type de liste d'appel inconnu: '{kind}'")
+        if kind == 'group':
+            return self._groups.get(name.strip().lower(), {})
+        return self._td_members.get(name.strip(), {})
+
+    def get_student_ids(self, roster: Roster) -> List[str]:
+        """ID des étudiants d'une liste d'appel (de tous les étudiants si roster est None)"""
+        if roster is None:
+            return list(self.student_manager.students)
+        students = self.student_manager.students
+        return [student_id for student_id in self._members(roster) if student_id in students]
+
+    def contains(self, roster: Roster, student_id: str) -> bool:
+        """Vrai si l'étudiant existe et fait partie de la liste d'appel"""
+        if student_id not in self.student_manager.students:
+            return False
+        return roster is None or student_id in self._members(roster)
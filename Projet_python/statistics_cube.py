@@ -0,0 +1,185 @@
+"""
+Cube de Statistiques
+Module maintenant les compteurs de présence par groupe, TD et période,
+avec tous les niveaux d'agrégation matérialisés
+"""
+
+from datetime import date
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+from attendance_index import STATUS_SLOTS, counts_to_dict, period_start, period_label
+
+DIMENSIONS = ('group', 'td_name', 'period')
+
+# None dans une clé signifie « toutes les valeurs » pour cette dimension
+CubeKey = Tuple[Optional[str], Optional[str], Optional[str]]
+
+def cell_to_dict(counts: List[int]) -> Dict:
+    """Convertir les compteurs d'une cellule (sans nombre de sessions)"""
+    result = counts_to_dict(counts)
+    del result['sessions']
+    return result
+
+class StatisticsCube:
+    """Cube (groupe, TD, période, statut) mis à jour à chaque marquage
+
+    Chaque enregistrement est compté dans les 8 combinaisons d'agrégation
+    de sa cellule, si bien qu'un cumul à n'importe quel niveau est une
+    simple lecture et qu'un détail coûte O(valeurs de la dimension).
+    """
+
+    def __init__(self, student_manager, attendance_manager, period: str = 'week'):
+        self.student_manager = student_manager
+        self.attendance_manager = attendance_manager
+        self.period = period
+        self._cells: Dict[CubeKey, List[int]] = {}
+        self._values: Dict[str, set] = {dimension: set() for dimension in DIMENSIONS}
+        self._student_groups: Dict[str, str] = {}
+        self._session_td: Dict[str, str] = {}
+        self._period_labels: Dict[str, str] = {}
+
+        self.rebuild()
+        self.student_manager.add_observer(self)
+        self.attendance_manager.add_observer(self)
+
+    def _period_of(self, date_str: str) -> str:
+        """Calculer (avec cache) le libellé de la période d'une date"""
+        label = self._period_labels.get(date_str)
+        if label is None:
+            start = period_start(date.fromisoformat(date_str), self.period)
+            label = period_label(start, self.period)
+            self._period_labels[date_str] = label
+        return label
+
+    def _add(self, group: str, td_name: str, date_str: str, status, delta: int):
+        """Ajouter un enregistrement dans toutes les agrégations de sa cellule"""
+        period = self._period_of(date_str)
+        slot = STATUS_SLOTS[status]
+        for key in product((group, None), (td_name, None), (period, None)):
+            counts = self._cells.get(key)
+            if counts is None:
+                counts = self._cells[key] = [0, 0, 0]
+            counts[slot] += delta
+
+        self._values['group'].add(group)
+        self._values['td_name'].add(td_name)
+        self._values['period'].add(period)
+
+    def rebuild(self):
+        """Construire le cube en un seul passage sur les présences"""
+        self._cells = {}
+        self._values = {dimension: set() for dimension in DIMENSIONS}
+        self._student_groups = {student.student_id: student.group.strip()
+                                for student in self.student_manager.get_all_students()}
+        self._session_td = {}
+
+        for session in self.attendance_manager.get_all_sessions():
+            td_name = session.td_name.strip()
+            self._session_td[session.date] = td_name
+            for student_id, record in session.records.items():
+                group = self._student_groups.get(student_id)
+                if group is not None:
+                    self._add(group, td_name, session.date, record.status, 1)
+
+    def _apply_student(self, student_id: str, group: str, delta: int):
+        """Ajouter ou retirer tout l'historique d'un étudiant"""
+        for record in self.attendance_manager.get_student_attendance(student_id):
+            td_name = self._session_td.get(record.date, '')
+            self._add(group, td_name, record.date, record.status, delta)
+
+    def _sync_session_td(self, date_str: str):
+        """Déplacer une session si son nom de TD a été défini après coup"""
+        session = self.attendance_manager.get_session(date_str)
+        if session is None:
+            return
+
+        new_td = session.td_name.strip()
+        old_td = self._session_td.get(date_str)
+        if old_td == new_td:
+            return
+
+        self._session_td[date_str] = new_td
+        if old_td is None:
+            return
+        for student_id, record in session.records.items():
+            group = self._student_groups.get(student_id)
+            if group is not None:
+                self._add(group, old_td, date_str, record.status, -1)
+                self._add(group, new_td, date_str, record.status, 1)
+
+    def on_record_change(self, student_id, date_str, old_record, new_record):
+        """Mettre à jour les cellules d'un enregistrement modifié"""
+        group = self._student_groups.get(student_id)
+        td_name = self._session_td.get(date_str, '')
+        if group is not None:
+            if old_record:
+                self._add(group, td_name, date_str, old_record.status, -1)
+            if new_record:
+                # Le TD est resynchronisé juste après, avec l'enregistrement déjà compté
+                self._add(group, td_name, date_str, new_record.status, 1)
+        self._sync_session_td(date_str)
+
+    def on_attendance_change(self, event_type, date_str=None):
+        """Suivre la création, la suppression et le chargement des sessions"""
+        if event_type == 'load':
+            self.rebuild()
+        elif event_type == 'session_created':
+            self._sync_session_td(date_str)
+        elif event_type == 'session_deleted':
+            self._session_td.pop(date_str, None)
+
+    def on_student_change(self, event_type, student_id=None):
+        """Suivre les changements de groupe, ajouts et suppressions d'étudiants"""
+        if event_type == 'load':
+            self.rebuild()
+        elif event_type == 'add':
+            group = self.student_manager.get_student(student_id).group.strip()
+            self._student_groups[student_id] = group
+            self._apply_student(student_id, group, 1)
+        elif event_type == 'delete':
+            group = self._student_groups.pop(student_id, None)
+            if group is not None:
+                self._apply_student(student_id, group, -1)
+        elif event_type == 'update':
+            old_group = self._student_groups.get(student_id)
+            new_group = self.student_manager.get_student(student_id).group.strip()
+            if old_group is not None and old_group != new_group:
+                self._apply_student(student_id, old_group, -1)
+                self._apply_student(student_id, new_group, 1)
+            self._student_groups[student_id] = new_group
+
+    def rollup(self, group: str = None, td_name: str = None, period: str = None) -> Dict:
+        """Récupérer les compteurs agrégés (None = toutes les valeurs) en O(1)"""
+        counts = self._cells.get((group, td_name, period), [0, 0, 0])
+        return cell_to_dict(counts)
+
+    def drill_down(self, dimension: str, group: str = None, td_name: str = None,
+                   period: str = None) -> Dict[str, Dict]:
+        """Détailler un niveau d'agrégation selon une dimension"""
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Dimension inconnue: '{dimension}'")
+
+        fixed = {'group': group, 'td_name': td_name, 'period': period}
+        results = {}
+        for value in sorted(self._values[dimension]):
+            fixed[dimension] = value
+            counts = self._cells.get((fixed['group'], fixed['td_name'], fixed['period']))
+            if counts and any(counts):
+                results[value] = cell_to_dict(counts)
+        return results
+
+    def get_values(self, dimension: str) -> List[str]:
+        """Récupérer les valeurs connues d'une dimension"""
+        return sorted(self._values[dimension])
+
+    def get_rows(self) -> List[Dict]:
+        """Récupérer les cellules les plus fines (groupe, TD, période), triées"""
+        rows = []
+        for (group, td_name, period), counts in self._cells.items():
+            if group is None or td_name is None or period is None or not any(counts):
+                continue
+            row = cell_to_dict(counts)
+            row.update({'group': group, 'td_name': td_name, 'period': period})
+            rows.append(row)
+        rows.sort(key=lambda row: (row['group'], row['td_name'], row['period']))
+        return rows
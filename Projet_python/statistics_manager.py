@@ -3,14 +3,45 @@ Gestionnaire des Statistiques
 Module pour calculer et analyser les statistiques de présence
 """
 
-import json
+import heapq
+from bisect import bisect_left, insort
+from copy import copy
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import tkinter as tk
+from typing import Dict, Iterator, List, Tuple, Optional, TYPE_CHECKING
+import numpy as np
 from attendance_manager import AttendanceStatus
+from attendance_index import AttendanceIndex
+from statistics_cube import StatisticsCube
+from lateness_analytics import LatenessAnalytics
+from streak_tracker import StreakTracker
+from risk_model import AbsenceRiskModel
+from calendar_heatmap import calendar_grid, month_ticks, heatmap_style, WEEKDAY_LABELS
+from downsampling import lttb_indices, aggregate_buckets, point_budget, BAR_PIXELS_PER_BUCKET
+from report_writer import StatisticsReportWriter
+from partitioned_statistics import PartitionedStatistics
+
+# Import réservé aux annotations (voir new_figure)
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+# Résolution des graphiques rendus (points par pouce)
+CHART_DPI = 100
+
+_chart_style_applied = False
+
+def new_figure(figsize) -> 'Figure':
+    """Créer une figure, en chargeant matplotlib et son style au premier appel
+    
+    matplotlib n'est importé qu'au premier graphique pour ne pas ralentir le
+    démarrage ; les modules de graphiques sont donc importés à la demande.
+    """
+    global _chart_style_applied
+    from matplotlib.figure import Figure
+    if not _chart_style_applied:
+        import matplotlib.style
+        matplotlib.style.use('default')
+        _chart_style_applied = True
+    return Figure(figsize=figsize, dpi=CHART_DPI)
 
 class StudentStats:
     """Classe pour les statistiques d'un étudiant"""
@@ -46,6 +77,186 @@ class StudentStats:
             'attendance_rate': round(self.attendance_rate, 2),
             'punctuality_rate': round(self.punctuality_rate, 2)
         }
+    
+    def apply_status(self, status: AttendanceStatus, delta: int = 1):
+        """Ajouter (delta=1) ou retirer (delta=-1) un statut des compteurs"""
+        self.total_sessions += delta
+        if status == AttendanceStatus.PRESENT:
+            self.present_count += delta
+        elif status == AttendanceStatus.ABSENT:
+            self.absent_count += delta
+        elif status == AttendanceStatus.LATE:
+            self.late_count += delta
+
+def attendance_ranking_key(stats: StudentStats) -> Tuple:
+    """Clé de classement : présence, puis ponctualité, puis nom (meilleur en premier)"""
+    return (-stats.attendance_rate, -stats.punctuality_rate,
+            stats.student_name.lower(), stats.student_id)
+
+def punctuality_ranking_key(stats: StudentStats) -> Tuple:
+    """Clé de classement : ponctualité, puis présence, puis nom (meilleur en premier)"""
+    return (-stats.punctuality_rate, -stats.attendance_rate,
+            stats.student_name.lower(), stats.student_id)
+
+RANKING_KEYS = {
+    'attendance': attendance_ranking_key,
+    'punctuality': punctuality_ranking_key
+}
+
+def top_k(stats_list, k: int, key=attendance_ranking_key) -> List[StudentStats]:
+    """Sélectionner les k meilleurs en O(n log k), du meilleur au moins bon"""
+    return heapq.nsmallest(k, stats_list, key=key)
+
+def bottom_k(stats_list, k: int, key=attendance_ranking_key) -> List[StudentStats]:
+    """Sélectionner les k derniers en O(n log k), du moins bon au meilleur"""
+    return heapq.nlargest(k, stats_list, key=key)
+
+class Leaderboard:
+    """Classement par présence maintenu de façon incrémentale
+    
+    Les compteurs de chaque étudiant sont mis à jour à chaque marquage et sa
+    position est corrigée par recherche dichotomique, sans recalculer le
+    classement complet.
+    """
+    
+    def __init__(self, student_manager, attendance_manager, key=attendance_ranking_key):
+        # La clé de classement doit se terminer par l'ID de l'étudiant
+        self.student_manager = student_manager
+        self.attendance_manager = attendance_manager
+        self.key = key
+        self._stats: Dict[str, StudentStats] = {}
+        self._entries: Dict[str, Tuple] = {}
+        self._order: List[Tuple] = []
+        
+        self.rebuild()
+        self.student_manager.add_observer(self)
+        self.attendance_manager.add_observer(self)
+    
+    def rebuild(self):
+        """Reconstruire entièrement le classement en un seul passage"""
+        self._stats = {student.student_id: StudentStats(student.student_id, student.get_full_name())
+                       for student in self.student_manager.get_all_students()}
+        
+        for session in self.attendance_manager.get_all_sessions():
+            for record in session.records.values():
+                stats = self._stats.get(record.student_id)
+                if stats:
+                    stats.apply_status(record.status)
+        
+        for stats in self._stats.values():
+            stats.calculate_rates()
+        
+        self._entries = {student_id: self.key(stats) for student_id, stats in self._stats.items()}
+        self._order = sorted(self._entries.values())
+    
+    def _remove_entry(self, student_id: str):
+        """Retirer un étudiant de l'ordre de classement"""
+        entry = self._entries.pop(student_id, None)
+        if entry is not None:
+            index = bisect_left(self._order, entry)
+            del self._order[index]
+    
+    def _insert_entry(self, student_id: str):
+        """Insérer un étudiant à sa place dans l'ordre de classement"""
+        entry = self.key(self._stats[student_id])
+        self._entries[student_id] = entry
+        insort(self._order, entry)
+    
+    def _load_student(self, student_id: str):
+        """Calculer les compteurs d'un étudiant ajouté (l'ID peut avoir un historique)"""
+        student = self.student_manager.get_student(student_id)
+        if not student:
+            return
+        
+        stats = StudentStats(student_id, student.get_full_name())
+        for record in self.attendance_manager.get_student_attendance(student_id):
+            stats.apply_status(record.status)
+        stats.calculate_rates()
+        
+        self._stats[student_id] = stats
+        self._insert_entry(student_id)
+    
+    def on_record_change(self, student_id, date_str, old_record, new_record):
+        """Mettre à jour un seul étudiant après un marquage"""
+        stats = self._stats.get(student_id)
+        if not stats:
+            return
+        
+        self._remove_entry(student_id)
+        if old_record:
+            stats.apply_status(old_record.status, -1)
+        if new_record:
+            stats.apply_status(new_record.status, 1)
+        stats.calculate_rates()
+        self._insert_entry(student_id)
+    
+    def on_attendance_change(self, event_type, date_str=None):
+        """Reconstruire le classement après un chargement complet"""
+        if event_type == 'load':
+            self.rebuild()
+    
+    def on_student_change(self, event_type, student_id=None):
+        """Suivre les ajouts, modifications et suppressions d'étudiants"""
+        if event_type == 'load':
+            self.rebuild()
+        elif event_type == 'add':
+            self._load_student(student_id)
+        elif event_type == 'delete':
+            self._remove_entry(student_id)
+            self._stats.pop(student_id, None)
+        elif event_type == 'update' and student_id in self._stats:
+            # Le nom sert de critère de départage
+            self._remove_entry(student_id)
+            self._stats[student_id].student_name = self.student_manager.get_student(student_id).get_full_name()
+            self._insert_entry(student_id)
+    
+    def __len__(self) -> int:
+        return len(self._order)
+    
+    def get_stats(self, student_id: str) -> Optional[StudentStats]:
+        """Récupérer une copie des statistiques d'un étudiant"""
+        stats = self._stats.get(student_id)
+        return copy(stats) if stats else None
+    
+    def get_all_stats(self) -> List[StudentStats]:
+        """Récupérer une copie des statistiques de tous les étudiants"""
+        return [copy(stats) for stats in self._stats.values()]
+    
+    def get_rank(self, student_id: str) -> Optional[int]:
+        """Récupérer le rang (à partir de 1) d'un étudiant en O(log n)"""
+        entry = self._entries.get(student_id)
+        if entry is None:
+            return None
+        return bisect_left(self._order, entry) + 1
+    
+    def top(self, k: int) -> List[StudentStats]:
+        """Récupérer les k premiers du classement en O(k)"""
+        return [copy(self._stats[entry[-1]]) for entry in self._order[:k]]
+    
+    def bottom(self, k: int) -> List[StudentStats]:
+        """Récupérer les k derniers du classement, du moins bon au meilleur"""
+        if k <= 0:
+            return []
+        return [copy(self._stats[entry[-1]]) for entry in reversed(self._order[-k:])]
+    
+    def ranked(self) -> List[StudentStats]:
+        """Récupérer le classement complet"""
+        return [copy(self._stats[entry[-1]]) for entry in self._order]
+
+    def iter_ranked(self) -> Iterator[StudentStats]:
+        """Parcourir le classement sans copie (statistiques en lecture seule)"""
+        for entry in self._order:
+            yield self._stats[entry[-1]]
+
+    def below_rate(self, threshold: float) -> List[StudentStats]:
+        """Récupérer les étudiants sous un taux de présence, du plus faible au plus élevé"""
+        results = []
+        for entry in reversed(self._order):
+            stats = self._stats[entry[-1]]
+            if stats.attendance_rate >= threshold:
+                break
+            results.append(copy(stats))
+        return results
 
 class StatisticsManager:
     """Gestionnaire pour les statistiques de présence"""
@@ -53,9 +264,15 @@ class StatisticsManager:
     def __init__(self, student_manager, attendance_manager):
         self.student_manager = student_manager
         self.attendance_manager = attendance_manager
-        
-        # Configuration pour les graphiques
-        plt.style.use('default')
+        self.leaderboard = Leaderboard(student_manager, attendance_manager)
+        self.index = AttendanceIndex(attendance_manager)
+        self._cubes: Dict[str, StatisticsCube] = {}
+        self.lateness = LatenessAnalytics(student_manager, attendance_manager)
+        self.streaks = StreakTracker(student_manager, attendance_manager, self.index)
+        self.risk_model = AbsenceRiskModel(student_manager, attendance_manager)
+        self.partitions = PartitionedStatistics(attendance_manager)
+        
+        # Configuration pour les graphiques (le style est appliqué par new_figure)
         self.colors = {
             'present': '#4CAF50',
             'absent': '#F44336',
@@ -64,42 +281,76 @@ class StatisticsManager:
             'secondary': '#9C27B0'
         }
     
-    def calculate_student_statistics(self, student_id: str) -> Optional[StudentStats]:
-        """Calculer les statistiques pour un étudiant spécifique"""
+    def _is_scoped(self, start_date: str = None, end_date: str = None,
+                   td_name: str = None) -> bool:
+        """Vérifier si une requête est restreinte à une plage de dates ou à un TD"""
+        return start_date is not None or end_date is not None or td_name is not None
+    
+    def calculate_student_statistics(self, student_id: str, start_date: str = None,
+                                     end_date: str = None, td_name: str = None) -> Optional[StudentStats]:
+        """Calculer les statistiques pour un étudiant spécifique
+        
+        Les bornes de dates sont incluses et au format AAAA-MM-JJ.
+        """
         student = self.student_manager.get_student(student_id)
         if not student:
             return None
         
-        stats = StudentStats(student_id, student.get_full_name())
-        records = self.attendance_manager.get_student_attendance(student_id)
+        if not self._is_scoped(start_date, end_date, td_name):
+            return self.leaderboard.get_stats(student_id)
         
-        stats.total_sessions = len(records)
+        counts = self.index.student_range_counts(student_id, start_date, end_date, td_name)
         
-        for record in records:
-            if record.status == AttendanceStatus.PRESENT:
-                stats.present_count += 1
-            elif record.status == AttendanceStatus.ABSENT:
-                stats.absent_count += 1
-            elif record.status == AttendanceStatus.LATE:
-                stats.late_count += 1
+        stats = StudentStats(student_id, student.get_full_name())
+        stats.total_sessions = counts['total']
+        stats.present_count = counts['present']
+        stats.absent_count = counts['absent']
+        stats.late_count = counts['late']
         
         stats.calculate_rates()
         return stats
     
-    def calculate_all_student_statistics(self) -> List[StudentStats]:
+    def calculate_all_student_statistics(self, start_date: str = None, end_date: str = None,
+                                         td_name: str = None) -> List[StudentStats]:
         """Calculer les statistiques pour tous les étudiants"""
+        if not self._is_scoped(start_date, end_date, td_name):
+            return self.leaderboard.get_all_stats()
+        
         stats_list = []
         
         for student in self.student_manager.get_all_students():
-            stats = self.calculate_student_statistics(student.student_id)
+            stats = self.calculate_student_statistics(student.student_id, start_date, end_date, td_name)
             if stats:
                 stats_list.append(stats)
         
         return stats_list
     
-    def get_overall_statistics(self) -> Dict:
+    def calculate_all_student_statistics_by_month(self, start_date: str = None, end_date: str = None,
+                                                  td_name: str = None) -> List[StudentStats]:
+        """Calculer les statistiques de tous les étudiants en map-reduce par mois
+        
+        Les mois sont comptés en parallèle puis gardés en cache : après un
+        marquage, seul le mois concerné est recompté.
+        """
+        counts_by_student = self.partitions.student_counts(start_date, end_date, td_name)
+        
+        stats_list = []
+        for student in self.student_manager.get_all_students():
+            stats = StudentStats(student.student_id, student.get_full_name())
+            counts = counts_by_student.get(student.student_id)
+            if counts:
+                stats.present_count, stats.absent_count, stats.late_count = counts
+                stats.total_sessions = sum(counts)
+            stats.calculate_rates()
+            stats_list.append(stats)
+        
+        return stats_list
+    
+    def get_overall_statistics(self, start_date: str = None, end_date: str = None,
+                               td_name: str = None) -> Dict:
         """Calculer les statistiques générales"""
-        all_stats = self.calculate_all_student_statistics()
+        scoped = self._is_scoped(start_date, end_date, td_name)
+        all_stats = self.calculate_all_student_statistics(start_date, end_date, td_name)
         
         if not all_stats:
             return {
@@ -108,22 +359,26 @@ class StatisticsManager:
                 'average_attendance_rate': 0.0,
                 'average_punctuality_rate': 0.0,
                 'best_student': None,
-                'needs_attention': []
+                'needs_attention': [],
+                'at_risk': []
             }
         
         total_students = len(all_stats)
-        total_sessions = len(self.attendance_manager.get_all_sessions())
+        total_sessions = self.index.range_counts(start_date, end_date, td_name)['sessions']
         
         # Calculer les moyennes
         avg_attendance = sum(stats.attendance_rate for stats in all_stats) / total_students
         avg_punctuality = sum(stats.punctuality_rate for stats in all_stats) / total_students
         
-        # Trouver le meilleur étudiant
-        best_student = max(all_stats, key=lambda x: x.attendance_rate)
-        
         # Étudiants ayant besoin d'attention (taux de présence < 70%)
-        needs_attention = [stats for stats in all_stats if stats.attendance_rate < 70]
-        needs_attention.sort(key=lambda x: x.attendance_rate)
+        if scoped:
+            best_student = top_k(all_stats, 1)[0]
+            needs_attention = sorted((stats for stats in all_stats if stats.attendance_rate < 70),
+                                     key=attendance_ranking_key, reverse=True)
+        else:
+            # Le meilleur étudiant est la tête du classement
+            best_student = self.leaderboard.top(1)[0]
+            needs_attention = self.leaderboard.below_rate(70)
         
         return {
             'total_students': total_students,
@@ -131,75 +386,240 @@ class StatisticsManager:
             'average_attendance_rate': round(avg_attendance, 2),
             'average_punctuality_rate': round(avg_punctuality, 2),
             'best_student': best_student,
-            'needs_attention': needs_attention
+            'needs_attention': needs_attention,
+            # Détection selon les règles configurées, sur l'état actuel
+            'at_risk': self.streaks.get_at_risk()
         }
     
-    def rank_students_by_attendance(self) -> List[StudentStats]:
+    def rank_students_by_attendance(self, start_date: str = None, end_date: str = None,
+                                    td_name: str = None) -> List[StudentStats]:
         """Classer les étudiants par taux de présence"""
-        all_stats = self.calculate_all_student_statistics()
-        return sorted(all_stats, key=lambda x: x.attendance_rate, reverse=True)
-    
-    def rank_students_by_punctuality(self) -> List[StudentStats]:
+        if not self._is_scoped(start_date, end_date, td_name):
+            return self.leaderboard.ranked()
+        return sorted(self.calculate_all_student_statistics(start_date, end_date, td_name),
+                      key=attendance_ranking_key)
+
+    def iter_ranked_statistics(self, start_date: str = None, end_date: str = None,
+                               td_name: str = None) -> Iterator[StudentStats]:
+        """Parcourir les étudiants par taux de présence, une statistique à la fois
+
+        Sans restriction, le classement incrémental est parcouru sans copie.
+        Sinon, seules les clés de classement sont triées et les statistiques
+        de chaque étudiant sont recalculées (par l'index) au fil du parcours.
+        """
+        if not self._is_scoped(start_date, end_date, td_name):
+            yield from self.leaderboard.iter_ranked()
+            return
+
+        keys = []
+        for student in self.student_manager.get_all_students():
+            stats = self.calculate_student_statistics(student.student_id, start_date, end_date, td_name)
+            if stats:
+                keys.append(attendance_ranking_key(stats))
+        keys.sort()
+
+        for key in keys:
+            stats = self.calculate_student_statistics(key[-1], start_date, end_date, td_name)
+            if stats:
+                yield stats
+
+    def rank_students_by_punctuality(self, start_date: str = None, end_date: str = None,
+                                     td_name: str = None) -> List[StudentStats]:
         """Classer les étudiants par taux de ponctualité"""
-        all_stats = self.calculate_all_student_statistics()
-        return sorted(all_stats, key=lambda x: x.punctuality_rate, reverse=True)
+        return sorted(self.calculate_all_student_statistics(start_date, end_date, td_name),
+                      key=punctuality_ranking_key)
+    
+    def get_top_students(self, k: int, by: str = 'attendance', start_date: str = None,
+                         end_date: str = None, td_name: str = None) -> List[StudentStats]:
+        """Récupérer les k meilleurs étudiants ('attendance' ou 'punctuality')"""
+        if by == 'attendance' and not self._is_scoped(start_date, end_date, td_name):
+            return self.leaderboard.top(k)
+        return top_k(self.calculate_all_student_statistics(start_date, end_date, td_name),
+                     k, RANKING_KEYS[by])
     
-    def get_attendance_trends(self, days: int = 30) -> Dict:
-        """Analyser les tendances de présence sur les derniers jours"""
-        sessions = self.attendance_manager.get_all_sessions()
-        if not sessions:
+    def get_bottom_students(self, k: int, by: str = 'attendance', start_date: str = None,
+                            end_date: str = None, td_name: str = None) -> List[StudentStats]:
+        """Récupérer les k derniers étudiants, du moins bon au meilleur"""
+        if by == 'attendance' and not self._is_scoped(start_date, end_date, td_name):
+            return self.leaderboard.bottom(k)
+        return bottom_k(self.calculate_all_student_statistics(start_date, end_date, td_name),
+                        k, RANKING_KEYS[by])
+    
+    def get_attendance_trends(self, days: int = 30, td_name: str = None) -> Dict:
+        """Analyser les tendances de présence sur les derniers jours calendaires
+        
+        La fenêtre se termine à la dernière session enregistrée.
+        """
+        dates = self.index.get_dates(td_name)
+        if not dates:
             return {'dates': [], 'attendance_rates': [], 'student_counts': []}
         
-        # Trier les sessions par date
-        sessions.sort(key=lambda x: x.date)
+        end = datetime.strptime(dates[-1], "%Y-%m-%d").date()
+        start = (end - timedelta(days=days - 1)).isoformat()
         
-        # Prendre les dernières sessions
-        recent_sessions = sessions[-days:] if len(sessions) > days else sessions
+        trends = {'dates': [], 'attendance_rates': [], 'student_counts': []}
+        for date_str, counts in self.index.session_points(start, end.isoformat(), td_name):
+            trends['dates'].append(date_str)
+            trends['attendance_rates'].append(counts['attendance_rate'] or 0)
+            trends['student_counts'].append(counts['total'])
         
-        dates = []
-        attendance_rates = []
-        student_counts = []
+        return trends
+    
+    def get_bucketed_trends(self, period: str = 'week', start_date: str = None,
+                            end_date: str = None, td_name: str = None) -> Dict:
+        """Agréger les présences par période calendaire (day, week, month, semester)
+        
+        Les périodes sans session ont un taux de présence à None.
+        """
+        buckets = self.index.bucket_counts(start_date, end_date, period, td_name)
+        return {
+            'period': period,
+            'periods': [bucket['period'] for bucket in buckets],
+            'start_dates': [bucket['start_date'] for bucket in buckets],
+            'attendance_rates': [bucket['attendance_rate'] for bucket in buckets],
+            'student_counts': [bucket['total'] for bucket in buckets],
+            'session_counts': [bucket['sessions'] for bucket in buckets],
+            'present': [bucket['present'] for bucket in buckets],
+            'absent': [bucket['absent'] for bucket in buckets],
+            'late': [bucket['late'] for bucket in buckets]
+        }
+    
+    def get_trend_series(self, start_date: str = None, end_date: str = None, td_name: str = None,
+                         max_points: int = None, max_bars: int = None) -> Dict:
+        """Récupérer la série des sessions réduite pour l'affichage
+        
+        Le taux de présence est réduit par LTTB à max_points points (pics et
+        creux conservés) ; les effectifs sont regroupés en au plus max_bars
+        paquets de sessions consécutives (moyenne, minimum, maximum).
+        None = pas de réduction. Le bord gauche de chaque barre est donné en
+        jours par rapport à sa première session (bar_offsets), sa largeur aussi.
+        """
+        points = self.index.session_points(start_date, end_date, td_name)
+        dates = [date_str for date_str, _ in points]
+        rates = [counts['attendance_rate'] or 0 for _, counts in points]
+        counts = [counts['total'] for _, counts in points]
+        
+        day_numbers = np.array(dates, dtype='datetime64[D]').astype(np.int64)
+        kept = lttb_indices(day_numbers, rates, max_points) if max_points else np.arange(len(dates))
+        buckets = aggregate_buckets(counts, max_bars or len(counts))
+        
+        # Chaque paquet occupe l'intervalle jusqu'au paquet suivant, décalé d'un demi-espacement
+        # entre sessions pour centrer une barre d'une seule session sur sa date
+        starts = day_numbers[buckets['starts']]
+        sizes = buckets['ends'] - buckets['starts']
+        slots = np.diff(starts).astype(np.float64)
+        if len(starts):
+            spacing = (slots / sizes[:-1]).min() if len(slots) else 1.0
+            slots = np.append(slots, day_numbers[-1] - starts[-1] + spacing)
+        offsets = -slots / (2 * sizes) + 0.1 * slots
         
-        for session in recent_sessions:
-            dates.append(session.date)
+        return {
+            'dates': [dates[i] for i in kept],
+            'attendance_rates': [rates[i] for i in kept],
+            'bar_start_dates': [dates[i] for i in buckets['starts']],
+            'bar_end_dates': [dates[i - 1] for i in buckets['ends']],
+            'bar_offsets': offsets.tolist(),
+            'bar_widths': (0.8 * slots).tolist(),
+            'student_counts': np.round(buckets['mean'], 2).tolist(),
+            'min_student_counts': buckets['min'].tolist(),
+            'max_student_counts': buckets['max'].tolist(),
+            'session_count': len(dates),
+            'downsampled': len(kept) < len(dates) or len(buckets['starts']) < len(dates)
+        }
+    
+    def get_statistics_by_period(self, period: str = 'semester', start_date: str = None,
+                                 end_date: str = None, td_name: str = None,
+                                 top_n: int = 5) -> List[Dict]:
+        """Calculer les statistiques générales et le classement de chaque période"""
+        results = []
+        for bucket in self.index.bucket_counts(start_date, end_date, period, td_name):
+            if not bucket['sessions']:
+                continue
+            first_day = max(bucket['start_date'], start_date or bucket['start_date'])
+            last_day = min(bucket['end_date'], end_date or bucket['end_date'])
             
-            records = session.get_all_records()
-            if records:
-                present_count = sum(1 for r in records 
-                                  if r.status in [AttendanceStatus.PRESENT, AttendanceStatus.LATE])
-                rate = (present_count / len(records)) * 100
-                attendance_rates.append(rate)
-                student_counts.append(len(records))
-            else:
-                attendance_rates.append(0)
-                student_counts.append(0)
+            results.append({
+                'period': bucket['period'],
+                'start_date': first_day,
+                'end_date': last_day,
+                'overall_statistics': self.get_overall_statistics(first_day, last_day, td_name),
+                'top_students': self.get_top_students(top_n, 'attendance', first_day, last_day, td_name)
+            })
+        return results
+    
+    def get_cube(self, period: str = 'week') -> StatisticsCube:
+        """Récupérer le cube groupe × TD × période (construit au premier appel)"""
+        if period not in self._cubes:
+            self._cubes[period] = StatisticsCube(self.student_manager, self.attendance_manager, period)
+        return self._cubes[period]
+    
+    def get_group_td_report(self, period: str = 'week') -> List[Dict]:
+        """Récupérer les présences par groupe, par TD et par période"""
+        return self.get_cube(period).get_rows()
+    
+    def get_lateness_statistics(self, by: str = None) -> Dict:
+        """Récupérer les percentiles, l'histogramme et la tendance des retards
         
+        by vaut 'student', 'group', 'td' ou None (tout l'historique).
+        """
         return {
-            'dates': dates,
-            'attendance_rates': attendance_rates,
-            'student_counts': student_counts
+            'percentiles': self.lateness.percentiles(by),
+            'histogram': self.lateness.histogram(by),
+            'trend': self.lateness.trend('week', by)
         }
     
-    def create_attendance_pie_chart(self, parent_frame) -> tk.Frame:
-        """Créer un graphique en secteurs pour les statistiques générales"""
-        # Calculer les données
-        overall_stats = self.get_overall_statistics()
-        all_student_stats = self.calculate_all_student_statistics()
+    def get_absence_risk(self, next_date: str = None, next_td: str = None,
+                         top_n: int = None) -> List[Dict]:
+        """Estimer la probabilité d'absence de chaque étudiant à la prochaine session
+        
+        Les étudiants sont triés du plus au moins à risque.
+        """
+        student_ids, probabilities = self.risk_model.score(next_date, next_td)
+        if top_n is None:
+            order = np.argsort(-probabilities, kind='stable')
+        else:
+            order = heapq.nlargest(top_n, range(len(student_ids)), key=lambda i: probabilities[i])
+        
+        results = []
+        for i in order:
+            student = self.student_manager.get_student(student_ids[i])
+            results.append({
+                'student_id': student_ids[i],
+                'student_name': student.get_full_name() if student else student_ids[i],
+                'absence_probability': round(float(probabilities[i]), 4)
+            })
+        return results
+    
+    def get_data_version(self) -> Tuple[int, int]:
+        """Récupérer la version courante des données (étudiants, présences)"""
+        return (self.student_manager.version, self.attendance_manager.version)
+    
+    def get_status_totals(self, start_date: str = None, end_date: str = None,
+                          td_name: str = None) -> Optional[Tuple[int, int, int]]:
+        """Calculer le total (présents, absents, retards) de tous les étudiants (None sans étudiant)"""
+        all_student_stats = self.calculate_all_student_statistics(start_date, end_date, td_name)
         
         if not all_student_stats:
-            # Créer un frame vide avec un message
-            empty_frame = tk.Frame(parent_frame)
-            tk.Label(empty_frame, text="Aucune donnée disponible", 
-                    font=('Arial', 12)).pack(expand=True)
-            return empty_frame
+            return None
         
+        return (sum(stats.present_count for stats in all_student_stats),
+                sum(stats.absent_count for stats in all_student_stats),
+                sum(stats.late_count for stats in all_student_stats))
+    
+    def build_attendance_pie_figure(self, figsize=(8, 6), start_date: str = None,
+                                    end_date: str = None, td_name: str = None) -> Optional['Figure']:
+        """Construire la figure en secteurs des statistiques générales (None sans données)"""
         # Calculer les totaux
-        total_present = sum(stats.present_count for stats in all_student_stats)
-        total_absent = sum(stats.absent_count for stats in all_student_stats)
-        total_late = sum(stats.late_count for stats in all_student_stats)
+        totals = self.get_status_totals(start_date, end_date, td_name)
+        
+        if totals is None:
+            return None
+        
+        total_present, total_absent, total_late = totals
         
         # Créer le graphique
-        fig, ax = plt.subplots(figsize=(8, 6))
+        fig = new_figure(figsize)
+        ax = fig.add_subplot()
         
         labels = ['Présent', 'Absent', 'En retard']
         sizes = [total_present, total_absent, total_late]
@@ -219,29 +639,20 @@ class StatisticsManager:
                 autotext.set_fontweight('bold')
         
         ax.set_title('Répartition Globale des Présences', fontsize=14, fontweight='bold')
-        
-        # Créer le frame et le canvas
-        chart_frame = tk.Frame(parent_frame)
-        canvas = FigureCanvasTkAgg(fig, chart_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        
-        plt.close(fig)  # Fermer la figure pour libérer la mémoire
-        return chart_frame
+        return fig
     
-    def create_student_comparison_chart(self, parent_frame, top_n: int = 10) -> tk.Frame:
-        """Créer un graphique comparatif des étudiants"""
+    def build_student_comparison_figure(self, figsize=(12, 8), top_n: int = 10, start_date: str = None,
+                                        end_date: str = None, td_name: str = None) -> Optional['Figure']:
+        """Construire la figure comparative des meilleurs étudiants (None sans données)"""
         # Obtenir les données
-        ranked_students = self.rank_students_by_attendance()[:top_n]
+        ranked_students = self.get_top_students(top_n, 'attendance', start_date, end_date, td_name)
         
         if not ranked_students:
-            empty_frame = tk.Frame(parent_frame)
-            tk.Label(empty_frame, text="Aucune donnée disponible", 
-                    font=('Arial', 12)).pack(expand=True)
-            return empty_frame
+            return None
         
         # Créer le graphique
-        fig, ax = plt.subplots(figsize=(12, 8))
+        fig = new_figure(figsize)
+        ax = fig.add_subplot()
         
         names = [stats.student_name for stats in ranked_students]
         attendance_rates = [stats.attendance_rate for stats in ranked_students]
@@ -260,43 +671,57 @@ class StatisticsManager:
         ax.set_ylim(0, 105)
         
         # Rotation des noms pour une meilleure lisibilité
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        
-        # Créer le frame et le canvas
-        chart_frame = tk.Frame(parent_frame)
-        canvas = FigureCanvasTkAgg(fig, chart_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        
-        plt.close(fig)
-        return chart_frame
+        ax.tick_params(axis='x', rotation=45)
+        for label in ax.get_xticklabels():
+            label.set_horizontalalignment('right')
+        fig.tight_layout()
+        return fig
     
-    def create_trends_chart(self, parent_frame, days: int = 30) -> tk.Frame:
-        """Créer un graphique des tendances de présence"""
-        trends = self.get_attendance_trends(days)
+    def build_trends_figure(self, figsize=(12, 10), days: int = 30, start_date: str = None,
+                            end_date: str = None, td_name: str = None) -> Optional['Figure']:
+        """Construire la figure des tendances de présence (None sans données)
+        
+        Sans start_date, la figure couvre les days derniers jours jusqu'à la
+        dernière session de la plage (days=None : tout l'historique) ; les
+        séries longues sont réduites selon la largeur de la figure.
+        """
+        if days and not start_date:
+            dates = [d for d in self.index.get_dates(td_name) if not end_date or d <= end_date]
+            if dates:
+                end = datetime.strptime(dates[-1], "%Y-%m-%d").date()
+                start_date = (end - timedelta(days=days - 1)).isoformat()
+        
+        width_pixels = figsize[0] * CHART_DPI
+        trends = self.get_trend_series(start_date, end_date, td_name,
+                                       point_budget(width_pixels),
+                                       point_budget(width_pixels, BAR_PIXELS_PER_BUCKET))
         
         if not trends['dates']:
-            empty_frame = tk.Frame(parent_frame)
-            tk.Label(empty_frame, text="Aucune donnée de tendance disponible", 
-                    font=('Arial', 12)).pack(expand=True)
-            return empty_frame
+            return None
         
         # Créer le graphique
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+        fig = new_figure(figsize)
+        ax1, ax2 = fig.subplots(2, 1, sharex=True)
         
-        dates = trends['dates']
+        dates = [datetime.strptime(d, "%Y-%m-%d").date() for d in trends['dates']]
+        bar_dates = [datetime.strptime(d, "%Y-%m-%d") + timedelta(days=offset)
+                     for d, offset in zip(trends['bar_start_dates'], trends['bar_offsets'])]
         
-        # Graphique 1: Taux de présence
-        ax1.plot(dates, trends['attendance_rates'], marker='o', 
+        # Graphique 1: Taux de présence (marqueurs seulement si toutes les sessions sont tracées)
+        ax1.plot(dates, trends['attendance_rates'], marker=None if trends['downsampled'] else 'o', 
                 color=self.colors['primary'], linewidth=2, markersize=6)
         ax1.set_ylabel('Taux de Présence (%)', fontweight='bold')
         ax1.set_title('Évolution du Taux de Présence', fontsize=12, fontweight='bold')
         ax1.grid(True, alpha=0.3)
         ax1.set_ylim(0, 105)
         
-        # Graphique 2: Nombre d'étudiants
-        ax2.bar(dates, trends['student_counts'], color=self.colors['secondary'], alpha=0.7)
+        # Graphique 2: Nombre d'étudiants (moyenne par paquet, min-max en trait)
+        ax2.bar(bar_dates, trends['student_counts'], width=trends['bar_widths'], align='edge',
+               color=self.colors['secondary'], alpha=0.7)
+        if trends['downsampled']:
+            centers = [d + timedelta(days=w / 2) for d, w in zip(bar_dates, trends['bar_widths'])]
+            ax2.vlines(centers, trends['min_student_counts'], trends['max_student_counts'],
+                      color=self.colors['secondary'], linewidth=1)
         ax2.set_ylabel('Nombre d\'Étudiants', fontweight='bold')
         ax2.set_xlabel('Date', fontweight='bold')
         ax2.set_title('Nombre d\'Étudiants par Session', fontsize=12, fontweight='bold')
@@ -306,69 +731,101 @@ class StatisticsManager:
         for ax in [ax1, ax2]:
             ax.tick_params(axis='x', rotation=45)
         
-        plt.tight_layout()
-        
-        # Créer le frame et le canvas
-        chart_frame = tk.Frame(parent_frame)
-        canvas = FigureCanvasTkAgg(fig, chart_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        fig.tight_layout()
+        return fig
+    
+    def build_calendar_heatmap_figure(self, figsize=(12, 4), student_id: str = None,
+                                      start_date: str = None, end_date: str = None,
+                                      td_name: str = None, metric: str = 'attendance_rate') -> Optional['Figure']:
+        """Construire le calendrier de présence (un seul imshow) (None sans données)"""
+        heatmap = self.get_calendar_heatmap(student_id, start_date, end_date, td_name, metric)
+        grid = heatmap['grid']
+        
+        if not np.isfinite(grid).any():
+            return None
         
-        plt.close(fig)
-        return chart_frame
+        # Créer le graphique
+        fig = new_figure(figsize)
+        ax = fig.add_subplot()
+        
+        cmap, vmin, vmax, label = heatmap_style(metric, grid)
+        image = ax.imshow(np.ma.masked_invalid(grid), aspect='auto', cmap=cmap,
+                          vmin=vmin, vmax=vmax, interpolation='nearest')
+        image.cmap.set_bad('#EEEEEE')
+        fig.colorbar(image, ax=ax, label=label)
+        
+        ax.set_yticks(range(len(WEEKDAY_LABELS)))
+        ax.set_yticklabels(WEEKDAY_LABELS)
+        positions, labels = month_ticks(heatmap['week_starts'])
+        ax.set_xticks(positions)
+        ax.set_xticklabels(labels, rotation=45, ha='right')
+        
+        student = self.student_manager.get_student(student_id) if student_id else None
+        title = f'Calendrier des Présences - {student.get_full_name()}' if student else 'Calendrier des Présences'
+        ax.set_title(title, fontsize=14, fontweight='bold')
+        
+        fig.tight_layout()
+        return fig
     
-    def export_statistics_report(self, filepath: str) -> bool:
-        """Exporter un rapport complet des statistiques"""
+    def export_statistics_report(self, filepath: str, start_date: str = None,
+                                 end_date: str = None, td_name: str = None,
+                                 report_format: str = None, progress=None) -> bool:
+        """Exporter un rapport complet des statistiques
+
+        Format 'json', 'ndjson' ou 'csv' (par défaut selon l'extension du
+        fichier) ; le rapport est écrit au fil du parcours des étudiants.
+        Les tendances ('trends') sont agrégées par semaine sur la période
+        choisie. progress(écrits, total) est appelé après chaque étudiant.
+        """
         try:
-            # Collecter toutes les données
-            overall_stats = self.get_overall_statistics()
-            all_student_stats = self.calculate_all_student_statistics()
-            ranked_students = self.rank_students_by_attendance()
-            
-            report = {
-                'generated_date': datetime.now().isoformat(),
-                'overall_statistics': overall_stats,
-                'student_statistics': [stats.to_dict() for stats in all_student_stats],
-                'ranking_by_attendance': [stats.to_dict() for stats in ranked_students],
-                'trends': self.get_attendance_trends()
-            }
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(report, f, ensure_ascii=False, indent=2)
-            
+            writer = StatisticsReportWriter(self, start_date, end_date, td_name, progress)
+            writer.write(filepath, report_format)
             return True
             
         except Exception as e:
             print(f"Erreur lors de l'export du rapport: {e}")
             return False
     
-    def get_attendance_calendar_data(self, student_id: str = None) -> Dict:
+    def get_calendar_heatmap(self, student_id: str = None, start_date: str = None, end_date: str = None,
+                             td_name: str = None, metric: str = 'attendance_rate') -> Dict:
+        """Calculer la grille du calendrier (jours × semaines), globale ou d'un étudiant
+        
+        La grille couvre la plage demandée, ou à défaut toutes les sessions.
+        """
+        # Bornes communes à tous les étudiants : la grille garde la même forme
+        session_dates = self.index.get_dates(td_name)
+        first_date = start_date or (session_dates[0] if session_dates else None)
+        last_date = end_date or (session_dates[-1] if session_dates else None)
+        
+        dates, counts = self.index.count_arrays(student_id, start_date, end_date, td_name)
+        if student_id is None:
+            # Ignorer les sessions créées sans aucun marquage
+            marked = counts.sum(axis=1) > 0
+            dates, counts = dates[marked], counts[marked]
+        return calendar_grid(dates, counts, metric, first_date, last_date)
+    
+    def get_attendance_calendar_data(self, student_id: str = None, start_date: str = None,
+                                     end_date: str = None, td_name: str = None) -> Dict:
         """Obtenir les données pour un calendrier de présence"""
-        if student_id:
-            records = self.attendance_manager.get_student_attendance(student_id)
-        else:
-            # Données globales
-            records = []
-            for session in self.attendance_manager.get_all_sessions():
-                records.extend(session.get_all_records())
-        
         calendar_data = {}
-        for record in records:
-            date_str = record.date
-            if date_str not in calendar_data:
+        
+        if student_id:
+            for date_str, status in self.index.student_points(student_id, start_date, end_date, td_name):
                 calendar_data[date_str] = {
-                    'present': 0,
-                    'absent': 0,
-                    'late': 0,
-                    'total': 0
+                    'present': int(status == AttendanceStatus.PRESENT),
+                    'absent': int(status == AttendanceStatus.ABSENT),
+                    'late': int(status == AttendanceStatus.LATE),
+                    'total': 1
                 }
-            
-            calendar_data[date_str]['total'] += 1
-            if record.status == AttendanceStatus.PRESENT:
-                calendar_data[date_str]['present'] += 1
-            elif record.status == AttendanceStatus.ABSENT:
-                calendar_data[date_str]['absent'] += 1
-            elif record.status == AttendanceStatus.LATE:
-                calendar_data[date_str]['late'] += 1
+        else:
+            # Données globales
+            for date_str, counts in self.index.session_points(start_date, end_date, td_name):
+                if counts['total']:
+                    calendar_data[date_str] = {
+                        'present': counts['present'],
+                        'absent': counts['absent'],
+                        'late': counts['late'],
+                        'total': counts['total']
+                    }
         
         return calendar_data
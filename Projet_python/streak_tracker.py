@@ -0,0 +1,283 @@
+"""
+Suivi des Absences
+Module suivant, pour chaque étudiant, les séries d'absences et le taux de
+présence récent afin de tenir à jour la liste des étudiants à risque
+"""
+
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+from attendance_manager import AttendanceStatus
+
+# Comparaisons autorisées dans les règles
+OPERATORS = {
+    '>=': lambda value, threshold: value >= threshold,
+    '>': lambda value, threshold: value > threshold,
+    '<=': lambda value, threshold: value <= threshold,
+    '<': lambda value, threshold: value < threshold
+}
+
+METRICS = ('current_streak', 'longest_streak', 'window_rate', 'attendance_rate', 'total_sessions')
+
+class RiskRule:
+    """Règle de détection : métrique, comparaison et seuil"""
+
+    def __init__(self, name: str, metric: str, operator: str, threshold: float,
+                 min_sessions: int = 0, label: str = ""):
+        if metric not in METRICS:
+            raise ValueError(f"Métrique inconnue: '{metric}'")
+        if operator not in OPERATORS:
+            raise ValueError(f"Opérateur inconnu: '{operator}'")
+        self.name = name
+        self.metric = metric
+        self.operator = operator
+        self.threshold = threshold
+        self.min_sessions = min_sessions
+        self.label = label or f"{metric} {operator} {threshold}"
+
+    def matches(self, state: 'StreakState') -> bool:
+        """Vérifier si l'état d'un étudiant déclenche la règle"""
+        if state.total_sessions < self.min_sessions:
+            return False
+        return OPERATORS[self.operator](state.get_metric(self.metric), self.threshold)
+
+    def to_dict(self) -> Dict:
+        """Convertir la règle en dictionnaire"""
+        return {
+            'name': self.name,
+            'metric': self.metric,
+            'operator': self.operator,
+            'threshold': self.threshold,
+            'min_sessions': self.min_sessions,
+            'label': self.label
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        """Créer une règle à partir d'un dictionnaire"""
+        return cls(
+            data['name'],
+            data['metric'],
+            data['operator'],
+            data['threshold'],
+            data.get('min_sessions', 0),
+            data.get('label', '')
+        )
+
+DEFAULT_RISK_RULES = [
+    RiskRule('consecutive_absences', 'current_streak', '>=', 3,
+             label="3 absences consécutives ou plus"),
+    RiskRule('recent_rate', 'window_rate', '<', 60, min_sessions=3,
+             label="Moins de 60% de présence sur les dernières sessions"),
+    RiskRule('overall_rate', 'attendance_rate', '<', 70, min_sessions=1,
+             label="Moins de 70% de présence au total")
+]
+
+def check_window_size(window_size) -> int:
+    """Vérifier la taille de la fenêtre du taux récent (au moins une session)"""
+    if isinstance(window_size, bool) or not isinstance(window_size, int) or window_size < 1:
+        raise ValueError(f"Taille de fenêtre invalide: '{window_size}' (au moins 1 session)")
+    return window_size
+
+class StreakState:
+    """État de présence d'un étudiant, mis à jour en O(1) par session ajoutée"""
+
+    def __init__(self, window_size: int):
+        self.window = deque()
+        self.window_size = window_size
+        self.window_attended = 0
+        self.last_date: Optional[str] = None
+        self.total_sessions = 0
+        self.attended_count = 0
+        self.current_streak = 0
+        self.longest_closed_streak = 0  # Plus longue série déjà terminée
+        self._undo = None
+
+    @property
+    def longest_streak(self) -> int:
+        return max(self.longest_closed_streak, self.current_streak)
+
+    @property
+    def window_rate(self) -> float:
+        return (self.window_attended / len(self.window)) * 100 if self.window else 0.0
+
+    @property
+    def attendance_rate(self) -> float:
+        return (self.attended_count / self.total_sessions) * 100 if self.total_sessions else 0.0
+
+    def get_metric(self, metric: str) -> float:
+        """Récupérer la valeur d'une métrique par son nom"""
+        return getattr(self, metric)
+
+    def append(self, date_str: str, attended: bool):
+        """Ajouter la session la plus récente"""
+        evicted = None
+        if len(self.window) == self.window_size:
+            evicted = self.window.popleft()
+            self.window_attended -= evicted
+        self._undo = (self.last_date, self.current_streak, self.longest_closed_streak, evicted)
+
+        self.window.append(int(attended))
+        self.window_attended += int(attended)
+        self.total_sessions += 1
+        self.attended_count += int(attended)
+        self.last_date = date_str
+
+        if attended:
+            self.longest_closed_streak = max(self.longest_closed_streak, self.current_streak)
+            self.current_streak = 0
+        else:
+            self.current_streak += 1
+
+    def replace_last(self, attended: bool) -> bool:
+        """Remplacer le statut de la session la plus récente (False si impossible en O(1))"""
+        if self._undo is None:
+            return False
+
+        last_date, current_streak, longest_closed_streak, evicted = self._undo
+        previous = self.window.pop()
+        self.window_attended -= previous
+        self.total_sessions -= 1
+        self.attended_count -= previous
+        if evicted is not None:
+            self.window.appendleft(evicted)
+            self.window_attended += evicted
+        date_str = self.last_date
+        self.last_date = last_date
+        self.current_streak = current_streak
+        self.longest_closed_streak = longest_closed_streak
+
+        self.append(date_str, attended)
+        return True
+
+    def to_dict(self) -> Dict:
+        """Convertir l'état en dictionnaire"""
+        return {
+            'total_sessions': self.total_sessions,
+            'current_streak': self.current_streak,
+            'longest_streak': self.longest_streak,
+            'window_rate': round(self.window_rate, 2),
+            'attendance_rate': round(self.attendance_rate, 2),
+            'last_date': self.last_date
+        }
+
+class StreakTracker:
+    """Suivi incrémental des séries d'absences et des étudiants à risque
+
+    Un marquage pour une date postérieure au dernier enregistrement de
+    l'étudiant, ou un changement de statut de ce dernier enregistrement,
+    coûte O(1) plus l'évaluation des règles. Seuls les marquages dans le
+    passé et les suppressions reconstruisent l'état de l'étudiant concerné.
+    """
+
+    def __init__(self, student_manager, attendance_manager, index,
+                 rules: List[RiskRule] = None, window_size: int = 5):
+        self.student_manager = student_manager
+        self.attendance_manager = attendance_manager
+        self.index = index
+        self.rules = list(rules if rules is not None else DEFAULT_RISK_RULES)
+        self.window_size = check_window_size(window_size)
+        self._states: Dict[str, StreakState] = {}
+        self._at_risk: Dict[str, List[str]] = {}
+
+        self.rebuild()
+        self.student_manager.add_observer(self)
+        self.attendance_manager.add_observer(self)
+
+    def set_rules(self, rules: List[RiskRule], window_size: int = None):
+        """Changer les règles (et la taille de fenêtre) puis réévaluer tout le monde"""
+        if window_size is not None:
+            check_window_size(window_size)
+        self.rules = list(rules)
+        if window_size is not None and window_size != self.window_size:
+            self.window_size = window_size
+            self.rebuild()
+        else:
+            for student_id in self._states:
+                self._evaluate(student_id)
+
+    def rebuild(self):
+        """Reconstruire l'état de tous les étudiants"""
+        self._states = {}
+        self._at_risk = {}
+        for student in self.student_manager.get_all_students():
+            self._load_student(student.student_id)
+
+    def _load_student(self, student_id: str):
+        """Reconstruire l'état d'un étudiant à partir de son historique"""
+        state = StreakState(self.window_size)
+        for date_str, status in self.index.student_points(student_id):
+            state.append(date_str, status != AttendanceStatus.ABSENT)
+        self._states[student_id] = state
+        self._evaluate(student_id)
+
+    def _evaluate(self, student_id: str):
+        """Réévaluer les règles pour un étudiant"""
+        state = self._states[student_id]
+        reasons = [rule.name for rule in self.rules if rule.matches(state)]
+        if reasons:
+            self._at_risk[student_id] = reasons
+        else:
+            self._at_risk.pop(student_id, None)
+
+    def on_record_change(self, student_id, date_str, old_record, new_record):
+        """Mettre à jour l'état d'un étudiant après un marquage"""
+        state = self._states.get(student_id)
+        if state is None:
+            return
+
+        if new_record and old_record is None and (state.last_date is None or date_str > state.last_date):
+            state.append(date_str, new_record.status != AttendanceStatus.ABSENT)
+        elif (new_record and old_record and date_str == state.last_date
+              and state.replace_last(new_record.status != AttendanceStatus.ABSENT)):
+            pass
+        else:
+            self._load_student(student_id)
+            return
+        self._evaluate(student_id)
+
+    def on_attendance_change(self, event_type, date_str=None):
+        """Reconstruire après un chargement complet"""
+        if event_type == 'load':
+            self.rebuild()
+
+    def on_student_change(self, event_type, student_id=None):
+        """Suivre les ajouts et suppressions d'étudiants"""
+        if event_type == 'load':
+            self.rebuild()
+        elif event_type == 'add':
+            self._load_student(student_id)
+        elif event_type == 'delete':
+            self._states.pop(student_id, None)
+            self._at_risk.pop(student_id, None)
+
+    def get_state(self, student_id: str) -> Optional[Dict]:
+        """Récupérer l'état de suivi d'un étudiant"""
+        state = self._states.get(student_id)
+        return state.to_dict() if state else None
+
+    def iter_at_risk(self) -> Iterator[Dict]:
+        """Parcourir les étudiants à risque, les plus longues séries en premier
+
+        Seuls les identifiants sont triés ; chaque entrée est construite au
+        moment où elle est parcourue.
+        """
+        def sort_key(student_id: str) -> Tuple:
+            state = self._states[student_id]
+            return (-state.current_streak, round(state.window_rate, 2), round(state.attendance_rate, 2))
+
+        labels = {rule.name: rule.label for rule in self.rules}
+        for student_id in sorted(self._at_risk, key=sort_key):
+            reasons = self._at_risk[student_id]
+            student = self.student_manager.get_student(student_id)
+            entry = self._states[student_id].to_dict()
+            entry.update({
+                'student_id': student_id,
+                'student_name': student.get_full_name() if student else student_id,
+                'reasons': reasons,
+                'reason_labels': [labels.get(reason, reason) for reason in reasons]
+            })
+            yield entry
+
+    def get_at_risk(self) -> List[Dict]:
+        """Récupérer les étudiants à risque, les plus longues séries en premier"""
+        return list(self.iter_at_risk())
@@ -66,6 +66,7 @@ class StudentManager:
     def __init__(self):
         self.students: Dict[str, Student] = {}
         self._observers = []
+        self.version = 0  # Incrémenté à chaque modification des données
     
     def add_observer(self, observer):
         """Ajouter un observateur pour les changements"""
@@ -73,6 +74,7 @@ class StudentManager:
     
     def notify_observers(self, event_type: str, student_id: str = None):
         """Notifier les observateurs des changements"""
+        self.version += 1
         for observer in self._observers:
             if hasattr(observer, 'on_student_change'):
                 observer.on_student_change(event_type, student_id)
@@ -0,0 +1,145 @@
+"""
+Recherche d'Étudiants
+Module de recherche au fil de la frappe : anti-rebond, filtrage dans un
+thread et annulation des requêtes dépassées par une frappe plus récente
+"""
+
+import queue
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Séparateur des champs d'un texte de recherche (absent de toute requête saisie)
+FIELD_SEPARATOR = '\x00'
+
+def search_text(student) -> str:
+    """Texte de recherche d'un étudiant : nom, prénom, ID, email et groupe en minuscules"""
+    return FIELD_SEPARATOR.join((student.first_name, student.last_name, student.student_id,
+                                 student.email, student.group)).lower()
+
+class AsyncStudentSearch:
+    """Recherche asynchrone des étudiants pour un champ de saisie Tk
+
+    Chaque frappe relance un délai d'anti-rebond ; à son échéance, le filtre
+    parcourt dans un thread une copie des textes de recherche (maintenus à
+    chaque modification d'étudiant) et envoie les ID trouvés par paquets.
+    Le thread Tk relève les paquets par root.after et les transmet à
+    on_results dès leur arrivée. Une nouvelle requête incrémente la
+    génération : le thread de la requête dépassée s'arrête et ses paquets
+    encore en file sont ignorés. Les étudiants sont parcourus dans l'ordre
+    donné par ordered_keys (l'ordre d'affichage), si bien que les résultats
+    arrivent déjà triés.
+    """
+
+    DEBOUNCE_MS = 200
+    POLL_MS = 30
+    BATCH_SIZE = 500
+
+    def __init__(self, root, student_manager, on_start: Callable[[], None],
+                 on_results: Callable[[List[str]], None],
+                 on_done: Optional[Callable[[], None]] = None,
+                 ordered_keys: Optional[Callable[[], Iterable[str]]] = None):
+        self.root = root
+        self.student_manager = student_manager
+        self.on_start = on_start
+        self.on_results = on_results
+        self.on_done = on_done
+        self.ordered_keys = ordered_keys
+        self._texts: Dict[str, str] = {}
+        self._generation = 0
+        self._searching = False
+        self._after_id = None
+        self._poll_id = None
+        self._results: 'queue.Queue[Tuple[int, List[str], bool]]' = queue.Queue()
+
+        self.rebuild()
+        self.student_manager.add_observer(self)
+
+    def rebuild(self):
+        """Recalculer les textes de recherche de tous les étudiants"""
+        self._texts = {student.student_id: search_text(student)
+                       for student in self.student_manager.get_all_students()}
+
+    def on_student_change(self, event_type, student_id=None):
+        """Maintenir le texte de recherche de l'étudiant modifié"""
+        if event_type == 'load' or student_id is None:
+            self.rebuild()
+        elif event_type == 'delete':
+            self._texts.pop(student_id, None)
+        else:
+            student = self.student_manager.get_student(student_id)
+            if student:
+                self._texts[student_id] = search_text(student)
+
+    def _ordered_ids(self) -> Iterable[str]:
+        """ID des étudiants dans l'ordre d'affichage (ordre naturel par défaut)"""
+        return self.ordered_keys() if self.ordered_keys else self._texts
+
+    def request(self, query: str, delay: int = None):
+        """Programmer une recherche, en annulant celle en attente ou en cours
+
+        Une requête vide affiche immédiatement tous les étudiants.
+        """
+        self._generation += 1
+        self._searching = False
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+        query = query.lower().strip()
+        if not query:
+            self.on_start()
+            self.on_results(list(self._ordered_ids()))
+            if self.on_done:
+                self.on_done()
+            return
+
+        delay = self.DEBOUNCE_MS if delay is None else delay
+        self._after_id = self.root.after(delay, self._start, self._generation, query)
+
+    def _start(self, generation: int, query: str):
+        """Lancer le filtrage dans un thread sur une copie des textes"""
+        self._after_id = None
+        if generation != self._generation:
+            return
+
+        self.on_start()
+        self._searching = True
+        texts = self._texts
+        items = [(student_id, texts[student_id]) for student_id in self._ordered_ids()
+                 if student_id in texts]
+        threading.Thread(target=self._run, args=(generation, query, items), daemon=True).start()
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.POLL_MS, self._poll)
+
+    def _run(self, generation: int, query: str, items: List[Tuple[str, str]]):
+        """Filtrer les étudiants (thread) en s'arrêtant si la requête est dépassée"""
+        batch = []
+        for start in range(0, len(items), self.BATCH_SIZE):
+            if generation != self._generation:
+                return
+            batch.extend(student_id for student_id, text in items[start:start + self.BATCH_SIZE]
+                         if query in text)
+            if len(batch) >= self.BATCH_SIZE:
+                self._results.put((generation, batch, False))
+                batch = []
+        self._results.put((generation, batch, True))
+
+    def _poll(self):
+        """Appliquer les paquets arrivés (thread Tk) tant que la recherche n'est pas finie"""
+        self._poll_id = None
+        while True:
+            try:
+                generation, batch, done = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self._generation:
+                continue
+            if batch:
+                self.on_results(batch)
+            if done:
+                self._searching = False
+                if self.on_done:
+                    self.on_done()
+
+        if self._searching:
+            self._poll_id = self.root.after(self.POLL_MS, self._poll)
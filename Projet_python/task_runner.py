@@ -0,0 +1,269 @@
+"""
+Tâches de Fond
+Module exécutant les opérations longues (export, import, sauvegardes,
+rapports, statistiques) dans un pool de threads : la progression et les
+résultats sont relevés par root.after dans le thread Tk, et un verrou
+sérialise les modifications des gestionnaires
+"""
+
+import itertools
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+class TaskCancelled(BaseException):
+    """Levée dans une tâche dont l'annulation a été demandée
+
+    Dérive de BaseException pour traverser les « except Exception » des
+    gestionnaires (qui affichent l'erreur et renvoient False).
+    """
+
+class Task:
+    """Tâche de fond : progression, annulation et callbacks de fin
+
+    La fonction exécutée reçoit la tâche en premier argument pour signaler
+    sa progression (report) et s'arrêter entre deux étapes si l'annulation
+    a été demandée (report et check_cancelled lèvent alors TaskCancelled).
+    """
+
+    # Écart minimal de progression entre deux signalements
+    REPORT_STEP = 0.01
+
+    def __init__(self, runner, task_id: int, description: str,
+                 on_done: Optional[Callable[[Any], None]] = None,
+                 on_error: Optional[Callable[[Exception], None]] = None,
+                 on_cancel: Optional[Callable[[], None]] = None):
+        self.runner = runner
+        self.task_id = task_id
+        self.description = description
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self.state = 'pending'  # pending, running, done, error, cancelled
+        self.progress: Optional[float] = None  # 0 à 1, None = indéterminée
+        self.message = description
+        self.future = None
+        self._cancel_event = threading.Event()
+        self._reported: Optional[float] = None
+
+    @property
+    def cancelled(self) -> bool:
+        """Vrai si l'annulation a été demandée"""
+        return self._cancel_event.is_set()
+
+    @property
+    def finished(self) -> bool:
+        """Vrai si la tâche est terminée (succès, erreur ou annulation)"""
+        return self.state in ('done', 'error', 'cancelled')
+
+    def cancel(self):
+        """Demander l'annulation (thread Tk) ; une tâche pas encore démarrée est retirée du pool"""
+        if self.finished:
+            return
+        self._cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            self.runner._post(self, 'cancelled', None)
+
+    def check_cancelled(self):
+        """Interrompre la tâche si son annulation a été demandée"""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report(self, done: float, total: float = None, message: str = None):
+        """Signaler la progression (done sur total, ou fraction si total est None)"""
+        self.check_cancelled()
+        fraction = done if total is None else (done / total if total else 1.0)
+        fraction = min(max(fraction, 0.0), 1.0)
+        if (message is None and self._reported is not None
+                and fraction - self._reported < self.REPORT_STEP and fraction < 1.0):
+            return
+        self._reported = fraction
+        self.runner._post(self, 'progress', (fraction, message))
+
+class TaskRunner:
+    """Pool de threads pour les opérations longues de l'interface
+
+    Les fonctions soumises s'exécutent dans le pool ; elles ne touchent
+    jamais à Tk. Leurs événements (démarrage, progression, résultat,
+    erreur, annulation) passent par une file relevée toutes les POLL_MS
+    millisecondes dans le thread Tk, où sont appelés les callbacks et les
+    observateurs (on_task_change).
+
+    write_lock sérialise l'accès aux gestionnaires : une tâche exclusive le
+    tient pendant toute son exécution, et les modifications faites depuis
+    l'interface passent par write(), qui les diffère (sans bloquer Tk) tant
+    qu'une tâche le détient.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, root, max_workers: int = 2):
+        self.root = root
+        self.write_lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='attendance-task')
+        self._events: 'queue.Queue[Tuple[Task, str, Any]]' = queue.Queue()
+        self._ids = itertools.count(1)
+        self._tasks: Dict[int, Task] = {}
+        self._keyed: Dict[str, Task] = {}
+        self._pending_writes: Deque[Tuple[Callable, tuple]] = deque()
+        self._poll_id = None
+        self._observers = []
+
+    def add_observer(self, observer):
+        """Ajouter un observateur des tâches (on_task_change)"""
+        self._observers.append(observer)
+
+    def notify_observers(self, event_type: str, task: Task):
+        """Notifier les observateurs (thread Tk)"""
+        for observer in self._observers:
+            if hasattr(observer, 'on_task_change'):
+                observer.on_task_change(event_type, task)
+
+    def get_active_tasks(self) -> List[Task]:
+        """Tâches en attente ou en cours, dans l'ordre de soumission"""
+        return list(self._tasks.values())
+
+    def submit(self, fn: Callable, *args, description: str = "Tâche",
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               on_cancel: Optional[Callable[[], None]] = None,
+               exclusive: bool = True, key: str = None, **kwargs) -> Task:
+        """Soumettre fn(task, *args, **kwargs) au pool
+
+        exclusive : tenir write_lock pendant toute la tâche (lecture
+        cohérente des gestionnaires). key : une nouvelle tâche de même clé
+        annule la précédente (par exemple un rafraîchissement dépassé).
+        """
+        if key is not None:
+            previous = self._keyed.get(key)
+            if previous is not None:
+                previous.cancel()
+
+        task = Task(self, next(self._ids), description, on_done, on_error, on_cancel)
+        self._tasks[task.task_id] = task
+        if key is not None:
+            self._keyed[key] = task
+        task.future = self._executor.submit(self._run, task, fn, args, kwargs, exclusive)
+        self.notify_observers('submitted', task)
+        self._schedule_poll()
+        return task
+
+    def write(self, fn: Callable, *args):
+        """Exécuter une modification des gestionnaires (thread Tk) sous write_lock
+
+        Si une tâche détient le verrou, la modification est mise en file et
+        exécutée, dans l'ordre, dès sa libération.
+        """
+        if not self._pending_writes and self.write_lock.acquire(blocking=False):
+            try:
+                fn(*args)
+            finally:
+                self.write_lock.release()
+        else:
+            self._pending_writes.append((fn, args))
+            self._schedule_poll()
+
+    def has_pending_writes(self) -> bool:
+        """Vrai si des modifications attendent la libération du verrou"""
+        return bool(self._pending_writes)
+
+    def cancel_all(self):
+        """Demander l'annulation de toutes les tâches actives"""
+        for task in self.get_active_tasks():
+            task.cancel()
+
+    def shutdown(self):
+        """Annuler les tâches et arrêter le pool sans attendre (fermeture de l'application)"""
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+
+    def _post(self, task: Task, event: str, value: Any):
+        """Transmettre un événement au thread Tk (appelable depuis tout thread)"""
+        self._events.put((task, event, value))
+
+    def _run(self, task: Task, fn: Callable, args: tuple, kwargs: dict, exclusive: bool):
+        """Exécuter la tâche dans un thread du pool"""
+        try:
+            task.check_cancelled()
+            self._post(task, 'started', None)
+            if exclusive:
+                with self.write_lock:
+                    task.check_cancelled()
+                    result = fn(task, *args, **kwargs)
+            else:
+                result = fn(task, *args, **kwargs)
+        except TaskCancelled:
+            self._post(task, 'cancelled', None)
+        except Exception as e:
+            self._post(task, 'error', e)
+        else:
+            self._post(task, 'done', result)
+
+    def _schedule_poll(self):
+        """Programmer le relevé de la file s'il ne l'est pas déjà"""
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.POLL_MS, self._poll)
+
+    def _poll(self):
+        """Relever les événements des tâches et exécuter les modifications en attente"""
+        self._poll_id = None
+        try:
+            while True:
+                try:
+                    task, event, value = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                self._handle(task, event, value)
+
+            self._flush_writes()
+        finally:
+            # Une erreur dans un callback ne doit pas arrêter le relevé
+            if self._tasks or self._pending_writes or not self._events.empty():
+                self._schedule_poll()
+
+    def _handle(self, task: Task, event: str, value: Any):
+        """Appliquer un événement de tâche dans le thread Tk"""
+        if task.finished:
+            return
+        if event == 'started':
+            task.state = 'running'
+        elif event == 'progress':
+            task.progress, message = value
+            if message:
+                task.message = message
+        else:
+            if event == 'done' and task.cancelled:
+                # Résultat arrivé après la demande d'annulation : il est ignoré
+                event = 'cancelled'
+            task.state = event
+            self._tasks.pop(task.task_id, None)
+            for key, keyed_task in list(self._keyed.items()):
+                if keyed_task is task:
+                    del self._keyed[key]
+
+            if event == 'done':
+                if task.on_done:
+                    task.on_done(value)
+            elif event == 'error':
+                if task.on_error:
+                    task.on_error(value)
+                else:
+                    print(f"Erreur dans la tâche « {task.description} »: {value}")
+            elif task.on_cancel:
+                task.on_cancel()
+        self.notify_observers(event, task)
+
+    def _flush_writes(self):
+        """Exécuter les modifications en attente si le verrou est libre"""
+        while self._pending_writes and self.write_lock.acquire(blocking=False):
+            fn, args = self._pending_writes.popleft()
+            try:
+                fn(*args)
+            finally:
+                self.write_lock.release()
@@ -11,6 +11,19 @@ from student_manager import StudentManager
 from attendance_manager import AttendanceManager, AttendanceStatus
 from statistics_manager import StatisticsManager
 from file_manager import FileManager
+from streak_tracker import RiskRule
+from virtual_list import VirtualTreeview
+from student_search import AsyncStudentSearch
+from task_runner import TaskRunner
+from lazy_tabs import LazyTabs
+from refresh_scheduler import RefreshScheduler
+from checkin_kiosk import CheckInDesk, CheckInKiosk
+from view_models import (AttendanceViewModel, NOT_MARKED, student_row, student_statistics_row,
+                         at_risk_row, overall_statistics_text, count_statuses, page_slice)
+from roster_index import RosterIndex
+
+# Liste d'appel regroupant tous les étudiants
+ALL_STUDENTS_LABEL = "Tous les étudiants"
 
 class AttendanceApp:
     """Application principale de gestion des présences"""
@@ -25,19 +38,44 @@ class AttendanceApp:
         self.statistics_manager = StatisticsManager(self.student_manager, self.attendance_manager)
         self.file_manager = FileManager(self.student_manager, self.attendance_manager)
         
+        # Lignes de la liste des présences, calculées sans Tk
+        self.attendance_view = AttendanceViewModel(self.student_manager, self.attendance_manager)
+        # Étudiants de chaque groupe et de chaque TD (listes d'appel)
+        self.roster_index = RosterIndex(self.student_manager, self.attendance_manager)
+        
+        # Opérations longues en tâches de fond (les modifications passent par tasks.write)
+        self.tasks = TaskRunner(self.root)
+        
+        # Vues à rafraîchir, regroupées une fois par passage à vide de la boucle Tk
+        self.scheduler = RefreshScheduler(self.root)
+        self.scheduler.register('students', self.refresh_students_list)
+        self.scheduler.register('attendance', self.refresh_attendance_list, self.update_attendance_rows)
+        self.scheduler.register('status_bar', self.update_status_bar)
+        self.scheduler.register('statistics', self.refresh_statistics)
+        self.scheduler.register('student_statistics', self.refresh_student_statistics)
+        self.scheduler.register('chart', self.refresh_current_chart)
+        self.scheduler.register('file_info', self.refresh_file_info)
+        
         # Variables pour l'interface
         self.current_td_name = tk.StringVar(value="TD/Cours")
         self.selected_date = tk.StringVar(value=date.today().isoformat())
+        self.session_start_time = tk.StringVar(value="")
         
         # Charger les données
         self.file_manager.load_all_data()
+        self.apply_risk_rules()
+        
+        # L'heure de début affichée suit la session de la date sélectionnée
+        self.load_session_start_time()
+        self.selected_date.trace_add('write', lambda *args: self.load_session_start_time())
         
         # Configurer l'interface
         self.setup_styles()
         self.create_main_interface()
+        self.tasks.add_observer(self)
         
         # Configurer la sauvegarde automatique
-        self.file_manager.setup_auto_save(self.root)
+        self.file_manager.setup_auto_save(self.root, self.tasks)
         
         # Observer les changements
         self.student_manager.add_observer(self)
@@ -132,19 +170,37 @@ class AttendanceApp:
         # En-tête
         self.create_header(self.scrollable_frame)
         
+        # État partagé entre onglets (les onglets sont construits à leur première sélection)
+        self.attendance_rows = {}
+        self.attendance_date = None
+        self.roster_var = tk.StringVar(value=ALL_STUDENTS_LABEL)
+        self.roster_choices = {ALL_STUDENTS_LABEL: None}
+        self.attendance_roster = None
+        self.attendance_page = 0
+        self.sort_var = tk.StringVar(value="attendance")
+        self.stats_start_var = tk.StringVar()
+        self.stats_end_var = tk.StringVar()
+        self.stats_td_var = tk.StringVar()
+        self.live_charts = {}
+        self.current_chart = None
+        
         # Notebook pour les onglets avec couleurs
         self.notebook = ttk.Notebook(self.scrollable_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True)
         
-        # Créer les onglets
-        self.create_students_tab()
-        self.create_attendance_tab()
-        self.create_statistics_tab()
-        self.create_settings_tab()
+        # Déclarer les onglets : chacun est construit et rempli à sa première sélection
+        self.tabs = LazyTabs()
+        self.tabs.add(self.notebook, 'students', "Gestion Étudiants", self.create_students_tab)
+        self.tabs.add(self.notebook, 'attendance', "Présences", self.create_attendance_tab)
+        self.tabs.add(self.notebook, 'statistics', "Statistiques", self.create_statistics_tab)
+        self.tabs.add(self.notebook, 'settings', "Paramètres", self.create_settings_tab)
         
         # Barre de statut
         self.create_status_bar(self.scrollable_frame)
         
+        # Construire l'onglet affiché au démarrage
+        self.tabs.update_visible()
+        
         # Bind pour la molette de la souris
         self.bind_mousewheel()
         
@@ -155,10 +211,13 @@ class AttendanceApp:
     def new_file(self):
         """Créer un nouveau fichier"""
         if messagebox.askyesno("Nouveau", "Êtes-vous sûr de vouloir créer un nouveau fichier? Les données non sauvegardées seront perdues."):
-            self.student_manager.students.clear()
-            self.attendance_manager.sessions.clear()
-            self.refresh_all_data()
-            self.update_status("Nouveau fichier créé")
+            def clear():
+                # Passer par les gestionnaires pour que les index et classements suivent
+                self.student_manager.load_from_dict({})
+                self.attendance_manager.load_from_dict({})
+                self.refresh_all_data()
+                self.update_status("Nouveau fichier créé")
+            self.tasks.write(clear)
     
     def open_file(self):
         """Ouvrir un fichier"""
@@ -167,11 +226,8 @@ class AttendanceApp:
             filetypes=[("Fichiers JSON", "*.json"), ("Tous les fichiers", "*.*")]
         )
         if file_path:
-            if self.file_manager.import_data(file_path):
-                self.refresh_all_data()
-                self.update_status("Fichier ouvert avec succès")
-            else:
-                messagebox.showerror("Erreur", "Impossible d'ouvrir le fichier")
+            self.load_data_file(file_path, "Fichier ouvert avec succès",
+                                "Impossible d'ouvrir le fichier")
     
     def save_as(self):
         """Sauvegarder sous"""
@@ -181,17 +237,20 @@ class AttendanceApp:
             filetypes=[("Fichiers JSON", "*.json"), ("Tous les fichiers", "*.*")]
         )
         if file_path:
-            if self.file_manager.export_data(file_path):
-                self.update_status("Fichier sauvegardé avec succès")
-            else:
-                messagebox.showerror("Erreur", "Impossible de sauvegarder le fichier")
+            self.submit_file_task("Sauvegarde du fichier", self.file_manager.export_data, file_path,
+                                  on_success=lambda: self.update_status("Fichier sauvegardé avec succès"),
+                                  error_message="Impossible de sauvegarder le fichier")
     
     def quit_application(self):
         """Quitter l'application"""
         if messagebox.askyesno("Quitter", "Voulez-vous vraiment quitter l'application?"):
             try:
-                self.file_manager.save_all_data()
                 self.file_manager.stop_auto_save(self.root)
+                self.tasks.shutdown()
+                self.statistics_manager.partitions.shutdown()
+                # Attendre la fin de la tâche en cours avant la dernière sauvegarde
+                with self.tasks.write_lock:
+                    self.file_manager.save_all_data()
             except:
                 pass
             self.root.quit()
@@ -199,7 +258,7 @@ class AttendanceApp:
     
     def create_new_session(self):
         """Créer une nouvelle session de présence"""
-        self.notebook.select(1)  # Aller à l'onglet présences
+        self.tabs.show('attendance')  # Aller à l'onglet présences
         self.set_today_date()
         self.load_attendance_session()
     
@@ -214,59 +273,68 @@ class AttendanceApp:
             if file_path.endswith('.txt'):
                 self.generate_text_report(file_path)
             else:
-                if self.statistics_manager.export_statistics_report(file_path):
+                def on_success():
                     self.update_status("Rapport généré avec succès")
                     messagebox.showinfo("Succès", f"Rapport sauvegardé dans :\n{file_path}")
-                else:
-                    messagebox.showerror("Erreur", "Impossible de générer le rapport")
+                
+                self.submit_file_task("Génération du rapport",
+                                      self.statistics_manager.export_statistics_report, file_path,
+                                      on_success=on_success, report_progress=True,
+                                      error_message="Impossible de générer le rapport")
     
     def generate_text_report(self, file_path):
-        """Générer un rapport au format texte"""
-        try:
-            overall_stats = self.statistics_manager.get_overall_statistics()
-            all_students = self.statistics_manager.calculate_all_student_statistics()
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write("=" * 60 + "\n")
-                f.write("RAPPORT DE PRÉSENCES - SYSTÈME DE GESTION\n")
-                f.write("=" * 60 + "\n\n")
-                f.write(f"Date de génération: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
-                f.write(f"Nom du TD/Cours: {self.current_td_name.get()}\n\n")
-                
-                # Statistiques générales
-                f.write("STATISTIQUES GÉNÉRALES\n")
-                f.write("-" * 30 + "\n")
-                f.write(f"Nombre total d'étudiants: {overall_stats['total_students']}\n")
-                f.write(f"Nombre total de sessions: {overall_stats['total_sessions']}\n")
-                f.write(f"Taux de présence moyen: {overall_stats['average_attendance_rate']:.1f}%\n")
-                f.write(f"Taux de ponctualité moyen: {overall_stats['average_punctuality_rate']:.1f}%\n\n")
-                
-                # Meilleur étudiant
-                if overall_stats['best_student']:
-                    best = overall_stats['best_student']
-                    f.write(f"Meilleur étudiant: {best.student_name} ({best.attendance_rate:.1f}%)\n\n")
-                
-                # Détails par étudiant
-                f.write("DÉTAILS PAR ÉTUDIANT\n")
-                f.write("-" * 30 + "\n")
-                for i, student in enumerate(sorted(all_students, key=lambda x: x.attendance_rate, reverse=True), 1):
-                    f.write(f"{i:2d}. {student.student_name}\n")
-                    f.write(f"    Sessions: {student.total_sessions}\n")
-                    f.write(f"    Présent: {student.present_count} | Absent: {student.absent_count} | Retard: {student.late_count}\n")
-                    f.write(f"    Taux présence: {student.attendance_rate:.1f}% | Taux ponctualité: {student.punctuality_rate:.1f}%\n\n")
-                
-                # Étudiants nécessitant attention
-                if overall_stats['needs_attention']:
-                    f.write("ÉTUDIANTS NÉCESSITANT ATTENTION (< 70%)\n")
-                    f.write("-" * 40 + "\n")
-                    for student in overall_stats['needs_attention']:
-                        f.write(f"- {student.student_name}: {student.attendance_rate:.1f}%\n")
-            
+        """Générer un rapport au format texte (tâche de fond)"""
+        def on_success():
             self.update_status("Rapport texte généré avec succès")
             messagebox.showinfo("Succès", f"Rapport sauvegardé dans :\n{file_path}")
+        
+        self.tasks.submit(self.write_text_report, file_path, self.current_td_name.get(),
+                          description="Génération du rapport texte",
+                          on_done=lambda result: on_success(),
+                          on_error=lambda e: messagebox.showerror("Erreur", f"Impossible de générer le rapport: {e}"))
+    
+    def write_text_report(self, task, file_path, td_label):
+        """Écrire le rapport texte (tâche de fond : aucun accès à Tk)"""
+        overall_stats = self.statistics_manager.get_overall_statistics()
+        all_students = self.statistics_manager.calculate_all_student_statistics()
+        task.report(0, len(all_students))
+        
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write("=" * 60 + "\n")
+            f.write("RAPPORT DE PRÉSENCES - SYSTÈME DE GESTION\n")
+            f.write("=" * 60 + "\n\n")
+            f.write(f"Date de génération: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
+            f.write(f"Nom du TD/Cours: {td_label}\n\n")
             
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Impossible de générer le rapport: {e}")
+            # Statistiques générales
+            f.write("STATISTIQUES GÉNÉRALES\n")
+            f.write("-" * 30 + "\n")
+            f.write(f"Nombre total d'étudiants: {overall_stats['total_students']}\n")
+            f.write(f"Nombre total de sessions: {overall_stats['total_sessions']}\n")
+            f.write(f"Taux de présence moyen: {overall_stats['average_attendance_rate']:.1f}%\n")
+            f.write(f"Taux de ponctualité moyen: {overall_stats['average_punctuality_rate']:.1f}%\n\n")
+            
+            # Meilleur étudiant
+            if overall_stats['best_student']:
+                best = overall_stats['best_student']
+                f.write(f"Meilleur étudiant: {best.student_name} ({best.attendance_rate:.1f}%)\n\n")
+            
+            # Détails par étudiant
+            f.write("DÉTAILS PAR ÉTUDIANT\n")
+            f.write("-" * 30 + "\n")
+            for i, student in enumerate(sorted(all_students, key=lambda x: x.attendance_rate, reverse=True), 1):
+                f.write(f"{i:2d}. {student.student_name}\n")
+                f.write(f"    Sessions: {student.total_sessions}\n")
+                f.write(f"    Présent: {student.present_count} | Absent: {student.absent_count} | Retard: {student.late_count}\n")
+                f.write(f"    Taux présence: {student.attendance_rate:.1f}% | Taux ponctualité: {student.punctuality_rate:.1f}%\n\n")
+                task.report(i, len(all_students))
+            
+            # Étudiants nécessitant attention
+            if overall_stats['needs_attention']:
+                f.write("ÉTUDIANTS NÉCESSITANT ATTENTION (< 70%)\n")
+                f.write("-" * 40 + "\n")
+                for student in overall_stats['needs_attention']:
+                    f.write(f"- {student.student_name}: {student.attendance_rate:.1f}%\n")
     
     def show_about(self):
         """Afficher les informations sur l'application"""
@@ -357,12 +425,14 @@ Développé avec Python et Tkinter"""
         edit_menu.add_command(label="Supprimer Étudiant", command=self.delete_student)
         edit_menu.add_separator()
         edit_menu.add_command(label="Créer Session", command=self.create_new_session)
+        edit_menu.add_command(label="Mode Borne d'Accueil", command=self.open_checkin_kiosk)
         
         # Menu Outils
         tools_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Outils", menu=tools_menu)
-        tools_menu.add_command(label="Statistiques", command=lambda: self.notebook.select(2))
+        tools_menu.add_command(label="Statistiques", command=lambda: self.tabs.show('statistics'))
         tools_menu.add_command(label="Générer Rapport", command=self.generate_report)
+        tools_menu.add_command(label="Exporter Graphiques", command=self.export_charts)
         tools_menu.add_separator()
         tools_menu.add_command(label="Sauvegarde", command=self.create_backup)
         tools_menu.add_command(label="Restaurer", command=self.restore_backup)
@@ -414,11 +484,8 @@ Développé avec Python et Tkinter"""
         ttk.Button(actions_frame, text="Actualiser", 
                   command=self.refresh_all_data).pack(side=tk.LEFT, padx=2)
     
-    def create_students_tab(self):
+    def create_students_tab(self, students_frame):
         """Créer l'onglet de gestion des étudiants"""
-        students_frame = ttk.Frame(self.notebook)
-        self.notebook.add(students_frame, text="Gestion Étudiants")
-        
         # Frame pour les contrôles
         controls_frame = ttk.LabelFrame(students_frame, text="Actions", padding="10")
         controls_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -441,6 +508,7 @@ Développé avec Python et Tkinter"""
         ttk.Label(search_frame, text="Rechercher:").pack(side=tk.LEFT)
         self.search_var = tk.StringVar()
         self.search_var.trace('w', self.filter_students)
+        self.search_results_pending = False
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=30)
         search_entry.pack(side=tk.LEFT, padx=(5, 0))
         
@@ -450,34 +518,41 @@ Développé avec Python et Tkinter"""
         
         # Treeview pour afficher les étudiants
         columns = ('ID', 'Nom', 'Prénom', 'Email', 'Groupe', 'Date création')
-        self.students_tree = ttk.Treeview(list_frame, columns=columns, show='headings', height=15)
+        # Liste virtualisée : seules les lignes visibles existent dans le Treeview
+        self.students_tree = VirtualTreeview(list_frame, columns, self.get_student_row_values, height=15)
         
-        # Configuration des colonnes
+        # Configuration des colonnes (clic : tri, Maj+clic : tri secondaire)
         for col in columns:
-            self.students_tree.heading(col, text=col, command=lambda c=col: self.sort_students(c))
+            self.students_tree.heading(col, text=col)
             self.students_tree.column(col, width=120)
+        self.students_tree.enable_sorting(lambda: [student.student_id for student in
+                                                   self.student_manager.get_all_students()])
         
         # Scrollbars
-        students_scrollbar_v = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.students_tree.yview)
-        students_scrollbar_h = ttk.Scrollbar(list_frame, orient=tk.HORIZONTAL, command=self.students_tree.xview)
-        self.students_tree.configure(yscrollcommand=students_scrollbar_v.set, xscrollcommand=students_scrollbar_h.set)
+        students_scrollbar_v = self.students_tree.scrollbar
+        students_scrollbar_h = ttk.Scrollbar(list_frame, orient=tk.HORIZONTAL, command=self.students_tree.tree.xview)
+        self.students_tree.tree.configure(xscrollcommand=students_scrollbar_h.set)
         
         # Placement
-        self.students_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.students_tree.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         students_scrollbar_v.pack(side=tk.RIGHT, fill=tk.Y)
         students_scrollbar_h.pack(side=tk.BOTTOM, fill=tk.X)
         
         # Bind double-click pour édition
         self.students_tree.bind('<Double-1>', lambda e: self.edit_student_dialog())
         
+        # Recherche au fil de la frappe, hors du thread de l'interface
+        self.student_search = AsyncStudentSearch(self.root, self.student_manager,
+                                                 self.begin_student_search,
+                                                 self.add_student_search_results,
+                                                 self.end_student_search,
+                                                 self.students_tree.ordered_keys)
+        
         # Charger les données initiales
         self.refresh_students_list()
     
-    def create_attendance_tab(self):
+    def create_attendance_tab(self, attendance_frame):
         """Créer l'onglet de marquage des présences"""
-        attendance_frame = ttk.Frame(self.notebook)
-        self.notebook.add(attendance_frame, text="Présences")
-        
         # Frame supérieur pour les contrôles
         top_frame = ttk.Frame(attendance_frame)
         top_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -490,11 +565,39 @@ Développé avec Python et Tkinter"""
         date_entry = ttk.Entry(date_frame, textvariable=self.selected_date, width=12)
         date_entry.pack(anchor=tk.W, pady=2)
         
+        ttk.Label(date_frame, text="Début (HH:MM):").pack(anchor=tk.W)
+        ttk.Entry(date_frame, textvariable=self.session_start_time, width=12).pack(anchor=tk.W, pady=2)
+        ttk.Button(date_frame, text="Effacer Début",
+                  command=self.clear_session_start_time).pack(fill=tk.X, pady=2)
+        
         ttk.Button(date_frame, text="Aujourd'hui", 
                   command=self.set_today_date).pack(fill=tk.X, pady=2)
         ttk.Button(date_frame, text="Charger Session", 
                   command=self.load_attendance_session).pack(fill=tk.X, pady=2)
         
+        # Liste d'appel : groupe ou TD, parcourue par pages
+        roster_frame = ttk.LabelFrame(top_frame, text="Liste d'Appel", padding="10")
+        roster_frame.pack(side=tk.LEFT, fill=tk.Y, padx=5)
+        
+        self.roster_combo = ttk.Combobox(roster_frame, textvariable=self.roster_var, state='readonly',
+                                         width=24, postcommand=self.update_roster_choices)
+        self.roster_combo.pack(anchor=tk.W, pady=2)
+        self.roster_combo.bind('<<ComboboxSelected>>', self.on_roster_selected)
+        
+        page_frame = ttk.Frame(roster_frame)
+        page_frame.pack(fill=tk.X, pady=2)
+        self.prev_page_button = ttk.Button(page_frame, text="◀", width=3,
+                                           command=lambda: self.change_attendance_page(-1))
+        self.prev_page_button.pack(side=tk.LEFT)
+        self.page_label = ttk.Label(page_frame, text="Page 1/1")
+        self.page_label.pack(side=tk.LEFT, expand=True)
+        self.next_page_button = ttk.Button(page_frame, text="▶", width=3,
+                                           command=lambda: self.change_attendance_page(1))
+        self.next_page_button.pack(side=tk.RIGHT)
+        
+        self.roster_summary_label = ttk.Label(roster_frame, text="", justify=tk.LEFT)
+        self.roster_summary_label.pack(anchor=tk.W, pady=2)
+        
         # Actions rapides avec couleurs
         actions_frame = ttk.LabelFrame(top_frame, text="Actions Rapides", padding="10")
         actions_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
@@ -511,6 +614,8 @@ Développé avec Python et Tkinter"""
         ttk.Button(quick_actions, text="💾 Sauvegarder Session", 
                   command=self.save_attendance_session,
                   style='Primary.TButton').pack(side=tk.LEFT, padx=2)
+        ttk.Button(quick_actions, text="🪪 Mode Borne", 
+                  command=self.open_checkin_kiosk).pack(side=tk.LEFT, padx=2)
         
         # Liste des présences
         list_frame = ttk.LabelFrame(attendance_frame, text="Marquage des Présences", padding="10")
@@ -518,7 +623,11 @@ Développé avec Python et Tkinter"""
         
         # Treeview pour les présences
         attendance_columns = ('ID', 'Nom', 'Prénom', 'Statut', 'Heure', 'Notes')
-        self.attendance_tree = ttk.Treeview(list_frame, columns=attendance_columns, show='headings', height=20)
+        # Valeurs de chaque ligne par ID d'étudiant (attendance_rows, pour la date
+        # attendance_date et la liste d'appel attendance_roster) ; seule la page
+        # courante est dans le modèle, et seules ses lignes visibles dans le Treeview
+        self.attendance_tree = VirtualTreeview(list_frame, attendance_columns,
+                                               self.attendance_rows.__getitem__, height=20)
         
         for col in attendance_columns:
             self.attendance_tree.heading(col, text=col)
@@ -526,12 +635,12 @@ Développé avec Python et Tkinter"""
                 self.attendance_tree.column(col, width=200)
             else:
                 self.attendance_tree.column(col, width=100)
+        self.attendance_tree.enable_sorting(lambda: self.attendance_rows, self.show_attendance_page)
         
         # Scrollbars
-        attendance_scrollbar_v = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.attendance_tree.yview)
-        self.attendance_tree.configure(yscrollcommand=attendance_scrollbar_v.set)
+        attendance_scrollbar_v = self.attendance_tree.scrollbar
         
-        self.attendance_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.attendance_tree.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         attendance_scrollbar_v.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Bind pour marquage rapide
@@ -543,29 +652,21 @@ Développé avec Python et Tkinter"""
         # Charger les données initiales
         self.refresh_attendance_list()
     
-    def create_statistics_tab(self):
+    def create_statistics_tab(self, stats_frame):
         """Créer l'onglet des statistiques"""
-        stats_frame = ttk.Frame(self.notebook)
-        self.notebook.add(stats_frame, text="Statistiques")
-        
-        # Notebook pour les sous-onglets de statistiques
+        # Notebook pour les sous-onglets de statistiques (construits eux aussi à la demande)
         stats_notebook = ttk.Notebook(stats_frame)
         stats_notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        # Onglet Vue d'ensemble
-        self.create_overview_tab(stats_notebook)
-        
-        # Onglet Étudiants
-        self.create_student_stats_tab(stats_notebook)
-        
-        # Onglet Graphiques
-        self.create_charts_tab(stats_notebook)
+        self.tabs.add(stats_notebook, 'overview', "Vue d'ensemble", self.create_overview_tab,
+                      parent='statistics')
+        self.tabs.add(stats_notebook, 'student_stats', "Par Étudiant", self.create_student_stats_tab,
+                      parent='statistics')
+        self.tabs.add(stats_notebook, 'charts', "Graphiques", self.create_charts_tab,
+                      parent='statistics')
     
-    def create_overview_tab(self, parent):
+    def create_overview_tab(self, overview_frame):
         """Créer l'onglet vue d'ensemble des statistiques"""
-        overview_frame = ttk.Frame(parent)
-        parent.add(overview_frame, text="Vue d'ensemble")
-        
         # Frame pour les statistiques générales
         general_frame = ttk.LabelFrame(overview_frame, text="Statistiques Générales", padding="10")
         general_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -578,12 +679,12 @@ Développé avec Python et Tkinter"""
         attention_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Treeview pour les étudiants en difficulté
-        attention_columns = ('Nom', 'Taux Présence', 'Présent', 'Absent', 'Retard')
+        attention_columns = ('Nom', 'Taux Présence', 'Taux Récent', 'Absences Consécutives', 'Motif')
         self.attention_tree = ttk.Treeview(attention_frame, columns=attention_columns, show='headings', height=10)
         
         for col in attention_columns:
             self.attention_tree.heading(col, text=col)
-            self.attention_tree.column(col, width=120)
+            self.attention_tree.column(col, width=300 if col == 'Motif' else 120)
         
         attention_scrollbar = ttk.Scrollbar(attention_frame, orient=tk.VERTICAL, command=self.attention_tree.yview)
         self.attention_tree.configure(yscrollcommand=attention_scrollbar.set)
@@ -598,23 +699,33 @@ Développé avec Python et Tkinter"""
         # Charger les statistiques initiales
         self.refresh_statistics()
     
-    def create_student_stats_tab(self, parent):
+    def create_student_stats_tab(self, student_stats_frame):
         """Créer l'onglet des statistiques par étudiant"""
-        student_stats_frame = ttk.Frame(parent)
-        parent.add(student_stats_frame, text="Par Étudiant")
-        
         # Contrôles
         controls_frame = ttk.Frame(student_stats_frame)
         controls_frame.pack(fill=tk.X, padx=5, pady=5)
         
         ttk.Label(controls_frame, text="Trier par:").pack(side=tk.LEFT)
         
-        sort_var = tk.StringVar(value="attendance")
-        sort_combo = ttk.Combobox(controls_frame, textvariable=sort_var, 
+        sort_combo = ttk.Combobox(controls_frame, textvariable=self.sort_var, 
                                  values=["attendance", "punctuality", "name"], 
                                  state="readonly", width=15)
         sort_combo.pack(side=tk.LEFT, padx=5)
-        sort_combo.bind('<<ComboboxSelected>>', lambda e: self.refresh_student_statistics())
+        sort_combo.bind('<<ComboboxSelected>>', lambda e: self.apply_statistics_scope())
+        
+        # Période et TD (vides = tout l'historique)
+        ttk.Label(controls_frame, text="Du:").pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Entry(controls_frame, textvariable=self.stats_start_var, width=11).pack(side=tk.LEFT, padx=2)
+        ttk.Label(controls_frame, text="Au:").pack(side=tk.LEFT)
+        ttk.Entry(controls_frame, textvariable=self.stats_end_var, width=11).pack(side=tk.LEFT, padx=2)
+        ttk.Label(controls_frame, text="TD:").pack(side=tk.LEFT, padx=(5, 0))
+        self.stats_td_combo = ttk.Combobox(controls_frame, textvariable=self.stats_td_var,
+                                           values=[""] + self.attendance_manager.get_td_names(),
+                                           state="readonly", width=15)
+        self.stats_td_combo.pack(side=tk.LEFT, padx=2)
+        self.stats_td_combo.bind('<<ComboboxSelected>>', lambda e: self.apply_statistics_scope())
+        ttk.Button(controls_frame, text="Appliquer",
+                  command=self.apply_statistics_scope).pack(side=tk.LEFT, padx=5)
         
         ttk.Button(controls_frame, text="Exporter Rapport", 
                   command=self.export_statistics_report).pack(side=tk.RIGHT)
@@ -642,14 +753,10 @@ Développé avec Python et Tkinter"""
         self.student_stats_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         student_stats_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        self.sort_var = sort_var
         self.refresh_student_statistics()
     
-    def create_charts_tab(self, parent):
+    def create_charts_tab(self, charts_frame):
         """Créer l'onglet des graphiques"""
-        charts_frame = ttk.Frame(parent)
-        parent.add(charts_frame, text="Graphiques")
-        
         # Contrôles pour les graphiques
         controls_frame = ttk.Frame(charts_frame)
         controls_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -660,22 +767,31 @@ Développé avec Python et Tkinter"""
                   command=self.show_comparison_chart).pack(side=tk.LEFT, padx=5)
         ttk.Button(controls_frame, text="Tendances", 
                   command=self.show_trends_chart).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls_frame, text="Calendrier", 
+                  command=self.show_calendar_chart).pack(side=tk.LEFT, padx=5)
+        
+        # Étudiant du calendrier (Tous = calendrier global)
+        self.calendar_student_var = tk.StringVar(value="Tous")
+        self.calendar_choices = {"Tous": None}
+        calendar_combo = ttk.Combobox(controls_frame, textvariable=self.calendar_student_var,
+                                      values=["Tous"], state="readonly", width=30,
+                                      postcommand=lambda: calendar_combo.configure(
+                                          values=self.get_calendar_student_choices()))
+        calendar_combo.pack(side=tk.LEFT, padx=5)
+        calendar_combo.bind('<<ComboboxSelected>>', lambda e: self.show_calendar_chart())
         
         # Frame pour afficher les graphiques
         self.charts_display_frame = ttk.Frame(charts_frame)
         self.charts_display_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Message initial
-        initial_label = ttk.Label(self.charts_display_frame, 
-                                text="Sélectionnez un graphique à afficher", 
-                                font=('Arial', 12))
-        initial_label.pack(expand=True)
+        self.charts_placeholder = ttk.Label(self.charts_display_frame, 
+                                          text="Sélectionnez un graphique à afficher", 
+                                          font=('Arial', 12))
+        self.charts_placeholder.pack(expand=True)
     
-    def create_settings_tab(self):
+    def create_settings_tab(self, settings_frame):
         """Créer l'onglet des paramètres"""
-        settings_frame = ttk.Frame(self.notebook)
-        self.notebook.add(settings_frame, text="Paramètres")
-        
         # Gestion des fichiers
         files_frame = ttk.LabelFrame(settings_frame, text="Gestion des Fichiers", padding="10")
         files_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -731,6 +847,14 @@ Développé avec Python et Tkinter"""
         
         self.info_label = ttk.Label(status_content, text="", style='Info.TLabel')
         self.info_label.pack(side=tk.RIGHT)
+        
+        # Progression des tâches de fond (affichée seulement pendant une tâche)
+        self.task_cancel_button = ttk.Button(status_content, text="Annuler",
+                                             command=self.cancel_current_task)
+        self.task_progress = ttk.Progressbar(status_content, orient=tk.HORIZONTAL,
+                                             length=150, mode='determinate', maximum=100)
+        self.task_label = ttk.Label(status_content, text="", style='Info.TLabel')
+        self.current_task = None
     
     def create_attendance_context_menu(self):
         """Créer le menu contextuel pour les présences"""
@@ -753,12 +877,14 @@ Développé avec Python et Tkinter"""
         dialog = StudentDialog(self.root, "Ajouter Étudiant")
         self.root.wait_window(dialog.dialog)
         if dialog.result:
-            try:
-                self.student_manager.add_student(**dialog.result)
-                self.refresh_students_list()
-                self.update_status("Étudiant ajouté avec succès")
-            except ValueError as e:
-                messagebox.showerror("Erreur", str(e))
+            def add():
+                try:
+                    self.student_manager.add_student(**dialog.result)
+                    self.scheduler.mark_dirty('students')
+                    self.update_status("Étudiant ajouté avec succès")
+                except ValueError as e:
+                    messagebox.showerror("Erreur", str(e))
+            self.tasks.write(add)
     
     def edit_student_dialog(self):
         """Ouvrir la boîte de dialogue pour modifier un étudiant"""
@@ -767,20 +893,21 @@ Développé avec Python et Tkinter"""
             messagebox.showwarning("Sélection", "Veuillez sélectionner un étudiant à modifier")
             return
         
-        item = self.students_tree.item(selection[0])
-        student_id = item['values'][0]
+        student_id = selection[0]
         student = self.student_manager.get_student(student_id)
         
         if student:
             dialog = StudentDialog(self.root, "Modifier Étudiant", student)
             self.root.wait_window(dialog.dialog)
             if dialog.result:
-                try:
-                    self.student_manager.update_student(student_id, **dialog.result)
-                    self.refresh_students_list()
-                    self.update_status("Étudiant modifié avec succès")
-                except ValueError as e:
-                    messagebox.showerror("Erreur", str(e))
+                def update():
+                    try:
+                        self.student_manager.update_student(student_id, **dialog.result)
+                        self.scheduler.mark_dirty('students')
+                        self.update_status("Étudiant modifié avec succès")
+                    except ValueError as e:
+                        messagebox.showerror("Erreur", str(e))
+                self.tasks.write(update)
     
     def delete_student(self):
         """Supprimer un étudiant sélectionné"""
@@ -789,116 +916,179 @@ Développé avec Python et Tkinter"""
             messagebox.showwarning("Sélection", "Veuillez sélectionner un étudiant à supprimer")
             return
         
-        item = self.students_tree.item(selection[0])
-        student_id = item['values'][0]
-        student_name = f"{item['values'][2]} {item['values'][1]}"
+        student_id = selection[0]
+        student = self.student_manager.get_student(student_id)
+        student_name = student.get_full_name() if student else student_id
         
         if messagebox.askyesno("Confirmation", 
                               f"Êtes-vous sûr de vouloir supprimer l'étudiant {student_name}?"):
-            try:
-                self.student_manager.delete_student(student_id)
-                self.refresh_students_list()
-                self.update_status("Étudiant supprimé avec succès")
-            except ValueError as e:
-                messagebox.showerror("Erreur", str(e))
+            def delete():
+                try:
+                    self.student_manager.delete_student(student_id)
+                    self.scheduler.mark_dirty('students')
+                    self.update_status("Étudiant supprimé avec succès")
+                except ValueError as e:
+                    messagebox.showerror("Erreur", str(e))
+            self.tasks.write(delete)
     
     def filter_students(self, *args):
-        """Filtrer la liste des étudiants"""
-        query = self.search_var.get()
-        students = self.student_manager.search_students(query)
-        self.populate_students_tree(students)
-    
-    def sort_students(self, column):
-        """Trier les étudiants par colonne"""
-        students = self.student_manager.get_all_students()
-        
-        if column == 'ID':
-            students.sort(key=lambda x: x.student_id)
-        elif column == 'Nom':
-            students.sort(key=lambda x: x.last_name.lower())
-        elif column == 'Prénom':
-            students.sort(key=lambda x: x.first_name.lower())
-        elif column == 'Email':
-            students.sort(key=lambda x: x.email.lower())
-        elif column == 'Groupe':
-            students.sort(key=lambda x: x.group.lower())
-        elif column == 'Date création':
-            students.sort(key=lambda x: x.created_date)
-        
-        self.populate_students_tree(students)
+        """Filtrer la liste des étudiants (recherche différée et asynchrone)"""
+        self.student_search.request(self.search_var.get())
+    
+    def begin_student_search(self):
+        """Début d'une recherche : la liste sera remplacée au premier paquet"""
+        self.search_results_pending = True
+    
+    def add_student_search_results(self, student_ids):
+        """Afficher un paquet de résultats dès son arrivée"""
+        if self.search_results_pending:
+            self.search_results_pending = False
+            self.students_tree.set_rows(student_ids)
+        else:
+            self.students_tree.append_rows(student_ids)
+    
+    def end_student_search(self):
+        """Fin d'une recherche : vider la liste si rien n'a été trouvé"""
+        if self.search_results_pending:
+            self.search_results_pending = False
+            self.students_tree.set_rows([])
+    
+    def sort_students(self, column, add=False):
+        """Trier les étudiants par colonne (un second tri sur la même colonne inverse l'ordre)"""
+        self.students_tree.sort_by(column, add)
     
     def refresh_students_list(self):
-        """Actualiser la liste des étudiants"""
-        students = self.student_manager.get_all_students()
-        self.populate_students_tree(students)
+        """Actualiser la liste des étudiants, en gardant la recherche en cours"""
+        if self.tabs.defer('students', self.refresh_students_list):
+            return
+        self.student_search.request(self.search_var.get(), delay=0)
+    
+    def get_student_row_values(self, student_id):
+        """Calculer les valeurs affichées pour un étudiant de la liste"""
+        return student_row(student_id, self.student_manager.get_student(student_id))
     
     def populate_students_tree(self, students):
-        """Remplir le TreeView avec la liste des étudiants"""
-        # Vider la liste
-        for item in self.students_tree.get_children():
-            self.students_tree.delete(item)
-        
-        # Ajouter les étudiants
-        for student in students:
-            created_date = student.created_date[:10] if student.created_date else ""
-            self.students_tree.insert('', tk.END, values=(
-                student.student_id,
-                student.last_name,
-                student.first_name,
-                student.email,
-                student.group,
-                created_date
-            ))
+        """Remplir la liste virtualisée avec les étudiants (seules les lignes visibles sont dessinées)"""
+        self.students_tree.set_rows([student.student_id for student in students])
     
     # Méthodes pour la gestion des présences
     def set_today_date(self):
         """Définir la date du jour"""
         self.selected_date.set(date.today().isoformat())
-        self.refresh_attendance_list()
+        self.scheduler.mark_dirty('attendance')
+    
+    def load_session_start_time(self):
+        """Afficher l'heure de début de la session de la date sélectionnée (vide sans session)"""
+        session = self.attendance_manager.get_session(self.selected_date.get().strip())
+        self.session_start_time.set(session.start_time if session else "")
     
     def load_attendance_session(self):
         """Charger une session de présence"""
-        self.refresh_attendance_list()
+        self.scheduler.mark_dirty('attendance')
         selected_date = self.selected_date.get()
         session = self.attendance_manager.get_session(selected_date)
         
         if session:
             self.current_td_name.set(session.td_name or "TD/Cours")
+            self.session_start_time.set(session.start_time)
             self.update_status(f"Session du {selected_date} chargée")
         else:
             self.update_status(f"Nouvelle session pour le {selected_date}")
     
     def refresh_attendance_list(self):
-        """Actualiser la liste des présences"""
-        # Vider la liste
-        for item in self.attendance_tree.get_children():
-            self.attendance_tree.delete(item)
+        """Actualiser la liste des présences
         
-        # Obtenir les étudiants et leurs présences
-        students = self.student_manager.get_all_students()
-        selected_date = self.selected_date.get()
-        session = self.attendance_manager.get_session(selected_date)
+        Les lignes sont identifiées par l'ID de l'étudiant ; seules celles
+        qui diffèrent des lignes affichées sont appliquées, et la liste
+        virtualisée ne réécrit que celles qui sont visibles.
+        """
+        if self.tabs.defer('attendance', self.refresh_attendance_list):
+            return
+        self.attendance_date = self.selected_date.get()
+        # Seuls les étudiants de la liste d'appel sont construits
+        student_ids = self.roster_index.get_student_ids(self.attendance_roster)
+        diff = self.attendance_view.diff(self.attendance_date, self.attendance_rows, student_ids)
+        self.apply_attendance_diff(diff, resort=True)
+    
+    def update_attendance_rows(self, student_ids):
+        """Mettre à jour les seules lignes de quelques étudiants (rafraîchissement groupé)"""
+        if self.tabs.defer('attendance', self.refresh_attendance_list):
+            # Onglet caché : la liste sera reconstruite à son affichage
+            return
+        if self.attendance_date != self.selected_date.get():
+            # Une autre date a été saisie : toute la liste change
+            self.refresh_attendance_list()
+            return
         
-        for student in students:
-            record = session.get_record(student.student_id) if session else None
-            
-            if record:
-                status = record.status.value
-                time_marked = record.time_marked
-                notes = record.notes
-            else:
-                status = "Non marqué"
-                time_marked = ""
-                notes = ""
-            
-            self.attendance_tree.insert('', tk.END, values=(
-                student.student_id,
-                student.last_name,
-                student.first_name,
-                status,
-                time_marked,
-                notes
-            ))
+        roster = self.attendance_roster
+        diff = self.attendance_view.diff_keys(
+            self.attendance_date, self.attendance_rows, student_ids,
+            is_member=lambda student_id: self.roster_index.contains(roster, student_id))
+        self.apply_attendance_diff(diff)
+    
+    def apply_attendance_diff(self, diff, resort=False):
+        """Appliquer une différence de lignes à la liste des présences
+        
+        Sans ajout ni suppression (et sans resort), les lignes modifiées
+        restent à leur place ; leur clé de tri servira au prochain tri.
+        """
+        if diff.is_empty() and not resort:
+            return
+        diff.apply_to(self.attendance_rows)
+        sorter = self.attendance_tree.sorter
+        for student_id in diff.removed:
+            sorter.remove(student_id)
+        for student_id in list(diff.changed) + list(diff.added):
+            sorter.invalidate(student_id)
+        
+        if resort or diff.changes_keys():
+            self.show_attendance_page()
+        else:
+            for student_id in diff.changed:
+                self.attendance_tree.refresh_key(student_id)
+        self.update_roster_summary()
+    
+    def get_attendance_page_size(self):
+        """Nombre d'étudiants par page de la liste des présences"""
+        return max(1, int(self.file_manager.config.get('attendance_page_size', 200)))
+    
+    def show_attendance_page(self):
+        """Afficher la page courante de la liste d'appel, rangée selon le tri courant"""
+        ordered = self.attendance_tree.sorter.sort(self.attendance_rows)
+        keys, self.attendance_page, page_count = page_slice(ordered, self.attendance_page,
+                                                            self.get_attendance_page_size())
+        self.attendance_tree.set_rows(keys)
+        self.page_label.config(text=f"Page {self.attendance_page + 1}/{page_count}")
+        self.prev_page_button.state(['disabled' if self.attendance_page == 0 else '!disabled'])
+        self.next_page_button.state(['disabled' if self.attendance_page == page_count - 1
+                                     else '!disabled'])
+    
+    def change_attendance_page(self, offset):
+        """Passer à la page précédente (-1) ou suivante (+1) de la liste d'appel"""
+        self.attendance_page += offset
+        self.show_attendance_page()
+    
+    def update_roster_summary(self):
+        """Afficher l'effectif de la liste d'appel et ses compteurs par statut"""
+        counts = count_statuses(self.attendance_rows.values())
+        labels = [status.value for status in AttendanceStatus] + [NOT_MARKED]
+        summary = "\n".join(f"{label}: {counts.get(label, 0)}" for label in labels)
+        self.roster_summary_label.config(text=f"Étudiants: {len(self.attendance_rows)}\n{summary}")
+    
+    def update_roster_choices(self):
+        """Proposer les groupes et les TD existants comme listes d'appel"""
+        self.roster_choices = {ALL_STUDENTS_LABEL: None}
+        for group in self.roster_index.get_groups():
+            self.roster_choices[f"Groupe : {group}"] = ('group', group)
+        for td_name in self.roster_index.get_td_names():
+            self.roster_choices[f"TD : {td_name}"] = ('td', td_name)
+        self.roster_combo['values'] = list(self.roster_choices)
+    
+    def on_roster_selected(self, event=None):
+        """Changer de liste d'appel et revenir à la première page"""
+        self.attendance_roster = self.roster_choices.get(self.roster_var.get())
+        self.attendance_page = 0
+        self.scheduler.mark_dirty('attendance')
     
     def quick_mark_attendance(self, event):
         """Marquage rapide de présence par double-clic"""
@@ -908,9 +1098,8 @@ Développé avec Python et Tkinter"""
     
     def cycle_attendance_status(self, item_id):
         """Faire défiler les statuts de présence"""
-        item = self.attendance_tree.item(item_id)
-        student_id = item['values'][0]
-        current_status = item['values'][3]
+        student_id = item_id
+        current_status = self.attendance_rows[item_id][3]
         
         # Cycle: Non marqué -> Présent -> Absent -> En retard -> Présent...
         if current_status == "Non marqué":
@@ -924,17 +1113,46 @@ Développé avec Python et Tkinter"""
         
         self.mark_student_attendance(student_id, new_status)
     
-    def mark_student_attendance(self, student_id, status, notes=""):
-        """Marquer la présence d'un étudiant"""
+    def apply_session_start_time(self, date_str, start_time):
+        """Enregistrer l'heure de début saisie pour une session (un champ vide ne change rien)"""
+        start_time = start_time.strip()
+        if start_time:
+            self.attendance_manager.set_session_start_time(date_str, start_time)
+    
+    def clear_session_start_time(self):
+        """Effacer l'heure de début de la session sélectionnée, après confirmation"""
         selected_date = self.selected_date.get()
-        td_name = self.current_td_name.get()
+        session = self.attendance_manager.get_session(selected_date)
+        if not session or not session.start_time:
+            self.session_start_time.set("")
+            return
+        if not messagebox.askyesno("Confirmation",
+                                   f"Effacer l'heure de début de la session du {selected_date} ? "
+                                   "Les retards calculés seront effacés."):
+            return
         
+        def clear():
+            self.attendance_manager.set_session_start_time(selected_date, "")
+            if self.selected_date.get() == selected_date:
+                self.session_start_time.set("")
+            self.update_status(f"Heure de début effacée pour le {selected_date}")
+        self.tasks.write(clear)
+    
+    def mark_student_attendance(self, student_id, status, notes=""):
+        """Marquer la présence d'un étudiant (différé si une tâche tient le verrou)"""
+        self.tasks.write(self._mark_student_attendance, student_id, status, notes,
+                         self.selected_date.get(), self.current_td_name.get(),
+                         self.session_start_time.get())
+    
+    def _mark_student_attendance(self, student_id, status, notes, selected_date, td_name, start_time=""):
+        """Marquer la présence d'un étudiant sous le verrou d'écriture"""
         try:
+            self.apply_session_start_time(selected_date, start_time)
             self.attendance_manager.mark_attendance(
                 student_id, selected_date, status, td_name, notes,
                 datetime.now().strftime("%H:%M:%S")
             )
-            self.refresh_attendance_list()
+            # La ligne est mise à jour par on_record_change
             self.update_status(f"Présence marquée pour {student_id}")
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur lors du marquage: {e}")
@@ -950,9 +1168,7 @@ Développé avec Python et Tkinter"""
         """Marquer la présence via le menu contextuel"""
         selection = self.attendance_tree.selection()
         if selection:
-            item = self.attendance_tree.item(selection[0])
-            student_id = item['values'][0]
-            self.mark_student_attendance(student_id, status)
+            self.mark_student_attendance(selection[0], status)
     
     def add_attendance_note(self):
         """Ajouter une note à la présence"""
@@ -960,159 +1176,317 @@ Développé avec Python et Tkinter"""
         if not selection:
             return
         
-        item = self.attendance_tree.item(selection[0])
-        student_id = item['values'][0]
-        current_notes = item['values'][5]
+        student_id = selection[0]
+        current_notes = self.attendance_rows[student_id][5]
         
         dialog = NoteDialog(self.root, "Ajouter/Modifier Note", current_notes)
         if dialog.result is not None:
             # Mettre à jour la note dans la base de données
             selected_date = self.selected_date.get()
-            session = self.attendance_manager.get_session(selected_date)
-            if session and student_id in session.records:
-                session.records[student_id].notes = dialog.result
-                self.refresh_attendance_list()
-                self.update_status("Note mise à jour")
+            def update_note():
+                session = self.attendance_manager.get_session(selected_date)
+                if session and student_id in session.records:
+                    session.records[student_id].notes = dialog.result
+                    self.scheduler.mark_dirty('attendance', student_id)
+                    self.update_status("Note mise à jour")
+            self.tasks.write(update_note)
     
     def mark_all_students(self, status):
-        """Marquer tous les étudiants avec le même statut"""
-        students = self.student_manager.get_all_students()
-        td_name = self.current_td_name.get()
-        selected_date = self.selected_date.get()
+        """Marquer les étudiants de la liste d'appel avec le même statut (différé si une tâche tient le verrou)"""
+        self.tasks.write(self._mark_all_students, status, self.selected_date.get(),
+                         self.current_td_name.get(), self.attendance_roster,
+                         self.session_start_time.get())
+    
+    def _mark_all_students(self, status, selected_date, td_name, roster=None, start_time=""):
+        """Marquer les étudiants de la liste d'appel (tous si roster est None) sous le verrou d'écriture"""
+        student_ids = self.roster_index.get_student_ids(roster)
+        
+        try:
+            self.apply_session_start_time(selected_date, start_time)
+        except ValueError as e:
+            messagebox.showerror("Erreur", str(e))
+            return
         
         count = 0
-        for student in students:
+        for student_id in student_ids:
             try:
                 self.attendance_manager.mark_attendance(
-                    student.student_id, selected_date, status, td_name,
+                    student_id, selected_date, status, td_name,
                     time_marked=datetime.now().strftime("%H:%M:%S")
                 )
                 count += 1
             except Exception as e:
-                print(f"Erreur pour {student.student_id}: {e}")
+                print(f"Erreur pour {student_id}: {e}")
         
-        self.refresh_attendance_list()
         self.update_status(f"{count} étudiants marqués comme {status.value.lower()}")
     
+    def open_checkin_kiosk(self):
+        """Ouvrir la borne d'accueil plein écran pour la session sélectionnée"""
+        selected_date = self.selected_date.get()
+        td_name = self.current_td_name.get()
+        start_time = self.session_start_time.get()
+        
+        def open_kiosk():
+            try:
+                self.apply_session_start_time(selected_date, start_time)
+            except ValueError as e:
+                messagebox.showerror("Erreur", str(e))
+                return
+            
+            grace_minutes = self.file_manager.config.get('checkin_grace_minutes', 5)
+            desk = CheckInDesk(self.student_manager, self.attendance_manager, selected_date,
+                               td_name, grace_seconds=grace_minutes * 60)
+            CheckInKiosk(self.root, desk, self.tasks.write,
+                         on_close=lambda count: self.update_status(
+                             f"Borne fermée : {count} arrivées enregistrées"))
+        self.tasks.write(open_kiosk)
+    
     def save_attendance_session(self):
         """Sauvegarder la session de présence"""
-        try:
-            self.file_manager.save_all_data()
-            self.update_status("Session sauvegardée avec succès")
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors de la sauvegarde: {e}")
+        self.submit_file_task("Sauvegarde de la session", self.file_manager.save_all_data,
+                              on_success=lambda: self.update_status("Session sauvegardée avec succès"),
+                              error_message="Erreur lors de la sauvegarde")
     
     # Méthodes pour les statistiques
     def refresh_statistics(self):
-        """Actualiser les statistiques générales"""
+        """Actualiser les statistiques générales (calculées en tâche de fond)"""
+        if self.tabs.defer('overview', self.refresh_statistics):
+            return
+        self.tasks.submit(self.compute_statistics, description="Calcul des statistiques",
+                          key='statistics', on_done=self.show_statistics)
+    
+    def compute_statistics(self, task):
+        """Calculer les textes et les lignes des statistiques générales (tâche de fond)"""
         overall_stats = self.statistics_manager.get_overall_statistics()
+        stats_text, best_text = overall_statistics_text(overall_stats)
+        return stats_text, best_text, [at_risk_row(entry) for entry in overall_stats['at_risk']]
+    
+    def show_statistics(self, result):
+        """Afficher les statistiques générales calculées"""
+        stats_text, best_text, at_risk_rows = result
         
         # Vider le frame des statistiques générales
         for widget in self.general_stats_frame.winfo_children():
             widget.destroy()
         
         # Afficher les statistiques générales
-        stats_text = f"Nombre d'étudiants: {overall_stats['total_students']}\n"
-        stats_text += f"Nombre de sessions: {overall_stats['total_sessions']}\n"
-        stats_text += f"Taux de présence moyen: {overall_stats['average_attendance_rate']:.1f}%\n"
-        stats_text += f"Taux de ponctualité moyen: {overall_stats['average_punctuality_rate']:.1f}%"
-        
         ttk.Label(self.general_stats_frame, text=stats_text, style='Info.TLabel').pack(anchor=tk.W)
-        
-        if overall_stats['best_student']:
-            best_text = f"Meilleur étudiant: {overall_stats['best_student'].student_name} "
-            best_text += f"({overall_stats['best_student'].attendance_rate:.1f}%)"
+        if best_text:
             ttk.Label(self.general_stats_frame, text=best_text, style='Success.TLabel').pack(anchor=tk.W)
         
         # Remplir la liste des étudiants nécessitant attention
         for item in self.attention_tree.get_children():
             self.attention_tree.delete(item)
         
-        for student_stats in overall_stats['needs_attention']:
-            self.attention_tree.insert('', tk.END, values=(
-                student_stats.student_name,
-                f"{student_stats.attendance_rate:.1f}%",
-                student_stats.present_count,
-                student_stats.absent_count,
-                student_stats.late_count
-            ))
+        for values in at_risk_rows:
+            self.attention_tree.insert('', tk.END, values=values)
     
-    def refresh_student_statistics(self):
-        """Actualiser les statistiques par étudiant"""
-        sort_method = self.sort_var.get()
+    def get_statistics_scope(self):
+        """Récupérer la période et le TD choisis (None = pas de filtre)
         
+        Les dates sont rendues au format AAAA-MM-JJ ; lève ValueError si une
+        date est invalide ou si la fin précède le début.
+        """
+        dates = []
+        for value in (self.stats_start_var.get().strip(), self.stats_end_var.get().strip()):
+            if not value:
+                dates.append(None)
+                continue
+            try:
+                dates.append(date.fromisoformat(value).isoformat())
+            except ValueError:
+                raise ValueError(f"Date invalide: '{value}' (format attendu AAAA-MM-JJ)")
+        start_date, end_date = dates
+        if start_date and end_date and end_date < start_date:
+            raise ValueError("La date de fin précède la date de début")
+        td_name = self.stats_td_var.get().strip() or None
+        return start_date, end_date, td_name
+    
+    def ask_statistics_scope(self):
+        """Récupérer la période et le TD choisis, ou None après un message d'erreur"""
+        try:
+            return self.get_statistics_scope()
+        except ValueError as e:
+            messagebox.showerror("Erreur", str(e))
+            return None
+    
+    def apply_statistics_scope(self):
+        """Recalculer les statistiques par étudiant avec la période et le TD saisis"""
+        if self.ask_statistics_scope() is not None:
+            self.refresh_student_statistics()
+            self.scheduler.mark_dirty('chart')
+    
+    def refresh_student_statistics(self):
+        """Actualiser les statistiques par étudiant (calculées en tâche de fond)"""
+        if self.tabs.defer('student_stats', self.refresh_student_statistics):
+            return
+        self.stats_td_combo.configure(values=[""] + self.attendance_manager.get_td_names())
+        try:
+            scope = self.get_statistics_scope()
+        except ValueError as e:
+            # Rafraîchissement automatique : pas de fenêtre, le message reste dans la barre de statut
+            self.update_status(str(e))
+            return
+        self.tasks.submit(self.compute_student_statistics, self.sort_var.get(), *scope,
+                          description="Calcul des statistiques par étudiant",
+                          key='student_statistics', on_done=self.show_student_statistics,
+                          on_error=lambda e: self.update_status(f"Erreur lors du calcul des statistiques: {e}"))
+    
+    def compute_student_statistics(self, task, sort_method, start_date, end_date, td_name):
+        """Calculer, trier et mettre en forme les statistiques par étudiant (tâche de fond)"""
+        scope = (start_date, end_date, td_name)
         if sort_method == "attendance":
-            stats_list = self.statistics_manager.rank_students_by_attendance()
+            stats_list = self.statistics_manager.rank_students_by_attendance(*scope)
         elif sort_method == "punctuality":
-            stats_list = self.statistics_manager.rank_students_by_punctuality()
+            stats_list = self.statistics_manager.rank_students_by_punctuality(*scope)
         else:  # name
-            stats_list = self.statistics_manager.calculate_all_student_statistics()
+            stats_list = self.statistics_manager.calculate_all_student_statistics(*scope)
             stats_list.sort(key=lambda x: x.student_name.lower())
-        
+        return [student_statistics_row(rank, stats) for rank, stats in enumerate(stats_list, 1)]
+    
+    def show_student_statistics(self, rows):
+        """Afficher les lignes des statistiques par étudiant calculées"""
         # Vider la liste
         for item in self.student_stats_tree.get_children():
             self.student_stats_tree.delete(item)
         
         # Remplir la liste
-        for rank, stats in enumerate(stats_list, 1):
-            self.student_stats_tree.insert('', tk.END, values=(
-                rank,
-                stats.student_name,
-                stats.total_sessions,
-                stats.present_count,
-                stats.absent_count,
-                stats.late_count,
-                f"{stats.attendance_rate:.1f}%",
-                f"{stats.punctuality_rate:.1f}%"
-            ))
+        for values in rows:
+            self.student_stats_tree.insert('', tk.END, values=values)
+    
+    def get_live_chart(self, chart_name):
+        """Récupérer un graphique persistant, créé à la première demande"""
+        chart = self.live_charts.get(chart_name)
+        if chart is None:
+            from live_charts import (LiveAttendancePieChart, LiveComparisonChart, LiveTrendsChart,
+                                     LiveCalendarHeatmap)
+            chart_classes = {
+                'attendance': LiveAttendancePieChart,
+                'comparison': LiveComparisonChart,
+                'trends': LiveTrendsChart,
+                'calendar': LiveCalendarHeatmap
+            }
+            # Mêmes période et TD que l'onglet des statistiques par étudiant
+            chart = chart_classes[chart_name](self.charts_display_frame, self.statistics_manager,
+                                              scope=self.get_chart_scope)
+            self.live_charts[chart_name] = chart
+        return chart
+    
+    def get_chart_scope(self):
+        """Portée des graphiques : celle des statistiques, ou aucun filtre si elle est invalide"""
+        try:
+            return self.get_statistics_scope()
+        except ValueError:
+            return None, None, None
+    
+    def show_live_chart(self, chart_name):
+        """Afficher un graphique persistant (créé une seule fois puis mis à jour sur place)"""
+        chart = self.get_live_chart(chart_name)
+        
+        # Masquer le graphique affiché sans le détruire
+        self.charts_placeholder.pack_forget()
+        if self.current_chart is not None and self.current_chart is not chart:
+            self.current_chart.pack_forget()
+        
+        chart.pack(fill=tk.BOTH, expand=True)
+        self.current_chart = chart
+        chart.refresh()
+    
+    def refresh_current_chart(self):
+        """Mettre à jour le graphique affiché après un changement de données"""
+        if self.tabs.defer('charts', self.refresh_current_chart):
+            return
+        if self.current_chart is not None:
+            self.current_chart.refresh()
     
     def show_attendance_chart(self):
         """Afficher le graphique des présences"""
-        # Vider le frame d'affichage
-        for widget in self.charts_display_frame.winfo_children():
-            widget.destroy()
-        
-        chart_frame = self.statistics_manager.create_attendance_pie_chart(self.charts_display_frame)
-        chart_frame.pack(fill=tk.BOTH, expand=True)
+        self.show_live_chart('attendance')
     
     def show_comparison_chart(self):
         """Afficher le graphique de comparaison des étudiants"""
-        for widget in self.charts_display_frame.winfo_children():
-            widget.destroy()
-        
-        chart_frame = self.statistics_manager.create_student_comparison_chart(self.charts_display_frame)
-        chart_frame.pack(fill=tk.BOTH, expand=True)
+        self.show_live_chart('comparison')
     
     def show_trends_chart(self):
         """Afficher le graphique des tendances"""
-        for widget in self.charts_display_frame.winfo_children():
-            widget.destroy()
+        self.show_live_chart('trends')
+    
+    def get_calendar_student_choices(self):
+        """Lister les choix du calendrier : « Tous » puis « ID - Nom » par étudiant"""
+        students = sorted(self.student_manager.get_all_students(), key=lambda x: x.get_full_name())
+        self.calendar_choices = {"Tous": None}
+        for student in students:
+            self.calendar_choices[f"{student.student_id} - {student.get_full_name()}"] = student.student_id
+        return list(self.calendar_choices)
+    
+    def show_calendar_chart(self):
+        """Afficher le calendrier de présence de l'étudiant choisi (ou global)"""
+        student_id = self.calendar_choices.get(self.calendar_student_var.get())
+        if student_id and not self.student_manager.get_student(student_id):
+            self.calendar_student_var.set("Tous")
+            student_id = None
         
-        chart_frame = self.statistics_manager.create_trends_chart(self.charts_display_frame)
-        chart_frame.pack(fill=tk.BOTH, expand=True)
+        # L'étudiant est choisi avant l'affichage : un seul rafraîchissement
+        self.get_live_chart('calendar').set_student(student_id)
+        self.show_live_chart('calendar')
     
     def export_statistics_report(self):
         """Exporter un rapport de statistiques"""
+        scope = self.ask_statistics_scope()
+        if scope is None:
+            return
+        
         filename = filedialog.asksaveasfilename(
             title="Exporter Rapport Statistiques",
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            filetypes=[("JSON files", "*.json"), ("NDJSON files", "*.ndjson"),
+                       ("CSV files", "*.csv"), ("All files", "*.*")]
         )
         
         if filename:
-            if self.statistics_manager.export_statistics_report(filename):
-                messagebox.showinfo("Succès", f"Rapport exporté vers {filename}")
+            self.submit_file_task("Export du rapport", self.statistics_manager.export_statistics_report,
+                                  filename, *scope, report_progress=True,
+                                  on_success=lambda: messagebox.showinfo("Succès", f"Rapport exporté vers {filename}"),
+                                  error_message="Erreur lors de l'export du rapport")
+    
+    def export_charts(self):
+        """Exporter un graphique par étudiant et par groupe (PNG) dans un dossier"""
+        scope = self.ask_statistics_scope()
+        if scope is None:
+            return
+        
+        directory = filedialog.askdirectory(title="Dossier d'export des graphiques")
+        if not directory:
+            return
+        
+        from chart_export import ChartExporter
+        
+        def export(task, start_date, end_date, td_name):
+            return ChartExporter(self.statistics_manager).export(directory, start_date=start_date,
+                                                                 end_date=end_date, td_name=td_name,
+                                                                 progress=task.report)
+        
+        def on_done(files):
+            if files:
+                self.update_status(f"{len(files)} graphiques exportés")
+                messagebox.showinfo("Succès", f"{len(files)} graphiques exportés vers {directory}")
             else:
-                messagebox.showerror("Erreur", "Erreur lors de l'export du rapport")
+                messagebox.showerror("Erreur", "Aucun graphique exporté")
+        
+        self.tasks.submit(export, *scope, description="Export des graphiques",
+                          on_done=on_done,
+                          on_error=lambda e: messagebox.showerror("Erreur", f"Erreur lors de l'export des graphiques: {e}"))
     
     # Méthodes pour les paramètres et fichiers
     def create_backup(self):
         """Créer une sauvegarde"""
-        if self.file_manager.create_backup():
+        def on_success():
             messagebox.showinfo("Succès", "Sauvegarde créée avec succès")
-            self.refresh_file_info()
-        else:
-            messagebox.showerror("Erreur", "Erreur lors de la création de la sauvegarde")
+            self.scheduler.mark_dirty('file_info')
+        
+        self.submit_file_task("Création de la sauvegarde", self.file_manager.create_backup,
+                              on_success=on_success,
+                              error_message="Erreur lors de la création de la sauvegarde")
     
     def restore_backup(self):
         """Restaurer une sauvegarde"""
@@ -1123,11 +1497,23 @@ Développé avec Python et Tkinter"""
         
         dialog = BackupDialog(self.root, backups)
         if dialog.result:
-            if self.file_manager.restore_backup(dialog.result):
-                messagebox.showinfo("Succès", "Sauvegarde restaurée avec succès")
-                self.refresh_all_data()
-            else:
-                messagebox.showerror("Erreur", "Erreur lors de la restauration")
+            # Copie et lecture des fichiers en tâche de fond, chargement dans le thread Tk
+            def apply(data):
+                if data is None:
+                    messagebox.showerror("Erreur", "Erreur lors de la restauration")
+                    return
+                
+                def load():
+                    self.file_manager.apply_data(data)
+                    self.apply_risk_rules()
+                    self.refresh_all_data()
+                    # Boîte de dialogue après la libération du verrou d'écriture
+                    self.root.after_idle(messagebox.showinfo, "Succès", "Sauvegarde restaurée avec succès")
+                self.tasks.write(load)
+            
+            self.tasks.submit(lambda task: self.file_manager.read_backup(dialog.result),
+                              description="Restauration de la sauvegarde", on_done=apply,
+                              on_error=lambda e: messagebox.showerror("Erreur", f"Erreur lors de la restauration: {e}"))
     
     def export_data(self):
         """Exporter toutes les données"""
@@ -1138,10 +1524,9 @@ Développé avec Python et Tkinter"""
         )
         
         if filename:
-            if self.file_manager.export_data(filename):
-                messagebox.showinfo("Succès", f"Données exportées vers {filename}")
-            else:
-                messagebox.showerror("Erreur", "Erreur lors de l'export")
+            self.submit_file_task("Export des données", self.file_manager.export_data, filename,
+                                  on_success=lambda: messagebox.showinfo("Succès", f"Données exportées vers {filename}"),
+                                  error_message="Erreur lors de l'export")
     
     def import_data(self):
         """Importer des données"""
@@ -1153,14 +1538,38 @@ Développé avec Python et Tkinter"""
         if filename:
             if messagebox.askyesno("Confirmation", 
                                   "L'import remplacera les données actuelles. Continuer?"):
-                if self.file_manager.import_data(filename):
-                    messagebox.showinfo("Succès", "Données importées avec succès")
-                    self.refresh_all_data()
-                else:
-                    messagebox.showerror("Erreur", "Erreur lors de l'import")
+                self.load_data_file(filename, "Données importées avec succès",
+                                    "Erreur lors de l'import", show_success=True)
+    
+    def load_data_file(self, file_path, success_message, error_message, show_success=False):
+        """Importer un fichier : lecture en tâche de fond, chargement dans le thread Tk,
+        puis sauvegarde des données importées en tâche de fond"""
+        def apply(import_data):
+            if import_data is None:
+                messagebox.showerror("Erreur", error_message)
+                return
+            
+            def load():
+                self.file_manager.apply_data(import_data, keep_local_config=True)
+                self.apply_risk_rules()
+                self.refresh_all_data()
+                self.submit_file_task("Sauvegarde des données importées",
+                                      self.file_manager.save_all_data,
+                                      error_message="Erreur lors de la sauvegarde des données importées")
+                self.update_status(success_message)
+                if show_success:
+                    # Boîte de dialogue après la libération du verrou d'écriture
+                    self.root.after_idle(messagebox.showinfo, "Succès", success_message)
+            self.tasks.write(load)
+        
+        self.tasks.submit(lambda task: self.file_manager.read_import(file_path),
+                          description="Lecture du fichier", on_done=apply,
+                          on_error=lambda e: messagebox.showerror("Erreur", f"{error_message}: {e}"))
     
     def refresh_file_info(self):
         """Actualiser les informations sur les fichiers"""
+        if self.tabs.defer('settings', self.refresh_file_info):
+            return
         for widget in self.file_info_frame.winfo_children():
             widget.destroy()
         
@@ -1181,38 +1590,75 @@ Développé avec Python et Tkinter"""
                 modified = info['modified'][:19] if info['modified'] else "Inconnu"
                 ttk.Label(frame, text=f"{size_kb:.1f} KB - Modifié: {modified}").pack(side=tk.LEFT, padx=(10, 0))
     
+    def apply_risk_rules(self):
+        """Appliquer les règles de détection des étudiants à risque de la configuration"""
+        config = self.file_manager.config
+        try:
+            rules = [RiskRule.from_dict(data) for data in config.get('risk_rules', [])]
+        except (KeyError, ValueError) as e:
+            print(f"Règles de détection invalides, règles par défaut conservées: {e}")
+            return
+        
+        def set_rules():
+            try:
+                self.statistics_manager.streaks.set_rules(rules, config.get('risk_window_size', 5))
+            except ValueError as e:
+                print(f"Règles de détection invalides, règles par défaut conservées: {e}")
+        self.tasks.write(set_rules)
+    
     def update_auto_save_config(self):
         """Mettre à jour la configuration de sauvegarde automatique"""
         self.file_manager.config['auto_save'] = self.auto_save_var.get()
         self.file_manager.save_config()
         
         if self.auto_save_var.get():
-            self.file_manager.setup_auto_save(self.root)
+            self.file_manager.stop_auto_save(self.root)
+            self.file_manager.setup_auto_save(self.root, self.tasks)
         else:
             self.file_manager.stop_auto_save(self.root)
     
     # Méthodes utilitaires
     def quick_save(self):
-        """Sauvegarde rapide"""
-        try:
-            self.file_manager.save_all_data()
-            self.update_status("Données sauvegardées")
-        except Exception as e:
-            self.update_status(f"Erreur de sauvegarde: {e}")
+        """Sauvegarde rapide (tâche de fond)"""
+        def on_done(saved):
+            self.update_status("Données sauvegardées" if saved else "Erreur de sauvegarde")
+        
+        self.tasks.submit(lambda task: self.file_manager.save_all_data(),
+                          description="Sauvegarde", key='save', on_done=on_done,
+                          on_error=lambda e: self.update_status(f"Erreur de sauvegarde: {e}"))
+    
+    def submit_file_task(self, description, fn, *args, on_success=None, error_message="Erreur",
+                         report_progress=False):
+        """Exécuter en tâche de fond une opération renvoyant un booléen (style FileManager)
+        
+        report_progress : passer task.report à l'opération (argument progress).
+        """
+        def run(task):
+            if report_progress:
+                return fn(*args, progress=task.report)
+            return fn(*args)
+        
+        def on_done(succeeded):
+            if succeeded:
+                if on_success:
+                    on_success()
+            else:
+                messagebox.showerror("Erreur", error_message)
+        
+        return self.tasks.submit(run, description=description, on_done=on_done,
+                                 on_error=lambda e: messagebox.showerror("Erreur", f"{error_message}: {e}"))
     
     def refresh_all_data(self):
-        """Actualiser toutes les données"""
-        self.refresh_students_list()
-        self.refresh_attendance_list()
-        self.refresh_statistics()
-        self.refresh_student_statistics()
-        self.refresh_file_info()
+        """Actualiser toutes les données (au prochain passage à vide de la boucle Tk)"""
+        for view in ('students', 'attendance', 'status_bar', 'statistics', 'student_statistics',
+                     'file_info'):
+            self.scheduler.mark_dirty(view)
         self.update_status("Données actualisées")
     
     def update_status(self, message):
-        """Mettre à jour le message de statut"""
+        """Mettre à jour le message de statut (effacé 5 s après le dernier message)"""
         self.status_label.config(text=message)
-        self.root.after(5000, lambda: self.status_label.config(text="Prêt"))
+        self.scheduler.after('status', 5000, lambda: self.status_label.config(text="Prêt"))
     
     def update_status_bar(self):
         """Mettre à jour la barre de statut avec les informations"""
@@ -1221,19 +1667,82 @@ Développé avec Python et Tkinter"""
         info_text = f"Étudiants: {student_count} | Sessions: {session_count}"
         self.info_label.config(text=info_text)
     
+    def cancel_current_task(self):
+        """Annuler la tâche de fond affichée dans la barre de statut"""
+        if self.current_task is not None:
+            self.update_status(f"Annulation : {self.current_task.description}")
+            self.current_task.cancel()
+    
+    def update_task_progress(self):
+        """Afficher la progression de la plus ancienne tâche active (masquée sinon)"""
+        tasks = self.tasks.get_active_tasks()
+        if not tasks:
+            self.current_task = None
+            self.task_progress.stop()
+            for widget in (self.task_cancel_button, self.task_progress, self.task_label):
+                widget.pack_forget()
+            return
+        
+        if self.current_task is None:
+            self.task_cancel_button.pack(side=tk.RIGHT, padx=(5, 10))
+            self.task_progress.pack(side=tk.RIGHT, padx=5)
+            self.task_label.pack(side=tk.RIGHT, padx=5)
+        
+        task = tasks[0]
+        if task is not self.current_task:
+            self.task_progress.stop()
+            self.current_task = task
+        
+        if task.progress is None:
+            # Progression inconnue : barre animée
+            if str(self.task_progress.cget('mode')) != 'indeterminate':
+                self.task_progress.configure(mode='indeterminate')
+                self.task_progress.start(15)
+        else:
+            if str(self.task_progress.cget('mode')) != 'determinate':
+                self.task_progress.stop()
+                self.task_progress.configure(mode='determinate')
+            self.task_progress['value'] = task.progress * 100
+        
+        text = task.message
+        if len(tasks) > 1:
+            text += f" (+{len(tasks) - 1})"
+        self.task_label.config(text=text)
+    
     # Méthodes d'observation
+    def on_task_change(self, event_type, task):
+        """Réagir à l'avancement des tâches de fond"""
+        self.update_task_progress()
+    
     def on_student_change(self, event_type, student_id=None):
         """Réagir aux changements d'étudiants"""
         if event_type in ['add', 'update', 'delete', 'load']:
-            self.refresh_students_list()
-            self.refresh_attendance_list()
-            self.update_status_bar()
+            # Clés de tri de la liste des étudiants (tenues à jour même onglet caché)
+            if self.tabs.is_built('students'):
+                sorter = self.students_tree.sorter
+                if event_type == 'delete' and student_id is not None:
+                    sorter.remove(student_id)
+                else:
+                    sorter.invalidate(None if event_type == 'load' else student_id)
+            self.scheduler.mark_dirty('students')
+            self.scheduler.mark_dirty('attendance', None if event_type == 'load' else student_id)
+            self.scheduler.mark_dirty('status_bar')
+        self.scheduler.mark_dirty('chart')
     
     def on_attendance_change(self, event_type, date_str=None):
         """Réagir aux changements de présence"""
-        if event_type in ['attendance_marked', 'session_created', 'load']:
-            self.refresh_attendance_list()
-            self.update_status_bar()
+        # Les marquages et les retards recalculés sont affichés ligne par ligne par on_record_change
+        if event_type == 'load':
+            self.scheduler.mark_dirty('attendance')
+            self.load_session_start_time()
+        if event_type in ['attendance_marked', 'session_created', 'session_deleted', 'load']:
+            self.scheduler.mark_dirty('status_bar')
+        self.scheduler.mark_dirty('chart')
+    
+    def on_record_change(self, student_id, date_str, old_record, new_record):
+        """Mettre à jour la ligne de l'étudiant si la date est celle affichée"""
+        if date_str in (self.attendance_date, self.selected_date.get()):
+            self.scheduler.mark_dirty('attendance', student_id)
 
 
 class StudentDialog:
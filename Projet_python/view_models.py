@@ -0,0 +1,167 @@
+"""
+Modèles de Vue
+Module calculant, sans Tk, les lignes affichées par l'interface (tuples de
+valeurs prêts à afficher) et les différences entre deux états d'une liste,
+si bien qu'ils peuvent être construits dans un thread de fond
+"""
+
+from collections import Counter
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+# Ligne affichée : valeurs des colonnes, dans l'ordre des colonnes
+Row = Tuple
+
+# Statut affiché pour un étudiant sans enregistrement à la date choisie
+NOT_MARKED = "Non marqué"
+
+def student_row(student_id: str, student=None) -> Row:
+    """Ligne de la liste des étudiants (ID, nom, prénom, email, groupe, date d'ajout)"""
+    if student is None:
+        return (student_id, '', '', '', '', '')
+    created_date = student.created_date[:10] if student.created_date else ""
+    return (student.student_id, student.last_name, student.first_name,
+            student.email, student.group, created_date)
+
+def attendance_row(student, record=None) -> Row:
+    """Ligne de la liste des présences (ID, nom, prénom, statut, heure, notes)"""
+    if record:
+        status = record.status.value
+        time_marked = record.time_marked
+        if record.lateness_seconds:
+            time_marked += f" (+{record.lateness_seconds // 60} min)"
+        notes = record.notes
+    else:
+        status = NOT_MARKED
+        time_marked = ""
+        notes = ""
+    return (student.student_id, student.last_name, student.first_name,
+            status, time_marked, notes)
+
+def student_statistics_row(rank: int, stats) -> Row:
+    """Ligne des statistiques par étudiant (rang, nom, sessions, compteurs, taux)"""
+    return (rank, stats.student_name, stats.total_sessions, stats.present_count,
+            stats.absent_count, stats.late_count,
+            f"{stats.attendance_rate:.1f}%", f"{stats.punctuality_rate:.1f}%")
+
+def at_risk_row(entry: Dict) -> Row:
+    """Ligne de la liste des étudiants nécessitant attention"""
+    return (entry['student_name'], f"{entry['attendance_rate']:.1f}%",
+            f"{entry['window_rate']:.1f}%", entry['current_streak'],
+            " ; ".join(entry['reason_labels']))
+
+def overall_statistics_text(overall_stats: Dict) -> Tuple[str, Optional[str]]:
+    """Textes des statistiques générales : résumé et meilleur étudiant (None s'il n'y en a pas)"""
+    stats_text = f"Nombre d'étudiants: {overall_stats['total_students']}\n"
+    stats_text += f"Nombre de sessions: {overall_stats['total_sessions']}\n"
+    stats_text += f"Taux de présence moyen: {overall_stats['average_attendance_rate']:.1f}%\n"
+    stats_text += f"Taux de ponctualité moyen: {overall_stats['average_punctuality_rate']:.1f}%"
+
+    best = overall_stats['best_student']
+    best_text = f"Meilleur étudiant: {best.student_name} ({best.attendance_rate:.1f}%)" if best else None
+    return stats_text, best_text
+
+def count_statuses(rows: Iterable[Row]) -> Dict[str, int]:
+    """Nombre de lignes de la liste des présences par statut affiché"""
+    return Counter(values[3] for values in rows)
+
+def page_slice(keys: Sequence[Hashable], page: int, page_size: int) -> Tuple[List, int, int]:
+    """Clés d'une page (numérotée à partir de 0), page ramenée dans les bornes et nombre de pages"""
+    page_count = max(1, -(-len(keys) // page_size))
+    page = min(max(page, 0), page_count - 1)
+    start = page * page_size
+    return list(keys[start:start + page_size]), page, page_count
+
+class RowDiff:
+    """Différence entre deux états d'une liste de lignes indexées par clé"""
+
+    def __init__(self, added: Optional[Dict[Hashable, Row]] = None,
+                 removed: Optional[List[Hashable]] = None,
+                 changed: Optional[Dict[Hashable, Row]] = None):
+        self.added = added or {}
+        self.removed = removed or []
+        self.changed = changed or {}
+
+    def is_empty(self) -> bool:
+        """Vrai si les deux états sont identiques"""
+        return not (self.added or self.removed or self.changed)
+
+    def changes_keys(self) -> bool:
+        """Vrai si des lignes sont ajoutées ou supprimées (la liste des clés change)"""
+        return bool(self.added or self.removed)
+
+    def apply_to(self, rows: Dict[Hashable, Row]):
+        """Appliquer la différence à un dictionnaire de lignes"""
+        for key in self.removed:
+            rows.pop(key, None)
+        rows.update(self.changed)
+        rows.update(self.added)
+
+def diff_rows(old: Dict[Hashable, Row], new: Dict[Hashable, Row]) -> RowDiff:
+    """Calculer la différence qui transforme old en new"""
+    diff = RowDiff(removed=[key for key in old if key not in new])
+    for key, values in new.items():
+        previous = old.get(key)
+        if previous is None:
+            diff.added[key] = values
+        elif previous != values:
+            diff.changed[key] = values
+    return diff
+
+class AttendanceViewModel:
+    """Lignes de la liste des présences d'une date, calculées depuis les gestionnaires
+
+    Aucune méthode ne touche à Tk : les lignes et leurs différences peuvent
+    être calculées dans une tâche de fond (sous le verrou d'écriture pour
+    une lecture cohérente), l'interface n'ayant plus qu'à les appliquer.
+    """
+
+    def __init__(self, student_manager, attendance_manager):
+        self.student_manager = student_manager
+        self.attendance_manager = attendance_manager
+
+    def build_row(self, student_id: str, date_str: str) -> Optional[Row]:
+        """Ligne d'un étudiant à une date (None si l'étudiant n'existe pas)"""
+        student = self.student_manager.get_student(student_id)
+        if student is None:
+            return None
+        session = self.attendance_manager.get_session(date_str)
+        return attendance_row(student, session.get_record(student_id) if session else None)
+
+    def build_rows(self, date_str: str, student_ids: Iterable[str] = None) -> Dict[str, Row]:
+        """Lignes de tous les étudiants (ou de student_ids) à une date, dans l'ordre naturel"""
+        session = self.attendance_manager.get_session(date_str)
+        if student_ids is None:
+            students = self.student_manager.get_all_students()
+        else:
+            students = filter(None, map(self.student_manager.get_student, student_ids))
+        return {student.student_id: attendance_row(
+                    student, session.get_record(student.student_id) if session else None)
+                for student in students}
+
+    def diff(self, date_str: str, current: Dict[str, Row],
+             student_ids: Iterable[str] = None) -> RowDiff:
+        """Différence entre les lignes affichées et celles de la date (de student_ids seulement)"""
+        return diff_rows(current, self.build_rows(date_str, student_ids))
+
+    def diff_keys(self, date_str: str, current: Dict[str, Row], student_ids: Iterable[str],
+                  is_member: Optional[Callable[[str], bool]] = None) -> RowDiff:
+        """Différence limitée à quelques étudiants (ajoutés, modifiés ou supprimés)
+
+        is_member restreint la liste à une liste d'appel : un étudiant qui
+        n'en fait plus partie est supprimé de la liste.
+        """
+        diff = RowDiff()
+        for student_id in student_ids:
+            if is_member is None or is_member(student_id):
+                values = self.build_row(student_id, date_str)
+            else:
+                values = None
+            previous = current.get(student_id)
+            if values is None:
+                if previous is not None:
+                    diff.removed.append(student_id)
+            elif previous is None:
+                diff.added[student_id] = values
+            elif previous != values:
+                diff.changed[student_id] = values
+        return diff
@@ -0,0 +1,379 @@
+"""
+Liste Virtualisée
+Module affichant une longue liste dans un Treeview qui ne contient que les
+lignes visibles : les lignes sont réécrites sur place au défilement, et le
+tri multi-colonnes s'appuie sur des clés de tri précalculées
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Indicateurs de sens de tri ajoutés au titre des colonnes
+SORT_ARROWS = {False: ' ▲', True: ' ▼'}
+
+def sort_value(value):
+    """Clé de tri d'une valeur affichée (texte sans tenir compte de la casse)"""
+    return value.lower() if isinstance(value, str) else value
+
+class ColumnSorter:
+    """Ordre de tri multi-colonnes d'un modèle de lignes
+
+    Les clés de tri d'une colonne sont calculées une fois, au premier tri
+    sur cette colonne, puis maintenues ligne par ligne à chaque
+    modification. Le classement complet de toutes les lignes est gardé ;
+    trier un sous-ensemble (résultats d'une recherche) revient à le ranger
+    selon ce classement. Le tri est stable : à égalité, l'ordre naturel
+    (celui de all_keys) est conservé.
+    """
+
+    def __init__(self, columns: Sequence[str], row_values: Callable[[str], Tuple],
+                 all_keys: Callable[[], Iterable[str]]):
+        self.columns = tuple(columns)
+        self.row_values = row_values
+        self.all_keys = all_keys
+        self.order: List[Tuple[int, bool]] = []  # (indice de colonne, décroissant)
+        self._sort_keys: Dict[int, Dict[str, object]] = {}
+        self._ranked: List[str] = []
+        self._rank: Dict[str, int] = {}
+        self._stale = True
+
+    def invalidate(self, key: str = None):
+        """Recalculer les clés de tri d'une ligne modifiée (de toutes si key est None)"""
+        if key is None:
+            self._sort_keys.clear()
+        elif self._sort_keys:
+            values = self.row_values(key)
+            for index, cache in self._sort_keys.items():
+                cache[key] = sort_value(values[index])
+        self._stale = True
+
+    def remove(self, key: str):
+        """Oublier une ligne supprimée"""
+        for cache in self._sort_keys.values():
+            cache.pop(key, None)
+        self._stale = True
+
+    def _column_keys(self, index: int, keys: List[str]) -> Dict[str, object]:
+        """Clés de tri d'une colonne, complétées pour les lignes pas encore vues"""
+        cache = self._sort_keys.setdefault(index, {})
+        for key in keys:
+            if key not in cache:
+                cache[key] = sort_value(self.row_values(key)[index])
+        return cache
+
+    def ranked(self) -> List[str]:
+        """Toutes les clés dans l'ordre de tri courant"""
+        if self._stale:
+            ranked = list(self.all_keys())
+            # Tris stables successifs, de la dernière colonne à la première
+            for index, descending in reversed(self.order):
+                ranked.sort(key=self._column_keys(index, ranked).__getitem__, reverse=descending)
+            self._ranked = ranked
+            self._rank = {}
+            self._stale = False
+        return self._ranked
+
+    def sort(self, keys: Iterable[str]) -> List[str]:
+        """Ranger des clés selon l'ordre de tri courant"""
+        if not self.order:
+            return list(keys)
+        self.ranked()
+        if not self._rank:
+            self._rank = {key: position for position, key in enumerate(self._ranked)}
+        rank = self._rank
+        return sorted(keys, key=lambda key: rank.get(key, len(rank)))
+
+    def click(self, index: int, add: bool = False) -> bool:
+        """Appliquer un clic sur un titre de colonne, renvoyer True si l'ordre est simplement inversé
+
+        Un clic trie sur la colonne, ou inverse le sens si elle est déjà la
+        seule colonne de tri ; avec Maj, la colonne est ajoutée comme clé
+        secondaire (ou son sens est inversé si elle en fait déjà partie).
+        """
+        directions = dict(self.order)
+        if add and index in directions:
+            self.order = [(column, not descending if column == index else descending)
+                          for column, descending in self.order]
+        elif add:
+            self.order.append((index, False))
+        elif self.order and len(self.order) == 1 and self.order[0][0] == index:
+            self.order = [(index, not self.order[0][1])]
+        else:
+            self.order = [(index, False)]
+
+        if len(self.order) == 1 and directions == {index: not self.order[0][1]} and not self._stale:
+            # Même colonne, sens opposé : inverser le classement sans retrier
+            self._ranked.reverse()
+            self._rank = {}
+            return True
+        self._stale = True
+        return False
+
+    def heading_text(self, index: int) -> str:
+        """Titre d'une colonne avec son sens de tri (et son rang en multi-colonnes)"""
+        for position, (column, descending) in enumerate(self.order):
+            if column == index:
+                rank = str(position + 1) if len(self.order) > 1 else ''
+                return self.columns[index] + SORT_ARROWS[descending] + rank
+        return self.columns[index]
+
+class VirtualTreeview:
+    """Treeview virtualisé au-dessus d'un modèle en mémoire
+
+    Le modèle est une liste ordonnée de clés (par exemple des ID
+    d'étudiants) ; row_values(clé) donne les valeurs d'une ligne. Le
+    Treeview ne contient qu'un pool de lignes de la taille de la zone
+    visible (plus OVERSCAN lignes pour la ligne partiellement visible) :
+    défiler réécrit au plus ce pool, quelle que soit la taille du modèle,
+    et les défilements d'une même frame sont regroupés en un seul dessin.
+    La sélection est exprimée en clés du modèle.
+    """
+
+    OVERSCAN = 2
+    WHEEL_UNITS = 3
+
+    def __init__(self, parent, columns: Sequence[str], row_values: Callable[[str], Tuple],
+                 height: int = 15):
+        self.columns = tuple(columns)
+        self.row_values = row_values
+        self.tree = ttk.Treeview(parent, columns=self.columns, show='headings', height=height,
+                                 selectmode='browse')
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self._on_scrollbar)
+
+        self.keys: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self.top = 0
+        self.visible_rows = height
+        self._slots: List[str] = []
+        self._shown: Dict[str, Tuple] = {}
+        self._selected: Optional[str] = None
+        self._redraw_pending = False
+        self.sorter: Optional[ColumnSorter] = None
+        self.on_sort: Optional[Callable[[], None]] = None
+
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<Configure>', self._on_configure)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-self.WHEEL_UNITS))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(self.WHEEL_UNITS))
+        for sequence, move in (('<Up>', -1), ('<Down>', 1)):
+            self.tree.bind(sequence, lambda e, move=move: self.move_selection(move))
+        self.tree.bind('<Prior>', lambda e: self.move_selection(-self.visible_rows))
+        self.tree.bind('<Next>', lambda e: self.move_selection(self.visible_rows))
+        self.tree.bind('<Home>', lambda e: self.move_selection(-len(self.keys)))
+        self.tree.bind('<End>', lambda e: self.move_selection(len(self.keys)))
+
+    # Délégation au Treeview
+    def heading(self, column, **options):
+        return self.tree.heading(column, **options)
+
+    def column(self, column, **options):
+        return self.tree.column(column, **options)
+
+    def bind(self, sequence, func, add=None):
+        return self.tree.bind(sequence, func, add)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    # Tri
+    def enable_sorting(self, all_keys: Callable[[], Iterable[str]],
+                       on_sort: Optional[Callable[[], None]] = None):
+        """Trier au clic sur les titres (Maj+clic : colonne secondaire)
+
+        on_sort remplace le rangement des clés affichées, par exemple pour
+        recalculer une page à partir du classement de toutes les clés.
+        """
+        self.sorter = ColumnSorter(self.columns, self.row_values, all_keys)
+        self.on_sort = on_sort
+        self.tree.bind('<Button-1>', self._on_heading_click, add='+')
+
+    def ordered_keys(self) -> List[str]:
+        """Toutes les clés du modèle complet dans l'ordre d'affichage"""
+        return self.sorter.ranked() if self.sorter else []
+
+    def sort_by(self, column: str, add: bool = False):
+        """Trier la liste sur une colonne (voir ColumnSorter.click)"""
+        index = self.columns.index(column)
+        reversed_only = self.sorter.click(index, add)
+        if self.on_sort is not None:
+            self.on_sort()
+        elif reversed_only:
+            self.keys.reverse()
+            self._positions = {key: position for position, key in enumerate(self.keys)}
+            self.redraw()
+        else:
+            self.set_rows(self.keys)
+        for position, name in enumerate(self.columns):
+            self.tree.heading(name, text=self.sorter.heading_text(position))
+
+    def _on_heading_click(self, event):
+        """Clic sur un titre de colonne"""
+        if self.tree.identify_region(event.x, event.y) != 'heading':
+            return None
+        column = self.tree.identify_column(event.x)
+        if column.startswith('#') and column[1:].isdigit() and 0 < int(column[1:]) <= len(self.columns):
+            self.sort_by(self.columns[int(column[1:]) - 1], add=bool(event.state & 0x0001))
+        return 'break'
+
+    # Modèle
+    def set_rows(self, keys: Sequence[str]):
+        """Remplacer les clés affichées (rangées selon le tri courant), en gardant la position de défilement"""
+        self.keys = self.sorter.sort(keys) if self.sorter else list(keys)
+        self._positions = {key: position for position, key in enumerate(self.keys)}
+        if self._selected not in self._positions:
+            self._selected = None
+        self.redraw()
+
+    def append_rows(self, keys: Sequence[str]):
+        """Ajouter des clés à la fin du modèle (résultats arrivant par paquets)
+
+        Les clés doivent suivre l'ordre d'affichage (voir ordered_keys).
+        """
+        for key in keys:
+            self._positions[key] = len(self.keys)
+            self.keys.append(key)
+        self.schedule_redraw()
+
+    def get_children(self) -> Tuple[str, ...]:
+        """Clés du modèle, dans l'ordre d'affichage"""
+        return tuple(self.keys)
+
+    def refresh_key(self, key: str):
+        """Réécrire la ligne d'une clé si elle est visible"""
+        position = self._positions.get(key)
+        if position is not None and self.top <= position < self.top + len(self._slots):
+            self._write_slot(self._slots[position - self.top], key)
+
+    def refresh_visible(self):
+        """Réécrire toutes les lignes visibles"""
+        self._shown.clear()
+        self.redraw()
+
+    # Sélection
+    def selection(self) -> Tuple[str, ...]:
+        """Clé sélectionnée (tuple vide si aucune)"""
+        return (self._selected,) if self._selected is not None else ()
+
+    def selection_set(self, key: str):
+        """Sélectionner une clé et la faire défiler jusqu'à la zone visible"""
+        if key in self._positions:
+            self._selected = key
+            self.see(key)
+
+    def identify_row(self, y: int) -> Optional[str]:
+        """Clé de la ligne située à l'ordonnée y du Treeview"""
+        return self._slot_key(self.tree.identify_row(y))
+
+    def move_selection(self, offset: int):
+        """Déplacer la sélection de offset lignes (flèches, pages, début, fin)"""
+        if self.keys:
+            current = self._positions.get(self._selected, self.top - (1 if offset > 0 else 0))
+            position = max(0, min(len(self.keys) - 1, current + offset))
+            self.selection_set(self.keys[position])
+        return 'break'
+
+    # Défilement
+    def see(self, key: str):
+        """Faire défiler le minimum pour que la ligne d'une clé soit visible"""
+        position = self._positions.get(key)
+        if position is None:
+            return
+        if position < self.top:
+            self.top = position
+        elif position >= self.top + self.visible_rows:
+            self.top = position - self.visible_rows + 1
+        self.schedule_redraw()
+
+    def scroll(self, rows: int):
+        """Défiler de rows lignes (négatif vers le haut)"""
+        self.top += rows
+        self.schedule_redraw()
+        return 'break'
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        """Commande de la barre de défilement (moveto ou scroll)"""
+        if action == 'moveto':
+            self.top = int(float(amount) * len(self.keys))
+            self.schedule_redraw()
+        elif action == 'scroll':
+            step = self.visible_rows if unit == 'pages' else 1
+            self.scroll(int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        """Molette (Windows, macOS) : quelques lignes par cran"""
+        return self.scroll(-self.WHEEL_UNITS if event.delta > 0 else self.WHEEL_UNITS)
+
+    def _on_configure(self, event):
+        """Adapter le pool de lignes à la hauteur du widget"""
+        bbox = self.tree.bbox(self._slots[0]) if self._slots else None
+        if bbox:
+            header, row_height = bbox[1], bbox[3]
+        else:
+            header = 25
+            row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        visible = max(1, (event.height - header) // max(1, row_height))
+        if visible != self.visible_rows:
+            self.visible_rows = visible
+            self.schedule_redraw()
+
+    # Dessin
+    def schedule_redraw(self):
+        """Regrouper les demandes de dessin d'une même frame"""
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.tree.after_idle(self.redraw)
+
+    def redraw(self):
+        """Afficher la fenêtre visible du modèle dans le pool de lignes"""
+        self._redraw_pending = False
+        count = len(self.keys)
+        self.top = max(0, min(self.top, count - self.visible_rows))
+
+        size = min(self.visible_rows + self.OVERSCAN, count)
+        while len(self._slots) < size:
+            iid = f"slot{len(self._slots)}"
+            self.tree.insert('', tk.END, iid=iid)
+            self._slots.append(iid)
+        while len(self._slots) > size:
+            iid = self._slots.pop()
+            self.tree.delete(iid)
+            self._shown.pop(iid, None)
+
+        selected_slot = ()
+        for offset, iid in enumerate(self._slots):
+            position = self.top + offset
+            key = self.keys[position] if position < count else None
+            self._write_slot(iid, key)
+            if key is not None and key == self._selected:
+                selected_slot = (iid,)
+        if tuple(self.tree.selection()) != selected_slot:
+            self.tree.selection_set(selected_slot)
+
+        if count:
+            self.scrollbar.set(self.top / count, min(1.0, (self.top + self.visible_rows) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _write_slot(self, iid: str, key: Optional[str]):
+        """Écrire les valeurs d'une clé dans une ligne du pool si elles ont changé"""
+        values = self.row_values(key) if key is not None else ('',) * len(self.columns)
+        if self._shown.get(iid) != values:
+            self.tree.item(iid, values=values)
+            self._shown[iid] = values
+
+    def _slot_key(self, iid: str) -> Optional[str]:
+        """Clé affichée dans une ligne du pool"""
+        if iid not in self._shown or not iid.startswith('slot'):
+            return None
+        position = self.top + int(iid[4:])
+        return self.keys[position] if position < len(self.keys) else None
+
+    def _on_select(self, event):
+        """Traduire une sélection à la souris en clé du modèle"""
+        selection = self.tree.selection()
+        if selection:
+            key = self._slot_key(selection[0])
+            if key is not None:
+                self._selected = key